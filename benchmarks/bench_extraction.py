@@ -0,0 +1,165 @@
+"""
+Benchmarks `extract_dataset` and the section extractors on synthetic datasets.
+
+For every dataset size the script generates a deterministic synthetic dataset (see
+`synthetic_dataset.py`), then times `dataset_module.extract_dataset` end to end on a gzipped
+file and each section extractor over all reactions of the dataset. With `--memory`, every
+measurement is repeated under `tracemalloc` to record the peak Python memory. Results can be
+saved with `--json` and compared against a previous run with `--compare`; the script exits
+with status 1 if a measurement got slower than `--tolerance` allows.
+
+Example:
+    $ python benchmarks/bench_extraction.py --sizes 1000 10000 100000 --memory --json bench.json
+    $ python benchmarks/bench_extraction.py --sizes 1000 --compare bench.json --tolerance 0.2
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from synthetic_dataset import make_dataset, write_dataset_file
+
+from ord_rxn_converter.conditions_module import extract_reaction_conditions
+from ord_rxn_converter.dataset_module import extract_dataset
+from ord_rxn_converter.identifiers_module import extract_reaction_identifiers
+from ord_rxn_converter.inputs_module import extract_input_components, extract_input_addition
+from ord_rxn_converter.metadata_module import extract_reaction_metadata
+from ord_rxn_converter.molecule_cache_module import MoleculeCache, set_molecule_cache
+from ord_rxn_converter.notes_observations_module import extract_notes_observations
+from ord_rxn_converter.outcomes_module import extract_reaction_outcomes
+from ord_rxn_converter.setup_module import extract_reaction_setup
+from ord_rxn_converter.workups_module import extract_reaction_workups
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+
+# section extractors, called as extractor(reaction, reactionID)
+SECTIONS = {
+    'metadata': lambda reaction, reactionID: extract_reaction_metadata(reaction.provenance, reactionID),
+    'identifiers': lambda reaction, reactionID: extract_reaction_identifiers(reaction.identifiers, reactionID),
+    'input_components': lambda reaction, reactionID: extract_input_components(reaction.inputs, reactionID),
+    'input_addition': lambda reaction, reactionID: extract_input_addition(reaction.inputs, reactionID),
+    'setup': lambda reaction, reactionID: extract_reaction_setup(reaction.setup, reactionID),
+    'conditions': lambda reaction, reactionID: extract_reaction_conditions(reaction.conditions, reactionID),
+    'notes': lambda reaction, reactionID: extract_notes_observations(reactionID, reaction.notes, reaction.observations),
+    'workups': lambda reaction, reactionID: extract_reaction_workups(reaction.workups, reactionID),
+    'outcomes': lambda reaction, reactionID: extract_reaction_outcomes(reactionID, reaction.outcomes),
+}
+
+
+def _run(function, memory):
+    # every measurement starts with an empty molecule cache, so RDKit work is included
+    set_molecule_cache(MoleculeCache())
+    start = time.perf_counter()
+    function()
+    seconds = time.perf_counter() - start
+
+    peak = None
+    if memory:
+        set_molecule_cache(MoleculeCache())
+        tracemalloc.start()
+        function()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return seconds, peak
+
+
+def benchmark(size, sections, memory=False, directory=None):
+
+    """
+    Runs the benchmarks for one dataset size.
+
+    Args:
+        size (int): Number of reactions.
+        sections (list): Names of the section extractors to time (keys of `SECTIONS`).
+        memory (bool, optional): Also record peak memory. Defaults to False.
+        directory (str, optional): Where the dataset file is written. Defaults to a temporary directory.
+
+    Returns:
+        list: One result dict (name, reactions, seconds, us_per_reaction, peak_bytes) per measurement.
+    """
+
+    dataset = make_dataset(size)
+    reactions = [(reaction, f"mds_reaction-{reaction.reaction_id.split('-')[1]}") for reaction in dataset.reactions]
+
+    measurements = {}
+    with tempfile.TemporaryDirectory(dir=directory) as temporary_directory:
+        path = write_dataset_file(os.path.join(temporary_directory, f'synthetic_{size}.pb.gz'), size)
+
+        def run_extract_dataset():
+            with contextlib.redirect_stdout(io.StringIO()):
+                extract_dataset(path)
+        measurements['extract_dataset'] = _run(run_extract_dataset, memory)
+
+    for name in sections:
+        extractor = SECTIONS[name]
+
+        def run_section():
+            for reaction, reactionID in reactions:
+                extractor(reaction, reactionID)
+        measurements[name] = _run(run_section, memory)
+
+    return [{"name": name, "reactions": size, "seconds": seconds, "us_per_reaction": seconds / size * 1e6,
+             "peak_bytes": peak} for name, (seconds, peak) in measurements.items()]
+
+
+def compare(results, baseline, tolerance):
+
+    """
+    Lists measurements that are slower than in `baseline` by more than `tolerance` (a fraction).
+    """
+
+    previous = {(result["name"], result["reactions"]): result for result in baseline}
+    regressions = []
+    for result in results:
+        old = previous.get((result["name"], result["reactions"]))
+        if old and result["seconds"] > old["seconds"] * (1 + tolerance):
+            regressions.append((result, old))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help='numbers of reactions (default: 1000 10000 100000)')
+    parser.add_argument('--sections', nargs='+', choices=list(SECTIONS), default=list(SECTIONS), help='section extractors to time (default: all)')
+    parser.add_argument('--memory', action='store_true', help='also record peak memory with tracemalloc')
+    parser.add_argument('--json', help='write the results to this file')
+    parser.add_argument('--compare', help='results of a previous run to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed slowdown when comparing (default: 0.2)')
+    args = parser.parse_args(argv)
+
+    from rdkit import RDLogger
+    RDLogger.DisableLog('rdApp.*')
+
+    results = []
+    print(f"{'benchmark':20s} {'reactions':>10s} {'seconds':>10s} {'us/reaction':>12s} {'peak MB':>10s}")
+    for size in args.sizes:
+        for result in benchmark(size, args.sections, memory=args.memory):
+            results.append(result)
+            peak = f"{result['peak_bytes'] / 1e6:10.1f}" if result['peak_bytes'] is not None else f"{'-':>10s}"
+            print(f"{result['name']:20s} {size:10d} {result['seconds']:10.3f} {result['us_per_reaction']:12.1f} {peak}")
+
+    if args.json:
+        with open(args.json, 'w') as stream:
+            json.dump(results, stream, indent=2)
+
+    if args.compare:
+        with open(args.compare) as stream:
+            regressions = compare(results, json.load(stream), args.tolerance)
+        for result, old in regressions:
+            print(f"REGRESSION {result['name']} ({result['reactions']} reactions): "
+                  f"{old['seconds']:.3f} s -> {result['seconds']:.3f} s")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
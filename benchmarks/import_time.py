@@ -0,0 +1,80 @@
+"""
+Measures how long importing `ord_rxn_converter` takes in a fresh interpreter.
+
+Each target is imported `--repeat` times in a new Python process and the median wall time
+is reported, together with the heavy dependencies that the import loaded. With
+`--max-seconds`, the script exits with status 1 if the median import of the package itself
+is slower, so it can guard the lazy import in CI.
+
+Example:
+    $ python benchmarks/import_time.py --repeat 7 --max-seconds 0.05
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+TARGETS = ['ord_rxn_converter', 'ord_rxn_converter.cli_module', 'ord_rxn_converter.dataset_module']
+
+HEAVY_MODULES = ['rdkit', 'pandas', 'pyarrow', 'ord_schema.message_helpers']
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {target}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "loaded": [name for name in {heavy!r} if name in sys.modules]}}))
+"""
+
+
+def measure(target, repeat):
+
+    """
+    Imports `target` in `repeat` fresh interpreters.
+
+    Args:
+        target (str): Module to import.
+        repeat (int): Number of interpreters started.
+
+    Returns:
+        tuple: (median seconds, list of heavy modules loaded by the import).
+    """
+
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [SRC_DIR, os.environ.get('PYTHONPATH')])))
+    timings = []
+    loaded = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', PROBE.format(target=target, heavy=HEAVY_MODULES)],
+                                env=env, check=True, capture_output=True, text=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        timings.append(result['seconds'])
+        loaded = result['loaded']
+    return statistics.median(timings), loaded
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5, help='interpreters started per target (default: 5)')
+    parser.add_argument('--max-seconds', type=float, help='fail if importing ord_rxn_converter takes longer')
+    args = parser.parse_args(argv)
+
+    package_seconds = None
+    for target in TARGETS:
+        seconds, loaded = measure(target, args.repeat)
+        if target == 'ord_rxn_converter':
+            package_seconds = seconds
+        print(f"{target:40s} {seconds * 1000:8.1f} ms  loaded: {', '.join(loaded) or '-'}")
+
+    if args.max_seconds is not None and package_seconds > args.max_seconds:
+        print(f"import ord_rxn_converter took {package_seconds:.3f} s > {args.max_seconds} s")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
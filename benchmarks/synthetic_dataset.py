@@ -0,0 +1,216 @@
+"""
+Deterministic generator of synthetic ORD datasets for benchmarks.
+
+Every reaction fills the sections read by the extraction modules (provenance, identifiers,
+inputs, setup, conditions, notes, observations, workups and outcomes), with configurable
+numbers of repeated elements. Compounds are drawn from a fixed pool of SMILES, so molecule
+caching behaves as it would on real data, where the same reagents recur across reactions.
+
+Example:
+    >>> from synthetic_dataset import make_dataset, write_dataset_file
+    >>> dataset = make_dataset(reactions=1000, seed=0)
+    >>> write_dataset_file("synthetic_1k.pb.gz", reactions=1000)
+"""
+
+import gzip
+import random
+
+from ord_schema.proto import dataset_pb2, reaction_pb2
+
+# reagents, solvents and products the synthetic compounds are drawn from
+SMILES_POOL = [
+    'CCO', 'CC(=O)O', 'c1ccccc1', 'CC(C)=O', 'ClCCl', 'CN(C)C=O', 'C1CCOC1', 'CCOC(C)=O', 'O', 'CS(C)=O',
+    'Brc1ccccc1', 'OB(O)c1ccccc1', 'c1ccc(-c2ccccc2)cc1', 'CC(=O)Cl', 'Nc1ccccc1', 'CC(=O)Nc1ccccc1',
+    'O=C(O)c1ccccc1', 'COc1ccc(Br)cc1', 'COc1ccc(-c2ccccc2)cc1', 'CCN(CC)CC', 'O=C([O-])[O-].[K+].[K+]',
+    'c1ccncc1', 'CC(C)(C)OC(=O)N1CCNCC1', 'Cc1ccc(S(=O)(=O)Cl)cc1', 'OCc1ccccc1', 'O=Cc1ccccc1',
+    'CC#N', 'Ic1ccccc1', 'C=Cc1ccccc1', 'CCCCCC', 'FC(F)(F)c1ccc(Br)cc1', 'FC(F)(F)c1ccc(-c2ccccc2)cc1',
+]
+
+ROLES = [reaction_pb2.ReactionRole.REACTANT, reaction_pb2.ReactionRole.REAGENT,
+         reaction_pb2.ReactionRole.SOLVENT, reaction_pb2.ReactionRole.CATALYST]
+
+PEOPLE = [('0000-0001-0000-000%d' % index, f'user{index}', f'Chemist {index}', 'Example University', f'user{index}@example.org')
+          for index in range(5)]
+
+
+def _set_person(person, rng):
+    orcid, username, name, organization, email = rng.choice(PEOPLE)
+    person.orcid, person.username, person.name = orcid, username, name
+    person.organization, person.email = organization, email
+
+
+def _add_identifiers(compound, rng):
+    smiles = rng.choice(SMILES_POOL)
+    identifier = compound.identifiers.add()
+    identifier.type = reaction_pb2.CompoundIdentifier.SMILES
+    identifier.value = smiles
+    name = compound.identifiers.add()
+    name.type = reaction_pb2.CompoundIdentifier.NAME
+    name.value = f'compound {SMILES_POOL.index(smiles)}'
+
+
+def _add_compound(compound, rng, role):
+    _add_identifiers(compound, rng)
+    compound.amount.moles.value = round(rng.uniform(0.1, 10.0), 3)
+    compound.amount.moles.units = reaction_pb2.Moles.MILLIMOLE
+    compound.reaction_role = role
+    compound.is_limiting = role == reaction_pb2.ReactionRole.REACTANT and rng.random() < 0.5
+
+
+def make_reaction(rng, inputs=2, components=2, outcomes=1, products=1, measurements=2, workups=2, observations=1,
+                  temperature_measurements=2):
+
+    """
+    Builds one synthetic reaction.
+
+    Args:
+        rng (random.Random): Source of randomness.
+        inputs (int, optional): Number of reaction inputs. Defaults to 2.
+        components (int, optional): Components per input. Defaults to 2.
+        outcomes (int, optional): Number of outcomes. Defaults to 1.
+        products (int, optional): Products per outcome. Defaults to 1.
+        measurements (int, optional): Measurements per product. Defaults to 2.
+        workups (int, optional): Number of workups. Defaults to 2.
+        observations (int, optional): Number of observations. Defaults to 1.
+        temperature_measurements (int, optional): Temperature measurements in the conditions. Defaults to 2.
+
+    Returns:
+        reaction_pb2.Reaction: The reaction.
+    """
+
+    reaction = reaction_pb2.Reaction()
+    reaction.reaction_id = f'ord-{rng.getrandbits(128):032x}'
+
+    identifier = reaction.identifiers.add()
+    identifier.type = reaction_pb2.ReactionIdentifier.REACTION_SMILES
+    identifier.value = f'{rng.choice(SMILES_POOL)}.{rng.choice(SMILES_POOL)}>>{rng.choice(SMILES_POOL)}'
+
+    for index in range(inputs):
+        reaction_input = reaction.inputs[f'input {index}']
+        for _ in range(components):
+            _add_compound(reaction_input.components.add(), rng, rng.choice(ROLES))
+        reaction_input.addition_order = index + 1
+        reaction_input.addition_time.value = float(index * 5)
+        reaction_input.addition_time.units = reaction_pb2.Time.MINUTE
+        reaction_input.addition_temperature.value = 25.0
+        reaction_input.addition_temperature.units = reaction_pb2.Temperature.CELSIUS
+
+    reaction.setup.vessel.type = reaction_pb2.Vessel.ROUND_BOTTOM_FLASK
+    reaction.setup.vessel.material.type = reaction_pb2.VesselMaterial.GLASS
+    reaction.setup.vessel.volume.value = rng.choice([10.0, 25.0, 50.0, 100.0])
+    reaction.setup.vessel.volume.units = reaction_pb2.Volume.MILLILITER
+    reaction.setup.environment.type = reaction_pb2.ReactionSetup.ReactionEnvironment.FUME_HOOD
+
+    conditions = reaction.conditions
+    conditions.temperature.control.type = reaction_pb2.TemperatureConditions.TemperatureControl.OIL_BATH
+    conditions.temperature.setpoint.value = float(rng.choice([25, 60, 80, 100, 120]))
+    conditions.temperature.setpoint.units = reaction_pb2.Temperature.CELSIUS
+    for index in range(temperature_measurements):
+        measurement = conditions.temperature.measurements.add()
+        measurement.type = reaction_pb2.TemperatureConditions.TemperatureMeasurement.THERMOCOUPLE_INTERNAL
+        measurement.time.value = float(index * 30)
+        measurement.time.units = reaction_pb2.Time.MINUTE
+        measurement.temperature.value = conditions.temperature.setpoint.value + rng.uniform(-2.0, 2.0)
+        measurement.temperature.units = reaction_pb2.Temperature.CELSIUS
+    conditions.pressure.atmosphere.type = reaction_pb2.PressureConditions.Atmosphere.NITROGEN
+    conditions.stirring.type = reaction_pb2.StirringConditions.STIR_BAR
+    conditions.stirring.rate.type = reaction_pb2.StirringConditions.StirringRate.MEDIUM
+    conditions.ph = round(rng.uniform(1.0, 13.0), 1)
+
+    reaction.notes.is_heterogeneous = rng.random() < 0.3
+    reaction.notes.procedure_details = 'The reagents were combined and stirred under nitrogen.'
+    for index in range(observations):
+        observation = reaction.observations.add()
+        observation.time.value = float(index + 1)
+        observation.time.units = reaction_pb2.Time.HOUR
+        observation.comment = rng.choice(['solution turned yellow', 'precipitate formed', 'gas evolved'])
+
+    for index in range(workups):
+        workup = reaction.workups.add()
+        workup.type = rng.choice([reaction_pb2.ReactionWorkup.EXTRACTION, reaction_pb2.ReactionWorkup.FILTRATION,
+                                  reaction_pb2.ReactionWorkup.CONCENTRATION])
+        workup.details = f'workup step {index + 1}'
+        workup.duration.value = 30.0
+        workup.duration.units = reaction_pb2.Time.MINUTE
+        if workup.type == reaction_pb2.ReactionWorkup.EXTRACTION:
+            _add_compound(workup.input.components.add(), rng, reaction_pb2.ReactionRole.WORKUP)
+            workup.keep_phase = 'organic'
+
+    for _ in range(outcomes):
+        outcome = reaction.outcomes.add()
+        outcome.reaction_time.value = float(rng.choice([1, 2, 4, 12, 24]))
+        outcome.reaction_time.units = reaction_pb2.Time.HOUR
+        outcome.conversion.value = round(rng.uniform(10.0, 100.0), 1)
+        analysis = outcome.analyses['lc']
+        analysis.type = reaction_pb2.Analysis.LC
+        analysis.details = 'C18 column'
+        for _ in range(products):
+            product = outcome.products.add()
+            _add_identifiers(product, rng)
+            product.reaction_role = reaction_pb2.ReactionRole.PRODUCT
+            product.is_desired_product = True
+            for index in range(measurements):
+                measurement = product.measurements.add()
+                measurement.analysis_key = 'lc'
+                if index == 0:
+                    measurement.type = reaction_pb2.ProductMeasurement.YIELD
+                    measurement.percentage.value = round(rng.uniform(5.0, 99.0), 1)
+                else:
+                    measurement.type = reaction_pb2.ProductMeasurement.PURITY
+                    measurement.float_value.value = round(rng.uniform(0.8, 1.0), 3)
+                measurement.retention_time.value = round(rng.uniform(1.0, 15.0), 2)
+                measurement.retention_time.units = reaction_pb2.Time.MINUTE
+
+    provenance = reaction.provenance
+    _set_person(provenance.experimenter, rng)
+    provenance.city = 'Cleveland, OH'
+    provenance.doi = f'10.0000/synthetic.{rng.randrange(1000)}'
+    provenance.record_created.time.value = '2024-01-01T00:00:00'
+    _set_person(provenance.record_created.person, rng)
+    modified = provenance.record_modified.add()
+    modified.time.value = '2024-06-01T00:00:00'
+    _set_person(modified.person, rng)
+
+    return reaction
+
+
+def make_dataset(reactions=1000, seed=0, **reaction_options):
+
+    """
+    Builds a synthetic dataset; the same arguments always give the same dataset.
+
+    Args:
+        reactions (int, optional): Number of reactions. Defaults to 1000.
+        seed (int, optional): Random seed. Defaults to 0.
+        **reaction_options: Passed to `make_reaction` (inputs, components, outcomes, ...).
+
+    Returns:
+        dataset_pb2.Dataset: The dataset.
+    """
+
+    rng = random.Random(seed)
+    dataset = dataset_pb2.Dataset(name=f'synthetic dataset ({reactions} reactions)',
+                                  description='Generated for benchmarks',
+                                  dataset_id=f'ord_dataset-{rng.getrandbits(128):032x}')
+    for _ in range(reactions):
+        dataset.reactions.append(make_reaction(rng, **reaction_options))
+    return dataset
+
+
+def write_dataset_file(path, reactions=1000, seed=0, **reaction_options):
+
+    """
+    Writes a synthetic dataset in binary wire format, gzipped if `path` ends with `.gz`.
+
+    Returns:
+        str: `path`.
+    """
+
+    data = make_dataset(reactions, seed, **reaction_options).SerializeToString()
+    if path.endswith('.gz'):
+        with gzip.open(path, 'wb') as stream:
+            stream.write(data)
+    else:
+        with open(path, 'wb') as stream:
+            stream.write(data)
+    return path
@@ -1,3 +1,4 @@
+import importlib
 import os
 import sys
 
@@ -5,16 +6,43 @@ package_dir = os.path.abspath(os.path.dirname(__file__))
 if package_dir not in sys.path:
     sys.path.insert(0, package_dir)
 
-from . import dataset_module
-from . import utility_functions_module
-from . import metadata_module
-from . import identifiers_module
-from . import inputs_module
-from . import setup_module
-from . import conditions_module
-from . import notes_observations_module
-from . import workups_module
-from . import outcomes_module
+# submodules are imported on first access (PEP 562), so `import ord_rxn_converter`
+# does not load RDKit, pandas or the ORD protobufs until they are needed
+__all__ = [
+    'dataset_module',
+    'utility_functions_module',
+    'metadata_module',
+    'identifiers_module',
+    'inputs_module',
+    'setup_module',
+    'conditions_module',
+    'notes_observations_module',
+    'workups_module',
+    'outcomes_module',
+    'registry_module',
+    'reader_module',
+    'index_module',
+    'filter_module',
+    'molecule_cache_module',
+    'schema_module',
+    'stats_module',
+    'table_module',
+    'normalised_module',
+    'incremental_module',
+    'pipeline_module',
+    'writer_module',
+    'rdb_module',
+    'rdf_module',
+    'corpus_module',
+    'cli_module',
+]
 
 
+def __getattr__(name):
+    if name in __all__:
+        return importlib.import_module(f'.{name}', __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,6 @@
+import sys
+
+from ord_rxn_converter.cli_module import main
+
+if __name__ == '__main__':
+    sys.exit(main())
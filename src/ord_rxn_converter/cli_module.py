@@ -0,0 +1,319 @@
+# import requirements:
+import argparse
+import sys
+import time
+from ord_rxn_converter.corpus_module import find_dataset_files
+from ord_rxn_converter.dataset_module import TABLE_COLUMNS
+from ord_rxn_converter.filter_module import ReactionFilter
+from ord_rxn_converter.index_module import open_index
+from ord_rxn_converter.registry_module import CompoundRegistry, PersonRegistry
+from ord_rxn_converter.writer_module import write_dataset
+
+# =============================================================================
+#               COMMAND LINE INTERFACE: ord-rxn-convert
+# =============================================================================
+
+OUTPUT_FORMATS = ('parquet', 'csv', 'jsonl', 'sqlite', 'ntriples', 'turtle')
+
+# output formats whose existing rows can be patched by an incremental update
+INCREMENTAL_FORMATS = ('sqlite', 'parquet')
+
+# output suffixes from which the format is guessed when --format is not given
+FORMAT_SUFFIXES = {
+    '.sqlite': 'sqlite', '.sqlite3': 'sqlite', '.db': 'sqlite',
+    '.nt': 'ntriples', '.nt.gz': 'ntriples', '.ttl': 'turtle', '.ttl.gz': 'turtle',
+}
+
+
+class Progress:
+
+    """
+    Reports conversion throughput on a single, continuously updated line.
+
+    Args:
+        stream (file object, optional): Where the line is written. Defaults to `sys.stderr`.
+        interval (float, optional): Minimum number of seconds between updates. Defaults to 0.5.
+    """
+
+    def __init__(self, stream=sys.stderr, interval=0.5):
+        self.stream = stream
+        self.interval = interval
+        self.reactions = 0
+        self.bytes = 0
+        self.start = time.perf_counter()
+        self._last_report = 0.0
+        self._line_length = 0
+
+    def __call__(self, reactions, size):
+        self.reactions += reactions
+        self.bytes += size
+        now = time.perf_counter()
+        if now - self._last_report >= self.interval:
+            self._last_report = now
+            self.report()
+
+    def line(self) -> str:
+
+        """
+        Returns the progress line: reactions converted, reactions/s and MB/s of decoded protobuf input.
+        """
+
+        elapsed = max(time.perf_counter() - self.start, 1e-9)
+        return (f"{self.reactions} reactions  {self.reactions / elapsed:.1f} reactions/s  "
+                f"{self.bytes / elapsed / 1e6:.2f} MB/s  {elapsed:.1f} s")
+
+    def report(self, end=''):
+        line = self.line()
+        # pad with spaces to overwrite the rest of a longer previous line
+        self.stream.write('\r' + line.ljust(self._line_length) + end)
+        self.stream.flush()
+        self._line_length = len(line)
+
+
+def guess_format(output) -> str:
+
+    """
+    Guesses the output format from the output path; directories default to Parquet.
+    """
+
+    for suffix, output_format in FORMAT_SUFFIXES.items():
+        if output.endswith(suffix):
+            return output_format
+    return 'parquet'
+
+def open_writer(output_format, output, tables=None, incremental=False):
+
+    """
+    Opens the writer of an output format.
+
+    Args:
+        output_format (str): One of `OUTPUT_FORMATS`.
+        output (str): Output directory for Parquet, CSV and JSON Lines; database or RDF file otherwise.
+        tables (list, optional): Tables to write. Defaults to None (all tables).
+        incremental (bool, optional): Open a writer that patches an existing output and also has
+            `delete_reactions(reactionIDs)`; only for `INCREMENTAL_FORMATS`. Defaults to False.
+
+    Returns:
+        A writer with `write_rows(table, rows)`, usable as a context manager.
+
+    Raises:
+        ValueError: If the output format is unknown, or cannot be updated incrementally.
+    """
+
+    if incremental and output_format not in INCREMENTAL_FORMATS:
+        raise ValueError(f"Incremental updates (--state) need {' or '.join(INCREMENTAL_FORMATS)} output, not {output_format}")
+    if output_format == 'parquet' and incremental:
+        from ord_rxn_converter.writer_module import ParquetPatcher
+        return ParquetPatcher(output, tables=tables)
+    if output_format == 'parquet':
+        from ord_rxn_converter.writer_module import ParquetWriter
+        return ParquetWriter(output, tables=tables)
+    if output_format == 'csv':
+        from ord_rxn_converter.writer_module import CSVWriter
+        return CSVWriter(output, tables=tables)
+    if output_format == 'jsonl':
+        from ord_rxn_converter.writer_module import JSONLWriter
+        return JSONLWriter(output, tables=tables)
+    if output_format == 'sqlite':
+        from ord_rxn_converter.rdb_module import RDBLoader, connect_sqlite
+        return RDBLoader(connect_sqlite(output), tables=tables)
+    if output_format in ('ntriples', 'turtle'):
+        from ord_rxn_converter.rdf_module import RDFFileWriter
+        return RDFFileWriter(output, serialization='nt' if output_format == 'ntriples' else 'ttl', tables=tables)
+    raise ValueError(f"Unknown output format {output_format}")
+
+def parse_shard(text) -> tuple:
+
+    """
+    Parses a shard given as `K/N` (shard K of N, counted from 0).
+
+    Raises:
+        argparse.ArgumentTypeError: If the text is not of this form or K is not below N.
+    """
+
+    try:
+        shard, count = (int(part) for part in text.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid shard {text!r}, expected K/N") from None
+    if count < 1 or not 0 <= shard < count:
+        raise argparse.ArgumentTypeError(f"invalid shard {text!r}, expected 0 <= K < N")
+    return shard, count
+
+def build_parser():
+
+    """
+    Builds the argument parser of `ord-rxn-convert`.
+    """
+
+    parser = argparse.ArgumentParser(
+        prog='ord-rxn-convert',
+        description='Convert Open Reaction Database dataset files to tables (Parquet, CSV, JSON Lines), '
+                    'a SQLite database or RDF. All inputs are converted into one output; compounds and '
+                    'persons are merged across inputs.',
+    )
+    parser.add_argument('inputs', nargs='+', help='dataset files, directories or glob patterns')
+    parser.add_argument('-o', '--output', required=True,
+                        help='output directory (parquet, csv, jsonl) or file (sqlite, ntriples, turtle)')
+    parser.add_argument('-f', '--format', choices=OUTPUT_FORMATS,
+                        help='output format; guessed from the output suffix (.sqlite, .db, .nt, .ttl), otherwise parquet')
+    parser.add_argument('-w', '--workers', type=int, default=1, help='number of extraction processes (default: 1)')
+    parser.add_argument('-b', '--batch-size', type=int, default=256, help='reactions extracted per batch (default: 256)')
+    parser.add_argument('-t', '--tables', nargs='+', choices=list(TABLE_COLUMNS), metavar='TABLE',
+                        help=f"tables to write (default: all); only the reaction sections filling them are extracted, "
+                             f"and compounds are resolved with RDKit only for the compound table: {', '.join(TABLE_COLUMNS)}")
+    parser.add_argument('-n', '--normalised', action='store_true',
+                        help='also write flat child tables of measurements and analysis data '
+                             '(temperature_measurements, pressure_measurements, electrochemistry_measurements, '
+                             'product_measurements, analysis_data)')
+    parser.add_argument('-s', '--state', metavar='PATH',
+                        help='update the output incrementally: only new and changed reactions are converted and the '
+                             'rows of removed reactions are deleted; reaction fingerprints are kept in the state '
+                             'file PATH (sqlite and parquet output only)')
+    parser.add_argument('--shard', type=parse_shard, metavar='K/N',
+                        help='convert only shard K (from 0) of N equal ranges of reactions of every input, read through '
+                             'the sidecar index of the file (built on first use); run one conversion per shard, e.g. '
+                             'on different machines')
+    parser.add_argument('--index-dir', metavar='DIR',
+                        help='keep the indexes used by --shard in DIR instead of next to the dataset files, e.g. for '
+                             'read-only inputs')
+    parser.add_argument('--where', metavar='EXPR',
+                        help='convert only the reactions matching a filter expression over reaction fields, e.g. '
+                             '"identifiers.type == REACTION_SMILES and outcomes.products.measurements.type == YIELD"; '
+                             'other reactions are skipped before extraction')
+    parser.add_argument('--prefetch-molecules', action='store_true',
+                        help='resolve the distinct SMILES/InChI strings of each input with RDKit in one batched pass '
+                             'across the worker processes before extracting reactions')
+    parser.add_argument('--pipeline', action='store_true',
+                        help='read, extract and write concurrently: reactions are read and extracted on background '
+                             'threads, with bounded queues between the stages, while the output is written')
+    parser.add_argument('-q', '--quiet', action='store_true', help='do not report progress')
+    return parser
+
+def convert(inputs, output, output_format=None, tables=None, workers=1, batch_size=256, progress=None, normalised=False,
+            state=None, shard=None, where=None, prefetch_molecules=False, pipeline=False, index_dir=None):
+
+    """
+    Converts dataset files into one output, streaming reactions into the writer of the output format.
+
+    Args:
+        inputs (list): Dataset files, directories or glob patterns.
+        output (str): Output directory or file.
+        output_format (str, optional): One of `OUTPUT_FORMATS`. Defaults to None (guessed from `output`).
+        tables (list, optional): Tables to write. Defaults to None (all tables; child tables only with `normalised`).
+        workers (int, optional): Number of extraction processes. Defaults to 1.
+        batch_size (int, optional): Number of reactions extracted per batch. Defaults to 256.
+        progress (callable, optional): Called with the number of reactions and bytes of each batch. Defaults to None.
+        normalised (bool, optional): Also write the child tables of `normalised_module`. Defaults to False.
+        state (str, optional): Path of an `incremental_module.StateStore`. If given, the existing output is
+            patched with the reactions added, changed or removed since the previous run. Defaults to None
+            (convert everything).
+        shard (tuple, optional): (K, N) to convert only the K-th of N equal ranges of reactions of each file, read
+            through the file's sidecar index (see `index_module`). Defaults to None (all reactions).
+        where (str, optional): `filter_module.ReactionFilter` expression selecting the reactions to convert.
+            Defaults to None (all reactions).
+        prefetch_molecules (bool, optional): Resolve the distinct molecules of each file in one batched RDKit pass
+            before extracting its reactions. Defaults to False.
+        pipeline (bool, optional): Read and extract on background threads while the output is written. Defaults to False.
+        index_dir (str, optional): Directory holding the indexes used with `shard`. Defaults to None (next to each file).
+
+    Returns:
+        list: The dataset files converted.
+
+    Raises:
+        FileNotFoundError: If no dataset file matches `inputs`.
+        ValueError: If `state` is combined with `shard` or `where`, or `where` is not a valid filter expression.
+
+    Example:
+        >>> from cli_module import convert
+        >>> convert(["ord-data/data/00"], "ord.sqlite", workers=4)
+    """
+
+    filepaths = find_dataset_files(inputs)
+    if not filepaths:
+        raise FileNotFoundError(f"No dataset files found in {' '.join(map(str, inputs))}")
+
+    if tables is None and normalised:
+        tables = list(TABLE_COLUMNS)
+
+    if state is not None and shard is not None:
+        raise ValueError("Incremental updates (--state) cannot be combined with --shard")
+    if state is not None and where is not None:
+        raise ValueError("Incremental updates (--state) cannot be combined with --where")
+    if where is not None:
+        where = ReactionFilter(where)
+    if state is not None:
+        _update(filepaths, output, output_format or guess_format(output), tables, workers, batch_size, progress,
+                normalised, state)
+        return filepaths
+
+    compound_registry = CompoundRegistry()
+    person_registry = PersonRegistry()
+    with open_writer(output_format or guess_format(output), output, tables=tables) as writer:
+        for filepath in filepaths:
+            start, stop, index = 0, None, False
+            if shard is not None:
+                with open_index(filepath, directory=index_dir) as reaction_index:
+                    start, stop = reaction_index.shards(shard[1])[shard[0]]
+                index = index_dir or True
+            write_dataset(filepath, writer, compounds=compound_registry, persons=person_registry,
+                          batch_size=batch_size, workers=workers, progress=progress, normalised=normalised,
+                          start=start, stop=stop, index=index, tables=tables, where=where,
+                          prefetch_molecules=prefetch_molecules, pipeline=pipeline)
+        writer.write_rows("person", person_registry.rows())
+        writer.write_rows("compound", compound_registry.rows())
+
+    return filepaths
+
+def _update(filepaths, output, output_format, tables, workers, batch_size, progress, normalised, state):
+    # the state store is only updated once the output has been written and closed
+    from ord_rxn_converter.incremental_module import StateStore, apply_changes, diff_dataset
+
+    compound_registry = CompoundRegistry()
+    person_registry = PersonRegistry()
+    records = []
+    with StateStore(state) as state_store:
+        with open_writer(output_format, output, tables=tables, incremental=True) as writer:
+            for filepath in filepaths:
+                changes = diff_dataset(filepath, state_store)
+                apply_changes(changes, writer, compounds=compound_registry, persons=person_registry,
+                              batch_size=batch_size, workers=workers, progress=progress, normalised=normalised)
+                records.append((changes["datasetID"], changes["fingerprints"], changes["deleted"]))
+            writer.write_rows("person", person_registry.rows())
+            writer.write_rows("compound", compound_registry.rows())
+        for datasetID, fingerprints, deleted in records:
+            state_store.record(datasetID, fingerprints, deleted)
+
+def main(argv=None):
+
+    """
+    Entry point of the `ord-rxn-convert` command.
+
+    Args:
+        argv (list, optional): Command line arguments. Defaults to None (`sys.argv[1:]`).
+
+    Returns:
+        int: Exit status.
+
+    Example:
+        $ ord-rxn-convert data/*.pb.gz -o out/ --format parquet --workers 8 --tables reaction_outcomes compound
+    """
+
+    args = build_parser().parse_args(argv)
+    progress = None if args.quiet else Progress()
+
+    try:
+        filepaths = convert(args.inputs, args.output, output_format=args.format, tables=args.tables,
+                            workers=args.workers, batch_size=args.batch_size, progress=progress,
+                            normalised=args.normalised, state=args.state, shard=args.shard,
+                            where=args.where, prefetch_molecules=args.prefetch_molecules, pipeline=args.pipeline,
+                            index_dir=args.index_dir)
+    except (FileNotFoundError, ValueError, ImportError) as error:
+        if progress is not None and progress.reactions:
+            progress.report(end='\n')
+        print(f"ord-rxn-convert: error: {error}", file=sys.stderr)
+        return 1
+
+    if progress is not None:
+        progress.report(end='\n')
+        print(f"Converted {len(filepaths)} dataset file(s) to {args.output}", file=sys.stderr)
+    return 0
@@ -1,10 +1,7 @@
 # import requirements: 
 from ord_schema.proto import dataset_pb2, reaction_pb2
 from google.protobuf.message import Message
-from ord_rxn_converter.utility_functions_module import extract_all_enums
-
-#generate enums_data to be accessible here TODO - have importable object instead..?
-enums_data = extract_all_enums(reaction_pb2)
+from ord_rxn_converter.utility_functions_module import enums_data
 
 def extract_reaction_conditions(conditions, reactionID: str) -> list:
 
@@ -0,0 +1,316 @@
+# import requirements:
+import glob
+import hashlib
+import json
+import os
+import pathlib
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from ord_rxn_converter.dataset_module import REACTION_TABLE_COLUMNS
+from ord_rxn_converter.registry_module import CompoundRegistry, PersonRegistry
+from ord_rxn_converter.writer_module import ParquetWriter, write_dataset
+
+# =============================================================================
+#               CONVERSION OF A CORPUS OF DATASET FILES
+# =============================================================================
+
+# suffixes of the dataset files found in a corpus directory
+DATASET_SUFFIXES = ('.pb', '.pb.gz', '.binpb', '.binpb.gz', '.pbtxt', '.pbtxt.gz')
+
+MANIFEST_NAME = 'manifest.jsonl'
+
+# per-dataset file holding the compound and person rows merged into the corpus tables
+REGISTRIES_NAME = 'registries.json'
+
+def find_dataset_files(source):
+
+    """
+    Lists the dataset files of a corpus.
+
+    Args:
+        source (str or list): A directory (searched recursively), a glob pattern such as
+            `data/*/*.pb.gz`, a single file, or a list of any of these.
+
+    Returns:
+        list: Sorted, de-duplicated file paths.
+
+    Example:
+        >>> from corpus_module import find_dataset_files
+        >>> find_dataset_files("ord-data/data")
+        ['ord-data/data/00/ord_dataset-00005539a1e04c809a9a78647bea649c.pb.gz', ...]
+    """
+
+    sources = [source] if isinstance(source, (str, os.PathLike)) else source
+    filepaths = set()
+    for item in sources:
+        item = str(item)
+        if os.path.isdir(item):
+            for root, _, filenames in os.walk(item):
+                filepaths.update(os.path.join(root, filename) for filename in filenames if filename.endswith(DATASET_SUFFIXES))
+        elif os.path.isfile(item):
+            filepaths.add(item)
+        else:
+            filepaths.update(path for path in glob.glob(item, recursive=True) if os.path.isfile(path))
+    return sorted(filepaths)
+
+def dataset_name(filepath) -> str:
+
+    """
+    Returns the file name of a dataset without its suffixes, used to name its output directory.
+    """
+
+    name = pathlib.Path(filepath).name
+    for suffix in sorted(DATASET_SUFFIXES, key=len, reverse=True):
+        if name.endswith(suffix):
+            return name[:-len(suffix)]
+    return name
+
+def file_hash(filepath, chunk_size=1 << 20) -> str:
+
+    """
+    Computes the SHA-256 digest of a file, reading it in chunks.
+    """
+
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as stream:
+        for chunk in iter(lambda: stream.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def file_signature(filepath) -> dict:
+
+    """
+    Returns the path, size and modification time recorded for a dataset file in the manifest.
+    """
+
+    stat = os.stat(filepath)
+    return {"path": os.path.abspath(filepath), "size": stat.st_size, "mtime": stat.st_mtime}
+
+
+class Manifest:
+
+    """
+    Append-only record of the dataset files a corpus conversion has completed.
+
+    Each completed file is written as one JSON line (path, size, mtime, SHA-256 hash, output
+    directory, ...) and flushed to disk immediately, so an interrupted run leaves a manifest
+    that lists exactly the files whose output is complete. A file counts as done if its size
+    and modification time are unchanged, or else if its content hash is unchanged.
+
+    Args:
+        path (str): Path of the manifest file; it is created if it does not exist.
+
+    Example:
+        >>> from corpus_module import Manifest
+        >>> manifest = Manifest("out/manifest.jsonl")
+        >>> manifest.is_done("ord_dataset-1.pb.gz")
+        False
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.records = {}
+        if os.path.exists(path):
+            with open(path) as stream:
+                for line in stream:
+                    # a line cut short by a crash is ignored; its file is converted again
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    self.records[record["path"]] = record
+
+    def __len__(self):
+        return len(self.records)
+
+    def is_done(self, filepath) -> bool:
+
+        """
+        Checks whether a dataset file was converted, and has not changed since.
+
+        Args:
+            filepath (str): Path to the dataset file.
+
+        Returns:
+            bool: True if the manifest holds a record for the file with the same size and
+                modification time, or with the same SHA-256 hash.
+        """
+
+        signature = file_signature(filepath)
+        record = self.records.get(signature["path"])
+        if record is None:
+            return False
+        if record["size"] == signature["size"] and record["mtime"] == signature["mtime"]:
+            return True
+        if record["size"] == signature["size"] and record["sha256"] == file_hash(filepath):
+            self.add(dict(record, mtime=signature["mtime"]))
+            return True
+        return False
+
+    def add(self, record):
+
+        """
+        Records a completed dataset file and flushes the manifest to disk.
+
+        Args:
+            record (dict): Must contain at least `path`, `size`, `mtime` and `sha256`.
+        """
+
+        self.records[record["path"]] = record
+        with open(self.path, 'a') as stream:
+            stream.write(json.dumps(record) + '\n')
+            stream.flush()
+            os.fsync(stream.fileno())
+
+
+def convert_file(filepath, directory, writer_class=ParquetWriter, batch_size=256):
+
+    """
+    Converts one dataset file into its own output directory.
+
+    The dataset metadata and reaction tables are written with `writer_class`; the compound and
+    person rows of the dataset are saved to `registries.json` so they can be merged into the
+    corpus-wide tables later.
+
+    Args:
+        filepath (str): Path to the dataset file.
+        directory (str): Output directory of this dataset.
+        writer_class (type, optional): Writer taking `(directory, tables=...)`, with `write_rows` and `close`. Defaults to `ParquetWriter`.
+        batch_size (int, optional): Number of reactions extracted per batch. Defaults to 256.
+
+    Returns:
+        dict: The manifest record of the file.
+    """
+
+    signature = file_signature(filepath)
+    start = time.perf_counter()
+
+    tables = ["dataset_metadata", *REACTION_TABLE_COLUMNS]
+    with writer_class(directory, tables=tables) as writer:
+        compound_registry, person_registry = write_dataset(filepath, writer, batch_size=batch_size)
+
+    registries_path = os.path.join(directory, REGISTRIES_NAME)
+    with open(registries_path + '.tmp', 'w') as stream:
+        json.dump({"compound": list(compound_registry.rows()), "person": list(person_registry.rows())}, stream)
+    os.replace(registries_path + '.tmp', registries_path)
+
+    return dict(signature, sha256=file_hash(filepath), output=os.path.abspath(directory),
+                compounds=len(compound_registry), persons=len(person_registry),
+                seconds=round(time.perf_counter() - start, 3))
+
+def convert_corpus(source, directory, workers=1, batch_size=256, writer_class=ParquetWriter, resume=True):
+
+    """
+    Converts every dataset file of a corpus, one file per worker process, and merges the compound and person tables.
+
+    Each dataset is written to `<directory>/<dataset name>/`. Completed files are recorded in
+    `<directory>/manifest.jsonl`; with `resume`, files already recorded (and unchanged) are
+    skipped, so an interrupted run continues where it stopped. Once all files are done, the
+    compounds and persons of every dataset in the manifest are merged (on InChIKey and ORCiD)
+    into `<directory>/compound` and `<directory>/person` tables.
+
+    Output directories are named after the dataset files alone, so two files of the same name
+    (e.g. copies of a dataset in different subdirectories) cannot be converted into one corpus.
+
+    Args:
+        source (str or list): Directory, glob pattern or file list (see `find_dataset_files`).
+        directory (str): Output directory.
+        workers (int, optional): Number of files converted in parallel. Defaults to 1.
+        batch_size (int, optional): Number of reactions extracted per batch. Defaults to 256.
+        writer_class (type, optional): Writer taking `(directory, tables=...)`, with `write_rows` and `close`. Defaults to `ParquetWriter`.
+        resume (bool, optional): Skip files already recorded in the manifest. Defaults to True.
+
+    Returns:
+        dict: `"converted"` and `"skipped"` (lists of paths) and `"failed"` (dict of path to error message).
+
+    Raises:
+        ValueError: If two dataset files (found in `source`, or recorded in the manifest) share a name,
+            before any file is converted.
+
+    Example:
+        >>> from corpus_module import convert_corpus
+        >>> convert_corpus("ord-data/data", "out/", workers=8)
+        {'converted': [...], 'skipped': [], 'failed': {}}
+    """
+
+    os.makedirs(directory, exist_ok=True)
+    manifest_path = os.path.join(directory, MANIFEST_NAME)
+    if not resume and os.path.exists(manifest_path):
+        os.remove(manifest_path)
+    manifest = Manifest(manifest_path)
+
+    def output_directory(filepath):
+        return os.path.join(directory, dataset_name(filepath))
+
+    filepaths = find_dataset_files(source)
+    sources = {record["output"]: record["path"] for record in manifest.records.values()}
+    for filepath in filepaths:
+        output = os.path.abspath(output_directory(filepath))
+        other = sources.setdefault(output, os.path.abspath(filepath))
+        if other != os.path.abspath(filepath):
+            raise ValueError(f"{filepath} and {other} would both be converted into {output}; "
+                             f"dataset file names must be unique within a corpus")
+
+    summary = {"converted": [], "skipped": [], "failed": {}}
+    pending = []
+    for filepath in filepaths:
+        if manifest.is_done(filepath):
+            summary["skipped"].append(filepath)
+        else:
+            pending.append(filepath)
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(convert_file, filepath, output_directory(filepath), writer_class, batch_size): filepath
+                       for filepath in pending}
+            for future in as_completed(futures):
+                filepath = futures[future]
+                try:
+                    manifest.add(future.result())
+                    summary["converted"].append(filepath)
+                except Exception as error:
+                    summary["failed"][filepath] = repr(error)
+                    print(f"Failed to convert {filepath}: {error!r}")
+    else:
+        for filepath in pending:
+            try:
+                manifest.add(convert_file(filepath, output_directory(filepath), writer_class, batch_size))
+                summary["converted"].append(filepath)
+            except Exception as error:
+                summary["failed"][filepath] = repr(error)
+                print(f"Failed to convert {filepath}: {error!r}")
+
+    records = [manifest.records[path] for path in sorted(map(os.path.abspath, filepaths)) if path in manifest.records]
+    merge_registries(records, directory, writer_class)
+    return summary
+
+def merge_registries(records, directory, writer_class=ParquetWriter):
+
+    """
+    Merges the compound and person rows of converted datasets into corpus-wide tables.
+
+    Datasets are merged in the given order, so the first dataset that lists a compound or
+    person provides its row.
+
+    Args:
+        records (list): Manifest records of the converted datasets.
+        directory (str): Output directory of the `compound` and `person` tables.
+        writer_class (type, optional): Writer taking `(directory, tables=...)`. Defaults to `ParquetWriter`.
+
+    Returns:
+        tuple: The merged (CompoundRegistry, PersonRegistry).
+    """
+
+    compound_registry = CompoundRegistry()
+    person_registry = PersonRegistry()
+    for record in records:
+        with open(os.path.join(record["output"], REGISTRIES_NAME)) as stream:
+            registries = json.load(stream)
+        compound_registry.extend(registries["compound"])
+        person_registry.extend(registries["person"])
+
+    with writer_class(directory, tables=["compound", "person"]) as writer:
+        writer.write_rows("compound", compound_registry.rows())
+        writer.write_rows("person", person_registry.rows())
+
+    return compound_registry, person_registry
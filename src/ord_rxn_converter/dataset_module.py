@@ -1,36 +1,758 @@
 
 # import requirements
-from ord_schema.message_helpers import load_message, write_message
 from ord_schema.proto import dataset_pb2, reaction_pb2
-from google.protobuf.message import Message
-import pandas as pd
+from google.protobuf.message import DecodeError, Message
 import re
+import time
+from collections import deque
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor
 #function imports
 from ord_rxn_converter.metadata_module import extract_dataset_metadata, extract_reaction_metadata
-from ord_rxn_converter.identifiers_module import extract_reaction_identifiers, generate_compound_table
+from ord_rxn_converter.identifiers_module import extract_reaction_identifiers, generate_compound_table, collect_molecule_keys
 from ord_rxn_converter.conditions_module import extract_reaction_conditions
 from ord_rxn_converter.inputs_module import extract_input_components, extract_input_addition
 from ord_rxn_converter.notes_observations_module import extract_notes_observations
 from ord_rxn_converter.outcomes_module import extract_reaction_outcomes
 from ord_rxn_converter.setup_module import extract_reaction_setup
 from ord_rxn_converter.workups_module import extract_reaction_workups
-from ord_rxn_converter.utility_functions_module import extract_all_enums
+from ord_rxn_converter.registry_module import CompoundRegistry, PersonRegistry, COMPOUND_COLUMNS, PERSON_COLUMNS
+from ord_rxn_converter.normalised_module import CHILD_TABLE_COLUMNS, extract_child_rows
+from ord_rxn_converter.reader_module import read_dataset_header, iter_reaction_messages, iter_reaction_bytes
+from ord_rxn_converter.reader_module import MappedDataset, is_mappable_dataset, project_reaction_bytes, REACTION_ID_FIELD
+from ord_rxn_converter.index_module import iter_spans, open_index
+from ord_rxn_converter.filter_module import compile_filter
+from ord_rxn_converter.stats_module import ExtractionStats, molecule_cache_counts
+from ord_rxn_converter.molecule_cache_module import get_molecule_cache
+from ord_rxn_converter.pipeline_module import QUEUE_SIZE, threaded_stage
+from ord_rxn_converter.table_module import TableBuilder
 
 
-def extract_dataset (filepath, compounds=pd.DataFrame(), persons=pd.DataFrame()):
+#define column headers for each dataframe
+dataset_cols = ['datasetID', 'ORDdatasetID', 'datasetName', 'datasetDescription']
+reaction_meta_cols = ['datasetID', 'reactionID', 'ORDreactionID', 'experimenter', 
+                        'provenanceCity', 'experimentStart', 'doi', 'patent', 'publicationURL', 
+                        'recordCreatedTime', 'recordCreatedPerson', 'recordCreatedDetails', 'modifiedTimes', 'modifiedPeople']
+reaction_identifiers_cols = ['reactionID', 'reactionCXSMILES', 'reactionSMILES', 'RDFile', 'RInChI', 
+                            'reactionType', 'unspecified', 'custom', 'identifierDetails', 'isMapped']
+input_comps_cols = ['reactionID', 'inputKey', 'compoundIdenfiers', 'amount', 'amountUnit', 'reactionRole',
+                    'isLimiting', 'compoundPreparation', 'compoundSource', 'features', 'analyses', 'texture']
+input_addition_cols = ['reactionID', 'inputKey', 'additionOrder', 'additionTime', 'timeUnit', 'additionSpeed', 
+                        'additionDuration', 'durationUnit', 'additionDevice', 'additionTemperature', 
+                        'temperatureUnit', 'flowRate', 'flowRateUnit', 'texture', 'textureDetails']
+reaction_setup_cols = ['reactionID', 'vessel', 'vesselMaterial', 'vesselVolume', 'volumeUnit', 'vesselPreparations', 
+                        'vesselAttachments', 'isAutomated', 'automationPlatform', 'automationCode', 
+                        'reactionEnvironment']
+reaction_conds_cols = ['reactionID', 'temperatureConditions', 'pressureConditions', 'stirringConditions', 
+                        'illuminationConditions', 'electrochemistryConditions', 'flowConditions', 
+                        'reflux', 'pH', 'conditionsAreDynamic', 'conditionDetails']
+reaction_notes_cols = ['reactionID', 'isHeterogeneous', 'formsPrecipitates', 'isExothermic', 'offGasses', 
+                        'isSensitiveToMoisture', 'isSensitiveToOxygen', 'isSensitivetoLight', 'safetyNotes', 
+                        'procedureDetails', 'observations']
+reaction_workups_cols = ['reactionID', 'workupType', 'workupDetails', 'workupDuration', 'durationUnit', 
+                        'inputComponents', 'inputAdditionDetails', 'temperatureConditions', 'keepPhase', 
+                        'stirringConditions', 'workupTargetPH', 'isAutomated']
+reaction_outcomes_cols = ['reactionID', 'outcomeKey', 'reactionTime', 'timeUnit', 'outcomeConversion', 'products', 'analyses']
+
+
+#column headers for each table produced per reaction
+REACTION_TABLE_COLUMNS = {
+    "reaction_metadata" : reaction_meta_cols,
+    "reaction_identifiers" : reaction_identifiers_cols,
+    "input_components" : input_comps_cols,
+    "input_addition" : input_addition_cols,
+    "reaction_setup" : reaction_setup_cols,
+    "reaction_conditions" : reaction_conds_cols,
+    "reaction_notes" : reaction_notes_cols,
+    "reaction_workups" : reaction_workups_cols,
+    "reaction_outcomes" : reaction_outcomes_cols,
+}
+
+#column headers for every table returned by extract_dataset; child tables only in normalised mode
+TABLE_COLUMNS = {
+    "dataset_metadata" : dataset_cols,
+    **REACTION_TABLE_COLUMNS,
+    "compound" : COMPOUND_COLUMNS,
+    "person" : PERSON_COLUMNS,
+    **CHILD_TABLE_COLUMNS,
+}
+
+#tables written by default, i.e. every table except the normalised child tables
+DEFAULT_TABLES = [table for table in TABLE_COLUMNS if table not in CHILD_TABLE_COLUMNS]
+
+#tables filled by each section extractor of extract_reaction (child tables are built from the conditions and outcomes rows)
+SECTION_TABLES = {
+    "metadata" : ["reaction_metadata", "person"],
+    "identifiers" : ["reaction_identifiers"],
+    "inputs" : ["input_components", "input_addition", "compound"],
+    "setup" : ["reaction_setup"],
+    "conditions" : ["reaction_conditions", "temperature_measurements", "pressure_measurements", "electrochemistry_measurements"],
+    "notes" : ["reaction_notes"],
+    "workups" : ["reaction_workups"],
+    "outcomes" : ["reaction_outcomes", "compound", "product_measurements", "analysis_data"],
+}
+
+#top-level Reaction fields read by each section (see reaction.proto); reaction_id is always read
+SECTION_FIELDS = {
+    "metadata" : (9,),
+    "identifiers" : (1,),
+    "inputs" : (2,),
+    "setup" : (3,),
+    "conditions" : (4,),
+    "notes" : (5, 6),
+    "workups" : (7,),
+    "outcomes" : (8,),
+}
+
+
+def select_sections (tables=None, sections=None):
+    """
+    Works out which section extractors have to run to produce the requested tables.
+
+    Args:
+        tables (list, optional): Tables to produce (keys of `TABLE_COLUMNS`). Defaults to None.
+        sections (list, optional): Sections to extract (keys of `SECTION_TABLES`). Defaults to None.
+
+    Returns:
+        list or None: The sections filling `tables` plus `sections`, in the order of `SECTION_TABLES`,
+            or None (every section) if neither is given.
+
+    Raises:
+        ValueError: If a table or section is unknown.
+
+    Example:
+        >>> select_sections(["reaction_identifiers", "reaction_outcomes"])
+        ['identifiers', 'outcomes']
+    """
+    if tables is None and sections is None:
+        return None
+
+    selected = set()
+    for section in sections or ():
+        if section not in SECTION_TABLES:
+            raise ValueError(f"Unknown section {section!r}; expected one of {', '.join(SECTION_TABLES)}")
+        selected.add(section)
+    for table in tables or ():
+        if table not in TABLE_COLUMNS:
+            raise ValueError(f"Unknown table {table!r}; expected one of {', '.join(TABLE_COLUMNS)}")
+        selected.update(section for section, section_tables in SECTION_TABLES.items() if table in section_tables)
+    return [section for section in SECTION_TABLES if section in selected]
+
+
+def _reaction_fields (sections):
+    # top-level Reaction fields to keep when only `sections` are extracted
+    fields = {REACTION_ID_FIELD}
+    for section in sections:
+        fields.update(SECTION_FIELDS[section])
+    return fields
+
+
+def _output_tables (tables=None, sections=None, normalised=False):
+    # tables returned by extract_dataset: the requested ones, or those filled by the requested sections
+    if tables is not None:
+        return [table for table in TABLE_COLUMNS if table in tables]
+    if sections is not None:
+        selected = {table for section in select_sections(sections=sections) for table in SECTION_TABLES[section]}
+        selected.add("dataset_metadata")
+    else:
+        selected = TABLE_COLUMNS
+    return [table for table in TABLE_COLUMNS if table in selected and (normalised or table not in CHILD_TABLE_COLUMNS)]
+
+
+def mds_reaction_id (reaction_id):
+    """
+    Converts an ORD reaction ID (`ord-<hex>`) to the MDS reaction ID used as `reactionID` in the output tables.
+
+    Example:
+        >>> mds_reaction_id('ord-0123456789abcdef0123456789abcdef')
+        'mds_reaction-0123456789abcdef0123456789abcdef'
+    """
+    rxnID = re.split('-', reaction_id)
+    return f"mds_reaction-{rxnID[1]}"
+
+
+def extract_reaction (reaction, datasetID, stats=None, sections=None, resolve_molecules=True):
+    """
+    Extracts the table rows contributed by a single ORD reaction.
+
+    Runs every section extractor (metadata, identifiers, inputs, setup, conditions, notes,
+    workups, outcomes) on one `Reaction` message and collects their rows by output table,
+    together with the compound and person rows found in the reaction. Nothing is deduplicated
+    here; compound and person rows are meant to be fed to a `CompoundRegistry` / `PersonRegistry`.
+
+    Args:
+        reaction (reaction_pb2.Reaction): The reaction message to extract.
+        datasetID (str): MDS dataset ID of the dataset the reaction belongs to.
+        stats (ExtractionStats, optional): Records the time and rows of each section extractor. Defaults to None.
+        sections (list, optional): Sections to extract (keys of `SECTION_TABLES`); the tables of the other
+            sections are left empty. Defaults to None (every section).
+        resolve_molecules (bool, optional): Derive missing InChI / InChIKey / CXSMILES identifiers of compounds
+            with RDKit. Defaults to True.
+
+    Returns:
+        dict: A dictionary with one key per table in `REACTION_TABLE_COLUMNS` plus `"compound"`
+            and `"person"`, each mapping to a (possibly empty) list of rows.
+
+    Example:
+        >>> from ord_rxn_converter.dataset_module import extract_reaction
+        >>> rows = extract_reaction(dataset.reactions[0], 'mds_dataset-...')
+        >>> rows["reaction_outcomes"]
+    """
+    rows = {table: [] for table in REACTION_TABLE_COLUMNS}
+    rows["compound"] = []
+    rows["person"] = []
+    if sections is None:
+        sections = SECTION_TABLES
+
+    # extract reactionID
+    reactionID = mds_reaction_id(reaction.reaction_id)
+
+    provenance = reaction.provenance 
+    # extract reaction metadata (reaction IDs + provenance); 
+    if "metadata" in sections and hasattr(reaction, 'provenance') and reaction.provenance:    #check if provenance attribtue exists before calling
+        if stats is not None: tick = time.perf_counter()
+        rxn_metadata, person_metadata = extract_reaction_metadata(provenance, reactionID)
+        rxn_metadata = [datasetID, reactionID] + rxn_metadata
+        rows["reaction_metadata"].append(rxn_metadata)
+        rows["person"].extend(person_metadata)
+        if stats is not None: stats.add("metadata", time.perf_counter() - tick, 1 + len(person_metadata))
+   
+    # extract reaction identifiers
+    if "identifiers" in sections and hasattr(reaction, 'identifiers') and reaction.identifiers:     #check if exists before calling
+        if stats is not None: tick = time.perf_counter()
+        rows["reaction_identifiers"].append(extract_reaction_identifiers(reaction.identifiers, reactionID))
+        if stats is not None: stats.add("identifiers", time.perf_counter() - tick, 1)
+
+    # extract reaction inputs, compound identifiers, reaction addition
+    if "inputs" in sections and hasattr(reaction, 'inputs') and reaction.inputs:
+        if stats is not None: tick = time.perf_counter()
+        #extract reaction inputs
+        input_components, compound_identifiers = extract_input_components(reaction.inputs, reactionID, resolve_molecules)
+        rows["input_components"].extend(input_components)
+        rows["compound"].extend(compound_identifiers)
+
+        #extract reaction addition
+        rows["input_addition"].extend(extract_input_addition(reaction.inputs, reactionID))
+        if stats is not None:
+            stats.add("inputs", time.perf_counter() - tick,
+                      len(input_components) + len(compound_identifiers) + len(rows["input_addition"]))
+   
+    # extract reaction setup
+    if "setup" in sections and hasattr(reaction, 'setup') and reaction.setup:
+        if stats is not None: tick = time.perf_counter()
+        rows["reaction_setup"].append(extract_reaction_setup(reaction.setup, reactionID))
+        if stats is not None: stats.add("setup", time.perf_counter() - tick, 1)
+
+    # extract reaction conditions  
+    if "conditions" in sections and hasattr(reaction, 'conditions') and reaction.conditions:
+        if stats is not None: tick = time.perf_counter()
+        rows["reaction_conditions"].append(extract_reaction_conditions(reaction.conditions, reactionID))
+        if stats is not None: stats.add("conditions", time.perf_counter() - tick, 1)
+
+    # extract reaction notes & observations
+    if "notes" in sections and hasattr(reaction, 'notes') and hasattr(reaction, 'observations') and reaction.notes and reaction.observations:
+        if stats is not None: tick = time.perf_counter()
+        rows["reaction_notes"].append(extract_notes_observations(reactionID, reaction.notes, reaction.observations))
+        if stats is not None: stats.add("notes", time.perf_counter() - tick, 1)
+
+    # extract reaction workups
+    if "workups" in sections and hasattr(reaction, 'workups') and reaction.workups:
+        if stats is not None: tick = time.perf_counter()
+        rows["reaction_workups"].extend(extract_reaction_workups(reaction.workups, reactionID, resolve_molecules))
+        if stats is not None: stats.add("workups", time.perf_counter() - tick, len(rows["reaction_workups"]))
+
+    # extract reaction outcomes 
+    if "outcomes" in sections and hasattr(reaction, 'outcomes') and reaction.outcomes:
+        if stats is not None: tick = time.perf_counter()
+        outcomes, outcomes_identifiers = extract_reaction_outcomes(reactionID, reaction.outcomes, resolve_molecules)
+        rows["reaction_outcomes"].extend(outcomes)
+        rows["compound"].extend(outcomes_identifiers)
+        if stats is not None: stats.add("outcomes", time.perf_counter() - tick, len(outcomes) + len(outcomes_identifiers))
+
+    return rows
+
+
+def _parse_reaction (data, source):
+    # decoding errors are raised as ValueError, as by reader_module.iter_reaction_messages
+    try:
+        return reaction_pb2.Reaction.FromString(data)
+    except DecodeError as error:
+        raise ValueError(f"error parsing a reaction of {source}: {error}") from error
+
+
+def extract_reaction_batch (reactions, datasetID, stats=None, normalised=False, sections=None, resolve_molecules=True,
+                            where=None):
+    """
+    Extracts a batch of reactions and merges their rows per table.
+
+    Accepts either `Reaction` messages or their serialized bytes (or `memoryview` slices of a
+    memory-mapped file), so it can run in a worker process that receives raw reactions from the parent.
+    With `sections`, serialized reactions are cut down to the fields those sections read before
+    they are parsed (see `reader_module.project_reaction_bytes`), so skipped sections are never decoded.
+    With `where`, each reaction is tested as soon as it is parsed and reactions that do not match
+    are dropped before any section extractor (or RDKit) runs.
+
+    Args:
+        reactions (list): `reaction_pb2.Reaction` messages or their wire-format `bytes` / `memoryview`.
+        datasetID (str): MDS dataset ID of the dataset the reactions belong to.
+        stats (ExtractionStats, optional): Records decoding and section times and molecule cache lookups. Defaults to None.
+        normalised (bool, optional): Also return the child tables of `normalised_module`. Defaults to False.
+        sections (list, optional): Sections to extract, as returned by `select_sections`. Defaults to None (every section).
+        resolve_molecules (bool, optional): Derive missing compound identifiers with RDKit. Defaults to True.
+        where (callable, optional): Filter called with each `Reaction`; reactions for which it returns False are
+            skipped. A `filter_module.ReactionFilter` also keeps the fields it reads when `sections` is given;
+            other callables see the whole reaction. Defaults to None (keep every reaction).
+
+    Returns:
+        dict: Rows per table for the whole batch, in reaction order, in the format returned by `extract_reaction`.
+
+    Raises:
+        ValueError: If a serialized reaction cannot be parsed.
+    """
+    batch = {table: [] for table in REACTION_TABLE_COLUMNS}
+    batch["compound"] = []
+    batch["person"] = []
+
+    if stats is not None:
+        cache_counts = molecule_cache_counts()
+    fields = _reaction_fields(sections) if sections is not None else None
+    if fields is not None and where is not None:
+        where_fields = getattr(where, "fields", None)
+        fields = fields | where_fields if where_fields is not None else None
+
+    for reaction in reactions:
+        if isinstance(reaction, (bytes, memoryview)):
+            if stats is not None: tick = time.perf_counter()
+            if fields is not None:
+                reaction = project_reaction_bytes(reaction, fields)
+            reaction = _parse_reaction(reaction, datasetID)
+            if stats is not None: stats.add("parse", time.perf_counter() - tick)
+        if where is not None:
+            if stats is not None: tick = time.perf_counter()
+            keep = where(reaction)
+            if stats is not None: stats.add("filter", time.perf_counter() - tick, int(bool(keep)))
+            if not keep:
+                continue
+        for table, table_rows in extract_reaction(reaction, datasetID, stats, sections, resolve_molecules).items():
+            batch[table].extend(table_rows)
+
+    if normalised:
+        if stats is not None: tick = time.perf_counter()
+        batch.update(extract_child_rows(batch))
+        if stats is not None:
+            stats.add("child_tables", time.perf_counter() - tick, sum(len(batch[table]) for table in CHILD_TABLE_COLUMNS))
+
+    if stats is not None:
+        stats.add_cache_counts(cache_counts, molecule_cache_counts())
+    return batch
+
+
+# the private batch iterators below pass `options` (normalised, sections, resolve_molecules, where)
+# to extract_reaction_batch as keyword arguments
+
+def _extract_reaction_batch_with_stats (reactions, datasetID, options):
+    # runs in a worker process; its stats are sent back with the rows and merged by the parent
+    stats = ExtractionStats()
+    return extract_reaction_batch(reactions, datasetID, stats, **options), stats
+
+
+def _extract_span_batch (filepath, spans, datasetID, with_stats, options, seek_point=(0, 0)):
+    # runs in a worker process that reads the file itself, so only the (offset, length) of its reactions are sent to it
+    reactions = list(iter_spans(filepath, spans, seek_point))
+    if with_stats:
+        return _extract_reaction_batch_with_stats(reactions, datasetID, options)
+    return extract_reaction_batch(reactions, datasetID, **options)
+
+
+def _open_index (filepath, index):
+    # `index` is True (the sidecar next to the file) or the directory holding the index
+    return open_index(filepath, directory=None if index is True else index)
+
+
+def _iter_range_bytes (filepath, start=0, stop=None, index=False):
+    # serialized reactions in range(start, stop), read the way iter_reactions reads them
+    if index:
+        with _open_index(filepath, index) as reaction_index:
+            yield from reaction_index.iter_reaction_bytes(filepath, start, stop)
+    elif is_mappable_dataset(filepath):
+        with MappedDataset(filepath) as dataset:
+            yield from dataset.iter_reaction_bytes(start, stop)
+    else:
+        yield from islice(iter_reaction_bytes(filepath), start, stop)
+
+
+def resolve_dataset_molecules (filepath, workers=1, start=0, stop=None, index=False, sections=None, where=None, stats=None):
+    """
+    Resolves every distinct SMILES / InChI string of a dataset file with RDKit in one batched pass.
+
+    First phase of the two-phase resolution of `iter_reactions(..., prefetch_molecules=True)`. The
+    reactions are decoded once, keeping only their inputs, workups and outcomes, to collect the
+    molecule cache lookups their compounds need (`identifiers_module.collect_molecule_keys`).
+    The distinct lookups are then resolved across `workers` processes and added to the process-wide
+    molecule cache, so that extraction makes no RDKit calls and each molecule is parsed once.
+
+    Args:
+        filepath (str): Path to the input file (either zipped or unzipped Google Protobuf format).
+        workers (int, optional): Number of processes calling RDKit. Defaults to 1.
+        start (int, optional): Position of the first reaction. Defaults to 0.
+        stop (int, optional): Position after the last reaction. Defaults to None (the end of the file).
+        index (bool or str, optional): Read reactions through the index of the file, as in `iter_reactions`.
+            Defaults to False.
+        sections (list, optional): Sections that will be extracted; compounds of the others are skipped. Defaults to None.
+        where (callable, optional): Filter of the reactions that will be extracted. Defaults to None.
+        stats (ExtractionStats, optional): Records the time of the pass and the number of molecules. Defaults to None.
+
+    Returns:
+        dict: The `ResolvedMolecule` (or None) per (identifier type, value), to preload into worker processes.
+    """
+    if stats is not None: tick = time.perf_counter()
+    sections = SECTION_TABLES if sections is None else sections
+    fields = {field for section in ("inputs", "workups", "outcomes") if section in sections for field in SECTION_FIELDS[section]}
+    if where is not None:
+        where_fields = getattr(where, "fields", None)
+        fields = fields | where_fields if where_fields is not None else None
+
+    def reactions():
+        for data in _iter_range_bytes(filepath, start, stop, index):
+            if fields is not None:
+                data = project_reaction_bytes(data, fields)
+            reaction = _parse_reaction(data, filepath)
+            if where is None or where(reaction):
+                yield reaction
+
+    molecules = get_molecule_cache().prefetch(sorted(collect_molecule_keys(reactions())), workers)
+    if stats is not None: stats.add("molecules", time.perf_counter() - tick, len(molecules))
+    return molecules
+
+
+def _preload_molecules (molecules):
+    # initializer of worker processes: adds the molecules resolved by the parent to their cache
+    get_molecule_cache().preload(molecules)
+
+
+def _timed_iter (iterable, stats, section):
+    # records the time spent producing each item of an iterator, e.g. reading and decompressing the file
+    iterator = iter(iterable)
+    while True:
+        tick = time.perf_counter()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            return
+        stats.add(section, time.perf_counter() - tick)
+        yield item
+
+
+def _chunked (iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _read_chunks (reactions, batch_size, stats=None, read_ahead=0):
+    # groups reactions into batches; with `read_ahead`, they are read (and decompressed) on a
+    # separate thread, at most `read_ahead` batches ahead of extraction
+    if stats is not None:
+        reactions = _timed_iter(reactions, stats, "read")
+    chunks = _chunked(reactions, batch_size)
+    return threaded_stage(chunks, read_ahead, name='ord-rxn-converter-reader') if read_ahead else chunks
+
+
+def _iter_batches_parallel (reaction_bytes, datasetID, batch_size, workers, stats, options, filepath=None,
+                            reaction_index=None, molecules=None, read_ahead=0):
+    # keep a bounded number of batches in flight and yield them in submission order,
+    # so the output is identical to the serial one and memory stays bounded;
+    # with `filepath`, `reaction_bytes` holds the (offset, length) of reactions in a file the workers read,
+    # starting from the seek point of their first reaction in `reaction_index` for gzipped files;
+    # `molecules` resolved beforehand are preloaded into the molecule cache of each worker
+    max_pending = 2 * workers
+    pending = deque()
+
+    def result(future):
+        if stats is None:
+            return future.result()
+        rows, worker_stats = future.result()
+        stats.merge(worker_stats)
+        return rows
+
+    initializer, initargs = (_preload_molecules, (molecules,)) if molecules else (None, ())
+    with ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs) as executor:
+        try:
+            for chunk in _read_chunks(reaction_bytes, batch_size, stats, read_ahead):
+                if filepath is not None:
+                    seek_point = reaction_index.seek_point(chunk[0][0]) if reaction_index is not None else (0, 0)
+                    future = executor.submit(_extract_span_batch, filepath, chunk, datasetID, stats is not None, options,
+                                             seek_point)
+                    size = sum(length for _, length in chunk)
+                elif stats is None:
+                    future = executor.submit(extract_reaction_batch, chunk, datasetID, None, **options)
+                    size = sum(map(len, chunk))
+                else:
+                    future = executor.submit(_extract_reaction_batch_with_stats, chunk, datasetID, options)
+                    size = sum(map(len, chunk))
+                pending.append((future, len(chunk), size))
+                if len(pending) >= max_pending:
+                    future, reactions, size = pending.popleft()
+                    yield result(future), reactions, size
+            while pending:
+                future, reactions, size = pending.popleft()
+                yield result(future), reactions, size
+        finally:
+            for future, _, _ in pending:
+                future.cancel()
+
+
+def _iter_batches_serial (filepath, datasetID, batch_size, stats, options, start=0, stop=None, read_ahead=0):
+    if stats is None and options["sections"] is None:
+        for chunk in _read_chunks(islice(iter_reaction_messages(filepath), start, stop), batch_size, None, read_ahead):
+            yield (extract_reaction_batch(chunk, datasetID, **options), len(chunk),
+                   sum(reaction.ByteSize() for reaction in chunk))
+        return
+
+    # decode reactions in extract_reaction_batch, so reading and parsing are timed separately
+    # and only the fields of the requested sections are parsed
+    reaction_bytes = islice(iter_reaction_bytes(filepath), start, stop)
+    for chunk in _read_chunks(reaction_bytes, batch_size, stats, read_ahead):
+        yield extract_reaction_batch(chunk, datasetID, stats, **options), len(chunk), sum(map(len, chunk))
+
+
+def _iter_batches_mapped (filepath, datasetID, batch_size, workers, stats, options, start=0, stop=None, molecules=None,
+                          read_ahead=0):
+    # uncompressed files are memory-mapped and indexed: reactions are parsed from slices of the map,
+    # and worker processes are sent the (offset, length) of their reactions instead of the reactions
+    with MappedDataset(filepath) as dataset:
+        if workers > 1:
+            yield from _iter_batches_parallel(dataset.spans(start, stop), datasetID, batch_size, workers, stats,
+                                              options, filepath=filepath, molecules=molecules, read_ahead=read_ahead)
+            return
+        for chunk in _read_chunks(dataset.iter_reaction_bytes(start, stop), batch_size, stats, read_ahead):
+            yield extract_reaction_batch(chunk, datasetID, stats, **options), len(chunk), sum(map(len, chunk))
+
+
+def _iter_batches_indexed (filepath, datasetID, batch_size, workers, stats, options, start=0, stop=None, molecules=None,
+                           read_ahead=0, index=True):
+    # reactions are read at the offsets recorded in the sidecar index, decompressing gzipped files
+    # from the seek point before the first reaction of the range (or of each worker's batch);
+    # a gzip file of a single member has no seek point after its start, so workers would each
+    # decompress it from the beginning: its reactions are read here and sent to the workers instead
+    with _open_index(filepath, index) as reaction_index:
+        if workers > 1 and not is_mappable_dataset(filepath) and len(reaction_index.seek_points()) <= 1:
+            yield from _iter_batches_parallel(reaction_index.iter_reaction_bytes(filepath, start, stop), datasetID,
+                                              batch_size, workers, stats, options, molecules=molecules,
+                                              read_ahead=read_ahead)
+            return
+        if workers > 1:
+            yield from _iter_batches_parallel(reaction_index.spans(start, stop), datasetID, batch_size, workers, stats,
+                                              options, filepath=filepath, reaction_index=reaction_index,
+                                              molecules=molecules, read_ahead=read_ahead)
+            return
+        for chunk in _read_chunks(reaction_index.iter_reaction_bytes(filepath, start, stop), batch_size, stats, read_ahead):
+            yield extract_reaction_batch(chunk, datasetID, stats, **options), len(chunk), sum(map(len, chunk))
+
+
+def iter_reactions (filepath, datasetID=None, batch_size=1, workers=1, progress=None, stats=None, normalised=False,
+                    start=0, stop=None, index=False, tables=None, sections=None, resolve_molecules=None, where=None,
+                    prefetch_molecules=False, pipeline=False):
+    """
+    Streams the table rows of an ORD dataset file, one reaction (or batch of reactions) at a time.
+
+    Reactions are decoded one by one from the file's wire format instead of parsing the whole
+    `Dataset`, so memory use is bounded by the largest batch rather than by the dataset size.
+    Downstream writers can flush each yielded batch before the next one is decoded.
+
+    With `workers` greater than 1, batches of serialized reactions are extracted in a
+    `ProcessPoolExecutor`. Batches are still yielded in file order, so the output is the same
+    as the serial output.
+
+    Uncompressed binary files (`.pb`) are memory-mapped and indexed with `reader_module.MappedDataset`:
+    reactions are parsed from zero-copy slices of the map, workers read their own reactions from
+    the file, and a range of reactions (`start`, `stop`) is reached without decoding the ones
+    before it. Other files are streamed, and reactions before `start` are skipped as they are read.
+
+    With `index`, binary files are read through their sidecar index (see `index_module`), which is
+    built and saved next to the file (or in the directory given as `index`) on first use. Gzipped files are then decompressed from the
+    seek point before `start` instead of from the beginning, and each worker decompresses its own
+    batch; the index also maps reaction IDs to positions (`ReactionIndex.position`).
+
+    With `tables` or `sections`, only the section extractors filling the requested tables run, and
+    the other top-level fields of each reaction are dropped before it is parsed; the tables of the
+    skipped sections are yielded empty. Unless `compound` is requested, compounds are not resolved
+    with RDKit either, so InChIKeys (and the InChI / CXSMILES in identifier cells) are only those
+    given in the dataset.
+
+    With `where`, reactions are tested against a filter as soon as they are decoded, and those that
+    do not match cost nothing more (see `filter_module`).
+
+    With `prefetch_molecules`, compounds are resolved in two phases: the distinct SMILES / InChI
+    strings of the reactions are collected and resolved with RDKit first, across `workers` processes
+    (see `resolve_dataset_molecules`), and extraction then finds every molecule in the cache.
+
+    With `pipeline`, reading, extraction and the caller's processing of the yielded rows run
+    concurrently: reactions are read and decompressed on a reader thread, extracted on another
+    thread (or dispatched from it to the worker processes), and the caller, e.g. a writer, consumes
+    the rows meanwhile. Stages are connected by bounded queues (`pipeline_module.threaded_stage`),
+    so a stage running ahead waits for the next one and memory stays bounded.
+
+    Args:
+        filepath (str): Path to the input file (either zipped or unzipped Google Protobuf format).
+        datasetID (str, optional): MDS dataset ID to put in `reaction_metadata` rows. Defaults to None,
+            in which case it is read from the file header.
+        batch_size (int, optional): Number of reactions whose rows are merged into each yielded dict. Defaults to 1.
+        workers (int, optional): Number of worker processes. Defaults to 1 (extract in this process).
+        progress (callable, optional): Called after each batch with the number of reactions and the number
+            of serialized (uncompressed) bytes they took up in the file. Defaults to None.
+        stats (ExtractionStats, optional): Records reading, decoding and section extraction times. Defaults to None.
+        normalised (bool, optional): Also yield the rows of the child tables in `normalised_module.CHILD_TABLE_COLUMNS`
+            (temperature, pressure, electrochemistry and product measurements, analysis data). Defaults to False.
+        start (int, optional): Position of the first reaction to extract. Defaults to 0.
+        stop (int, optional): Position after the last reaction to extract. Defaults to None (the end of the file).
+        index (bool or str, optional): Read reactions through the sidecar index of the file, building it if it is
+            missing or out of date; a directory to keep the index there instead of next to the file, e.g. for
+            read-only datasets. Defaults to False.
+        tables (list, optional): Tables that are needed (keys of `TABLE_COLUMNS`); requesting a child table
+            implies `normalised`. Defaults to None (every table).
+        sections (list, optional): Sections to extract in addition to those filling `tables` (keys of
+            `SECTION_TABLES`). Defaults to None.
+        resolve_molecules (bool, optional): Derive missing compound identifiers with RDKit. Defaults to None,
+            i.e. only when `tables` is None or includes `compound`.
+        where (str or callable, optional): A `filter_module.ReactionFilter` expression, e.g.
+            `"outcomes.products.measurements.type == YIELD"`, or a function of a `Reaction` returning whether
+            to extract it. Defaults to None (every reaction).
+        prefetch_molecules (bool, optional): Resolve the distinct molecules of the reactions in one batched
+            pass before extracting them. Defaults to False (resolve them as reactions are extracted).
+        pipeline (bool, optional): Read and extract on background threads, ahead of the caller, with bounded
+            queues between the stages. Defaults to False (every stage runs in turn in the caller's thread).
+
+    Yields:
+        dict: Rows per table, in the format returned by `extract_reaction`.
+
+    Example:
+        >>> from ord_rxn_converter.dataset_module import iter_reactions
+        >>> for rows in iter_reactions("example_dataset.pb.gz", batch_size=1000, workers=8):
+        ...     writer.write(rows)
+    """
+    if datasetID is None:
+        datasetID = extract_dataset_metadata(read_dataset_header(filepath))[0]
+
+    if resolve_molecules is None:
+        resolve_molecules = tables is None or "compound" in tables
+    if tables is not None:
+        normalised = normalised or any(table in CHILD_TABLE_COLUMNS for table in tables)
+    options = {"normalised": normalised, "sections": select_sections(tables, sections),
+               "resolve_molecules": resolve_molecules, "where": compile_filter(where)}
+    molecules = None
+    if prefetch_molecules and resolve_molecules:
+        molecules = resolve_dataset_molecules(filepath, workers, start, stop, index, options["sections"], options["where"],
+                                              stats)
+
+    read_ahead = QUEUE_SIZE if pipeline else 0
+    if index:
+        batches = _iter_batches_indexed(filepath, datasetID, batch_size, workers, stats, options, start, stop, molecules,
+                                        read_ahead, index)
+    elif is_mappable_dataset(filepath):
+        batches = _iter_batches_mapped(filepath, datasetID, batch_size, workers, stats, options, start, stop, molecules,
+                                       read_ahead)
+    elif workers > 1:
+        batches = _iter_batches_parallel(islice(iter_reaction_bytes(filepath), start, stop), datasetID, batch_size,
+                                         workers, stats, options, molecules=molecules, read_ahead=read_ahead)
+    else:
+        batches = _iter_batches_serial(filepath, datasetID, batch_size, stats, options, start, stop, read_ahead)
+    if pipeline:
+        batches = threaded_stage(batches, name='ord-rxn-converter-extractor')
+
+    for rows, reactions, size in batches:
+        yield rows
+        if progress is not None:
+            progress(reactions, size)
+
+
+def iter_reaction_rows (reaction_bytes, datasetID, batch_size=1, workers=1, progress=None, normalised=False):
+    """
+    Extracts the table rows of serialized reactions that are not read from a dataset file in order,
+    e.g. the new and changed reactions of a dataset found by `incremental_module.diff_dataset`.
+
+    Args:
+        reaction_bytes (iterable): Wire-format encodings of `reaction_pb2.Reaction` messages.
+        datasetID (str): MDS dataset ID to put in `reaction_metadata` rows.
+        batch_size (int, optional): Number of reactions whose rows are merged into each yielded dict. Defaults to 1.
+        workers (int, optional): Number of worker processes. Defaults to 1 (extract in this process).
+        progress (callable, optional): Called after each batch with the number of reactions and bytes. Defaults to None.
+        normalised (bool, optional): Also yield the rows of the child tables of `normalised_module`. Defaults to False.
+
+    Yields:
+        dict: Rows per table, in the format returned by `extract_reaction`.
+    """
+    if workers > 1:
+        batches = _iter_batches_parallel(reaction_bytes, datasetID, batch_size, workers, None, {"normalised": normalised})
+    else:
+        batches = ((extract_reaction_batch(chunk, datasetID, normalised=normalised), len(chunk), sum(map(len, chunk)))
+                   for chunk in _chunked(reaction_bytes, batch_size))
+
+    for rows, reactions, size in batches:
+        yield rows
+        if progress is not None:
+            progress(reactions, size)
+
+
+def extract_dataset (filepath, compounds=None, persons=None, workers=1, batch_size=256, stats=None, categorical=False,
+                     normalised=False, start=0, stop=None, index=False, tables=None, sections=None, resolve_molecules=None,
+                     where=None, prefetch_molecules=False, pipeline=False):
     """
     Extracts all structured data from an ORD dataset file and organizes it into a dictionary of DataFrames.
 
-    This function loads a dataset from a `.pb` or `.pbtxt` file (compressed or uncompressed), then extracts and organizes
-    its reactions and associated metadata into tabular form. Each component of the reaction—identifiers, inputs, conditions, 
+    This function streams the reactions of a `.pb` or `.pbtxt` file (compressed or uncompressed) with `iter_reactions`, then
+    extracts and organizes them and the dataset metadata into tabular form. Each component of the reaction—identifiers, inputs, conditions, 
     setup, workups, outcomes, and more—is parsed into a separate `pandas.DataFrame`.
 
     If compound or person tables are provided, they will be updated to include any new compounds or people found during extraction.
+    Compounds are deduplicated on InChIKey and persons on ORCiD through a `CompoundRegistry` / `PersonRegistry`; a registry
+    may be passed instead of a DataFrame to share it across several datasets.
+
+    Reaction tables are accumulated column by column with `table_module.TableBuilder`, so numeric columns
+    come out as float64 / int64 / bool (nullable when values are missing) and unit columns as categoricals.
+
+    With `tables` or `sections`, only those tables are returned and only the section extractors that
+    fill them run (see `iter_reactions`); e.g. `tables=["reaction_identifiers", "reaction_outcomes"]`
+    decodes neither inputs nor conditions and, as `compound` is not requested, makes no RDKit calls.
+    With `where`, only the reactions matching a filter are extracted (see `filter_module`); the others
+    are decoded but never reach a section extractor.
 
     Args:
         filepath (str): Path to the input file (either zipped or unzipped Google Protobuf format).
-        compounds (pd.DataFrame, optional): Existing compound table to update or append to. Defaults to an empty DataFrame.
-        persons (pd.DataFrame, optional): Existing person table to update or append to. Defaults to an empty DataFrame.
+        compounds (pd.DataFrame or CompoundRegistry, optional): Existing compound table to update or append to. Defaults to None (an empty table).
+        persons (pd.DataFrame or PersonRegistry, optional): Existing person table to update or append to. Defaults to None (an empty table).
+        workers (int, optional): Number of processes extracting reactions in parallel. Defaults to 1.
+        batch_size (int, optional): Number of reactions sent to a worker at a time. Defaults to 256.
+        stats (ExtractionStats, optional): Collects wall time, calls and rows per stage and molecule cache
+            hit counts (see `stats_module`). Defaults to None (no instrumentation).
+        categorical (bool, optional): Return enum-valued columns (units, reaction roles, workup and vessel types, ...)
+            as `pd.Categorical` with the protobuf enum value names as categories. Defaults to False.
+        normalised (bool, optional): Also return the flat child tables `temperature_measurements`, `pressure_measurements`,
+            `electrochemistry_measurements`, `product_measurements` and `analysis_data`, keyed on `reactionID` and
+            `outcomeKey` (see `normalised_module`). Defaults to False.
+        start (int, optional): Position of the first reaction to extract. Defaults to 0.
+        stop (int, optional): Position after the last reaction to extract; together with `start`, e.g. reactions
+            10000 to 20000 of an uncompressed file are read directly through its index. Defaults to None (the end of the file).
+        index (bool or str, optional): Read reactions through the sidecar index of the file (see `index_module`), building
+            it if it is missing or out of date; a directory to keep the index in instead of next to the file.
+            Defaults to False.
+        tables (list, optional): Tables to return (keys of `TABLE_COLUMNS`). Defaults to None (every table;
+            child tables only with `normalised`).
+        sections (list, optional): Sections to extract (keys of `SECTION_TABLES`) when `tables` is not given;
+            `dataset_metadata` and the tables of these sections are returned. Defaults to None.
+        resolve_molecules (bool, optional): Derive missing compound identifiers with RDKit. Defaults to None,
+            i.e. only when the `compound` table is returned.
+        where (str or callable, optional): Filter expression or function selecting the reactions to extract
+            (see `iter_reactions`). Defaults to None (every reaction).
+        prefetch_molecules (bool, optional): Resolve the distinct SMILES / InChI strings of the dataset with RDKit
+            in one batched pass across `workers` processes before extracting reactions. Defaults to False.
+        pipeline (bool, optional): Read and extract reactions on background threads while the tables are built
+            (see `iter_reactions`). Defaults to False.
 
     Returns:
         dict: A dictionary containing the following keys, each mapping to a `pandas.DataFrame`:
@@ -47,159 +769,96 @@ def extract_dataset (filepath, compounds=pd.DataFrame(), persons=pd.DataFrame())
             - `"reaction_outcomes"`: Products and analyses of reaction outcomes.
             - `"compound"`: A table of all compounds involved across reactions.
             - `"person"`: A table of contributors extracted from provenance.
+            - With `normalised`, also the child tables of `normalised_module.CHILD_TABLE_COLUMNS`.
+
+        With `tables` or `sections`, only the requested tables.
 
     Raises:
         FileNotFoundError: If the `filepath` does not exist.
-        ValueError: If the Protobuf file is invalid or does not conform to `dataset_pb2.Dataset`.
+        ValueError: If the Protobuf file is invalid or does not conform to `dataset_pb2.Dataset`,
+            or if a requested table or section is unknown, or `where` is an invalid filter expression.
 
     Example:
         >>> from ord_rxn_converter.dataset_module import extract_dataset
         >>> out = extract_dataset("example_dataset.pb")
         >>> out["reaction_metadata"].head()
     """
-    enums_data = extract_all_enums(reaction_pb2)
+    # pandas is only needed to build the output tables, so it is not imported with the module
+    import pandas as pd
 
-    # 'load_message' to extract dataset from file path?
-    dataset = load_message(filepath, dataset_pb2.Dataset)
+    # read dataset-level fields only; reactions are streamed below
+    dataset = read_dataset_header(filepath)
 
-    #initialize lists for compiling generated output dataframes 
-    reaction_metadata = []
-    reaction_identifiers = []
-    input_components = []  #being weird for now
-    input_addition = []
-    reaction_setup = []
-    reaction_conditions = []
-    reaction_notes_observations = []
-    reaction_workups = []
-    reaction_outcomes = []
+    #work out the output tables and the sections filling them
+    projection = select_sections(tables, sections)
+    where = compile_filter(where)
+    output_tables = _output_tables(tables, sections, normalised)
+    normalised = any(table in CHILD_TABLE_COLUMNS for table in output_tables)
+    if resolve_molecules is None:
+        resolve_molecules = "compound" in output_tables
 
-    #persons column headers
-    persons_cols = ['ORCiD', 'username', 'name', 'organization', 'email']
-    #compounds column headers
-    compounds_cols = ['InChIKey', 'smiles', 'inchi', 'iupacName', 'name', 'casNumber', 'pubchemCID', 'chemspiderID', 'cxSmiles', 'unspecified', 'custom', 'molblock', 'xyz', 'uniprotID', 'pbdID', 'aminoAcidSequence', 'helm', 'mdl']
+    #initialize column-wise builders of the generated output dataframes
+    builders = {table: TableBuilder(table, TABLE_COLUMNS[table], categorical) for table in output_tables
+                if table in REACTION_TABLE_COLUMNS or table in CHILD_TABLE_COLUMNS}
 
     #check that persons cols match expectation
-    if persons.columns.tolist() != persons_cols:
-        print("Persons column input headers inoperable - creating new DataFrame")
-        #init column headers for empty DF
-        persons = pd.DataFrame(columns=persons_cols)
+    if isinstance(persons, PersonRegistry):
+        person_registry = persons
+    elif persons is None:
+        person_registry = PersonRegistry()
+    else:
+        if persons.columns.tolist() != PERSON_COLUMNS:
+            print("Persons column input headers inoperable - creating new DataFrame")
+            #init column headers for empty DF
+            persons = pd.DataFrame(columns=PERSON_COLUMNS)
+        person_registry = PersonRegistry(persons)
 
     #check that the compounds cols match expectation
-    if compounds.columns.tolist() != compounds_cols:
-        print("Compounds column input headers inoperable - creating new DataFrame") 
-        compounds = pd.DataFrame(columns=compounds_cols)
+    if isinstance(compounds, CompoundRegistry):
+        compound_registry = compounds
+    elif compounds is None:
+        compound_registry = CompoundRegistry()
+    else:
+        if compounds.columns.tolist() != COMPOUND_COLUMNS:
+            print("Compounds column input headers inoperable - creating new DataFrame") 
+            compounds = pd.DataFrame(columns=COMPOUND_COLUMNS)
+        compound_registry = CompoundRegistry(compounds)
 
 
     # generate dataset metadata table
     dataset_metadata = extract_dataset_metadata(dataset)
     
-    # Set a reaction to extract data from: 
-    for reaction in dataset.reactions:        
-        # extract reactionID
-        rxnID = re.split('-', reaction.reaction_id)
-        reactionID = f"mds_reaction-{rxnID[1]}" 
-
-        provenance = reaction.provenance 
-        # extract reaction metadata (reaction IDs + provenance); 
-        if hasattr(reaction, 'provenance') and reaction.provenance:    #check if provenance attribtue exists before calling
-            rxn_metadata, person_metadata = extract_reaction_metadata(provenance, reactionID)
-            rxn_metadata = [dataset_metadata[0], reactionID] + rxn_metadata    #dataset_metadata[0] is datasetID
-            reaction_metadata.append(rxn_metadata)
-
-            #check if person table needs update
-            for person in person_metadata:
-                if 'ORCiD' in persons.columns and not persons['ORCiD'].str.contains(person[2]).any():
-                   #update persons table if it does not exist
-                   persons.loc[len(persons)] = person
-       
-        # extract reaction identifiers and update compound table if needed
-        if hasattr(reaction, 'identifiers') and reaction.identifiers:     #check if exists before calling
-            reaction_identifiers.append(extract_reaction_identifiers(reaction.identifiers, reactionID))
-
-        # extract reaction inputs, update compound table, extract reaction addition
-        if hasattr(reaction, 'inputs') and reaction.inputs:
-            #extract reaction inputs
-            input_components, compound_identifiers = extract_input_components(reaction.inputs, reactionID)  #append each list extracted output separately
-          #  print("PRINTING COMPOUND IDENTIFIERS:", compound_identifiers)
-            for identifier in compound_identifiers:
-                if 'InChIKey' in compounds.columns and identifier[0] and not compounds['InChIKey'].str.contains(identifier[0]).any():  #check if contains InChIKey
-                    #update compounds table if it does not exist
-                    #compounds = pd.concat([compounds, identifier], ignore_index=True)
-                    compounds.loc[len(compounds)] = identifier
-
-
-            #extract reaction addition
-            input_addition.extend(extract_input_addition(reaction.inputs, reactionID))
-       
-        # extract reaction setup
-        if hasattr(reaction, 'setup') and reaction.setup:
-            reaction_setup.append(extract_reaction_setup(reaction.setup, reactionID))
-
-        # extract reaction conditions  
-        if hasattr(reaction, 'conditions') and reaction.conditions:
-            reaction_conditions.append(extract_reaction_conditions(reaction.conditions, reactionID))
-            
-
-        # extract reaction notes & observations
-        if hasattr(reaction, 'notes') and hasattr(reaction, 'observations') and reaction.notes and reaction.observations:
-            reaction_notes_observations.append(extract_notes_observations(reactionID, reaction.notes, reaction.observations))
-
-        # extract reaction workups
-        if hasattr(reaction, 'workups') and reaction.workups:
-            reaction_workups.extend(extract_reaction_workups(reaction.workups, reactionID))
-
-        # extract reaction outcomes 
-        if hasattr(reaction, 'outcomes') and reaction.outcomes:
-            outcomes, outcomes_identifiers = extract_reaction_outcomes(reactionID, reaction.outcomes)
-            reaction_outcomes.extend(outcomes)
-            for identifier in outcomes_identifiers: 
-                if 'InChIKey' in compounds.columns and identifier[0] and not compounds['InChIKey'].str.contains(identifier[0]).any():  #check if contains InChIKey
-                #update compounds table if it does not exist
-                #compounds = pd.concat([compounds, identifier], ignore_index=True)
-                    compounds.loc[len(compounds)] = identifier
-            
-    
-    # return dictionary of dataframes 
-
-    #define column headers for each dataframe
-    dataset_cols = ['datasetID', 'ORDdatasetID', 'datasetName', 'datasetDescription']
-    reaction_meta_cols = ['datasetID', 'reactionID', 'ORDreactionID', 'experimenter', 
-                            'provenanceCity', 'experimentStart', 'doi', 'patent', 'publicationURL', 
-                            'recordCreatedTime', 'recordCreatedPerson', 'recordCreatedDetails', 'modifiedTimes', 'modifiedPeople']
-    reaction_identifiers_cols = ['reactionID', 'reactionCXSMILES', 'reactionSMILES', 'RDFile', 'RInChI', 
-                                'reactionType', 'unspecified', 'custom', 'identifierDetails', 'isMapped']
-    input_comps_cols = ['reactionID', 'inputKey', 'compoundIdenfiers', 'amount', 'amountUnit', 'reactionRole',
-                        'isLimiting', 'compoundPreparation', 'compoundSource', 'features', 'analyses', 'texture']
-    input_addition_cols = ['reactionID', 'inputKey', 'additionOrder', 'additionTime', 'timeUnit', 'additionSpeed', 
-                            'additionDuration', 'durationUnit', 'additionDevice', 'additionTemperature', 
-                            'temperatureUnit', 'flowRate', 'flowRateUnit', 'texture', 'textureDetails']
-    reaction_setup_cols = ['reactionID', 'vessel', 'vesselMaterial', 'vesselVolume', 'volumeUnit', 'vesselPreparations', 
-                            'vesselAttachments', 'isAutomated', 'automationPlatform', 'automationCode', 
-                            'reactionEnvironment']
-    reaction_conds_cols = ['reactionID', 'temperatureConditions', 'pressureConditions', 'stirringConditions', 
-                            'illuminationConditions', 'electrochemistryConditions', 'flowConditions', 
-                            'reflux', 'pH', 'conditionsAreDynamic', 'conditionDetails']
-    reaction_notes_cols = ['reactionID', 'isHeterogeneous', 'formsPrecipitates', 'isExothermic', 'offGasses', 
-                            'isSensitiveToMoisture', 'isSensitiveToOxygen', 'isSensitivetoLight', 'safetyNotes', 
-                            'procedureDetails', 'observations']
-    reaction_workups_cols = ['reactionID', 'workupType', 'workupDetails', 'workupDuration', 'durationUnit', 
-                            'inputComponents', 'inputAdditionDetails', 'temperatureConditions', 'keepPhase', 
-                            'stirringConditions', 'workupTargetPH', 'isAutomated']
-    reaction_outcomes_cols = ['reactionID', 'outcomeKey', 'reactionTime', 'timeUnit', 'outcomeConversion', 'products', 'analyses']
+    # extract reactions as they are decoded from the file, in file order
+    for rows in iter_reactions(filepath, dataset_metadata[0], batch_size=batch_size, workers=workers, stats=stats,
+                               normalised=normalised, start=start, stop=stop, index=index,
+                               sections=projection, resolve_molecules=resolve_molecules, where=where,
+                               prefetch_molecules=prefetch_molecules, pipeline=pipeline):
+        for table in builders:
+            builders[table].extend(rows[table])
+
+        #update persons and compounds tables with entries not seen yet (keyed on ORCiD / InChIKey)
+        for table, registry in (("person", person_registry), ("compound", compound_registry)):
+            if table not in output_tables:
+                continue
+            if stats is None:
+                registry.extend(rows[table])
+            else:
+                tick = time.perf_counter()
+                added = registry.extend(rows[table])
+                stats.add(f"{table}_registry", time.perf_counter() - tick, added)
 
     #create dictionary of dataframes to output
-    out = {
-        "dataset_metadata" : pd.DataFrame([dataset_metadata], columns=dataset_cols),
-        "reaction_metadata" : pd.DataFrame(reaction_metadata, columns=reaction_meta_cols), 
-        "reaction_identifiers" : pd.DataFrame(reaction_identifiers, columns=reaction_identifiers_cols) , 
-        "input_components" : pd.DataFrame(input_components, columns=input_comps_cols),
-        "input_addition" : pd.DataFrame(input_addition, columns=input_addition_cols),
-        "reaction_setup" : pd.DataFrame(reaction_setup, columns=reaction_setup_cols), 
-        "reaction_conditions" : pd.DataFrame(reaction_conditions, columns=reaction_conds_cols), 
-        "reaction_notes" : pd.DataFrame(reaction_notes_observations, columns=reaction_notes_cols),
-        "reaction_workups" : pd.DataFrame(reaction_workups, columns=reaction_workups_cols),
-        "reaction_outcomes" : pd.DataFrame(reaction_outcomes, columns=reaction_outcomes_cols),
-        "compound" : compounds,
-        "person" : persons
-    }
-    return out
\ No newline at end of file
+    if stats is not None: tick = time.perf_counter()
+    out = {}
+    for table in output_tables:
+        if table == "dataset_metadata":
+            out[table] = pd.DataFrame([dataset_metadata], columns=dataset_cols)
+        elif table == "compound":
+            out[table] = compound_registry.to_dataframe()
+        elif table == "person":
+            out[table] = person_registry.to_dataframe()
+        else:
+            out[table] = builders[table].to_dataframe()
+    if stats is not None: stats.add("dataframe", time.perf_counter() - tick, sum(map(len, out.values())), len(out))
+
+    return out
@@ -0,0 +1,319 @@
+# import requirements:
+import ast
+import re
+from google.protobuf.descriptor import FieldDescriptor
+from google.protobuf.message import Message
+from ord_schema.proto import reaction_pb2
+
+# =============================================================================
+#               FILTERS EVALUATED ON REACTIONS BEFORE EXTRACTION
+# =============================================================================
+
+# tokens of filter expressions: numbers, quoted strings, operators and dotted field paths / names
+_TOKEN = re.compile(r'''\s*(?:
+    (?P<number>-?\d+(?:\.\d*)?(?:[eE][-+]?\d+)?)
+  | (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+  | (?P<operator>==|!=|<=|>=|<|>|\(|\)|\[|\]|,)
+  | (?P<name>[A-Za-z_][A-Za-z0-9_.]*)
+)''', re.VERBOSE)
+
+KEYWORDS = ('and', 'or', 'not', 'in', 'true', 'false')
+
+COMPARISONS = {
+    '==': lambda value, literal: value == literal,
+    '<': lambda value, literal: value < literal,
+    '<=': lambda value, literal: value <= literal,
+    '>': lambda value, literal: value > literal,
+    '>=': lambda value, literal: value >= literal,
+}
+
+
+def _tokenize(expression):
+    tokens = []
+    position = 0
+    expression = expression.rstrip()
+    while position < len(expression):
+        match = _TOKEN.match(expression, position)
+        if match is None or match.end() == position:
+            raise ValueError(f"Invalid filter expression at {expression[position:]!r}")
+        kind = match.lastgroup
+        text = match.group(kind)
+        if kind == 'name' and text in KEYWORDS:
+            kind = 'keyword'
+        tokens.append((kind, text))
+        position = match.end()
+    return tokens
+
+
+def _is_map(field):
+    return field.message_type is not None and field.message_type.GetOptions().map_entry
+
+
+def _is_repeated(field):
+    return field.label == FieldDescriptor.LABEL_REPEATED
+
+
+def _check_path(path):
+    # validates a field path against the Reaction message once, so typos fail before any reaction is read;
+    # returns the path and the descriptor of the field it ends in
+    descriptor = reaction_pb2.Reaction.DESCRIPTOR
+    field = None
+    for position, name in enumerate(path):
+        if descriptor is None:
+            raise ValueError(f"Field {'.'.join(path[:position])!r} has no field {name!r}")
+        field = descriptor.fields_by_name.get(name)
+        if field is None:
+            raise ValueError(f"{descriptor.name} has no field {name!r} (in {'.'.join(path)!r})")
+        if _is_map(field):
+            field = field.message_type.fields_by_name['value']
+        descriptor = field.message_type
+    return tuple(path), field
+
+
+def _check_enum_name(path, field, name):
+    # bare names are enum value names, so they must be values of the enum the path ends in
+    if field.enum_type is None:
+        raise ValueError(f"{'.'.join(path)!r} is not an enum field; quote the string {name!r}")
+    if name not in field.enum_type.values_by_name:
+        values = ', '.join(value.name for value in field.enum_type.values)
+        raise ValueError(f"{name!r} is not a value of {field.enum_type.full_name} (in {'.'.join(path)!r}); "
+                         f"valid values: {values}")
+    return name
+
+
+class _Parser:
+
+    # recursive-descent parser producing a tree of tuples, which can be pickled to worker processes:
+    #   expression := conjunction ('or' conjunction)*
+    #   conjunction := negation ('and' negation)*
+    #   negation := 'not' negation | '(' expression ')' | path [operator literal | 'in' '[' literal, ... ']']
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.position = 0
+
+    def peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else (None, None)
+
+    def take(self, text=None):
+        kind, value = self.peek()
+        if kind is None or (text is not None and value != text):
+            raise ValueError(f"Expected {text or 'more input'!r} in filter expression, found {value!r}")
+        self.position += 1
+        return kind, value
+
+    def parse(self):
+        tree = self.expression()
+        if self.position != len(self.tokens):
+            raise ValueError(f"Unexpected {self.peek()[1]!r} in filter expression")
+        return tree
+
+    def expression(self):
+        tree = self.conjunction()
+        while self.peek() == ('keyword', 'or'):
+            self.take()
+            tree = ('or', tree, self.conjunction())
+        return tree
+
+    def conjunction(self):
+        tree = self.negation()
+        while self.peek() == ('keyword', 'and'):
+            self.take()
+            tree = ('and', tree, self.negation())
+        return tree
+
+    def negation(self):
+        if self.peek() == ('keyword', 'not'):
+            self.take()
+            return ('not', self.negation())
+        if self.peek() == ('operator', '('):
+            self.take()
+            tree = self.expression()
+            self.take(')')
+            return tree
+
+        kind, text = self.take()
+        if kind != 'name':
+            raise ValueError(f"Expected a field path in filter expression, found {text!r}")
+        path, field = _check_path(text.split('.'))
+
+        kind, text = self.peek()
+        if kind == 'operator' and text in ('==', '!=', '<', '<=', '>', '>='):
+            self.take()
+            return ('compare', path, text, self.literal(path, field))
+        if (kind, text) == ('keyword', 'in'):
+            self.take()
+            self.take('[')
+            literals = [self.literal(path, field)]
+            while self.peek() == ('operator', ','):
+                self.take()
+                literals.append(self.literal(path, field))
+            self.take(']')
+            return ('in', path, tuple(literals))
+        return ('has', path)
+
+    def literal(self, path, field):
+        kind, text = self.take()
+        if kind == 'number':
+            return float(text)
+        if kind == 'string':
+            return ast.literal_eval(text)
+        if kind == 'keyword' and text in ('true', 'false'):
+            return text == 'true'
+        if kind == 'name':
+            # bare names are enum value names, e.g. REACTION_SMILES or CATALYST
+            return _check_enum_name(path, field, text)
+        raise ValueError(f"Expected a value in filter expression, found {text!r}")
+
+
+def _field_values(message, name):
+    # values of one field of a message: repeated fields and map values are flattened, unset messages
+    # give no value, and enums are given by value name
+    field = message.DESCRIPTOR.fields_by_name[name]
+    value = getattr(message, name)
+    if _is_map(field):
+        field = field.message_type.fields_by_name['value']
+        values = list(value.values())
+    elif _is_repeated(field):
+        values = list(value)
+    elif field.message_type is not None:
+        return [value] if message.HasField(name) else []
+    else:
+        values = [value]
+    if field.enum_type is not None:
+        names = field.enum_type.values_by_number
+        values = [names[number].name if number in names else number for number in values]
+    return values
+
+
+def resolve_path(reaction, path) -> list:
+
+    """
+    Collects the values a field path reaches in a reaction.
+
+    Each step descends into every element of repeated fields and every value of map fields, so
+    `outcomes.products.measurements.type` gives the type of every measurement of every product
+    of every outcome. Unset message fields give no value.
+
+    Args:
+        reaction (reaction_pb2.Reaction): The reaction.
+        path (tuple): Field names, e.g. `("inputs", "components", "reaction_role")`.
+
+    Returns:
+        list: The values reached, with enum values given by name.
+    """
+
+    values = [reaction]
+    for name in path:
+        values = [value for message in values for value in _field_values(message, name)]
+    return values
+
+
+def _is_set(value):
+    if isinstance(value, Message):
+        return value.ByteSize() > 0
+    return bool(value) and value != 'UNSPECIFIED'
+
+
+def _evaluate(tree, reaction):
+    kind = tree[0]
+    if kind == 'or':
+        return _evaluate(tree[1], reaction) or _evaluate(tree[2], reaction)
+    if kind == 'and':
+        return _evaluate(tree[1], reaction) and _evaluate(tree[2], reaction)
+    if kind == 'not':
+        return not _evaluate(tree[1], reaction)
+
+    values = resolve_path(reaction, tree[1])
+    if kind == 'has':
+        return any(_is_set(value) for value in values)
+    if kind == 'in':
+        return any(value in tree[2] for value in values)
+
+    operator, literal = tree[2], tree[3]
+    if operator == '!=':
+        return not any(value == literal for value in values)
+    compare = COMPARISONS[operator]
+    for value in values:
+        try:
+            if compare(value, literal):
+                return True
+        except TypeError:
+            continue
+    return False
+
+
+class ReactionFilter:
+
+    """
+    A reaction filter written in a small expression language over `Reaction` fields.
+
+    Field paths are dotted field names of `reaction.proto`, starting from the `Reaction`
+    message; repeated fields and map values (e.g. `inputs`) are searched element by element, so
+    a comparison holds if it holds for any value the path reaches (`!=` holds if none is equal).
+    Enum fields compare by value name. A path on its own tests that some value is set.
+    Comparisons (`==`, `!=`, `<`, `<=`, `>`, `>=`, `in [...]`) combine with `and`, `or`,
+    `not` and parentheses; values are numbers, quoted strings, `true` / `false` or enum value names.
+
+    The filter only reads the top-level fields in `fields`, so it works on reactions cut down
+    with `reader_module.project_reaction_bytes`. Instances can be pickled to worker processes.
+
+    Args:
+        expression (str): The filter expression.
+
+    Raises:
+        ValueError: If the expression cannot be parsed, names a field that does not exist, or compares
+            a field with a bare name that is not a value of its enum.
+
+    Example:
+        >>> from filter_module import ReactionFilter
+        >>> has_yield = ReactionFilter("outcomes.products.measurements.type == YIELD")
+        >>> catalysed = ReactionFilter("inputs.components.reaction_role == CATALYST and identifiers.type == REACTION_SMILES")
+        >>> catalysed(reaction)
+        True
+    """
+
+    def __init__(self, expression):
+        self.expression = expression
+        self.tree = _Parser(_tokenize(expression)).parse()
+        self.fields = {reaction_pb2.Reaction.DESCRIPTOR.fields_by_name[path[0]].number for path in self._paths(self.tree)}
+
+    def _paths(self, tree):
+        if tree[0] in ('or', 'and'):
+            return self._paths(tree[1]) + self._paths(tree[2])
+        if tree[0] == 'not':
+            return self._paths(tree[1])
+        return [tree[1]]
+
+    def __call__(self, reaction) -> bool:
+        return _evaluate(self.tree, reaction)
+
+    def __repr__(self):
+        return f"ReactionFilter({self.expression!r})"
+
+
+def compile_filter(where):
+
+    """
+    Turns a `where` argument into a callable reaction filter.
+
+    Args:
+        where (str or callable): A `ReactionFilter` expression, or a function taking a
+            `reaction_pb2.Reaction` and returning whether to keep it (with worker processes, a
+            module-level function, so that it can be pickled).
+
+    Returns:
+        callable: The filter; None if `where` is None.
+
+    Raises:
+        ValueError: If `where` is an invalid expression.
+        TypeError: If `where` is neither a string nor callable.
+    """
+
+    if where is None or isinstance(where, ReactionFilter):
+        return where
+    if isinstance(where, str):
+        return ReactionFilter(where)
+    if callable(where):
+        return where
+    raise TypeError(f"where must be a filter expression or a callable, not {type(where).__name__}")
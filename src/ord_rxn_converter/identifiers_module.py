@@ -1,12 +1,9 @@
 # import requirements: 
 from ord_schema.proto import dataset_pb2, reaction_pb2
 from google.protobuf.message import Message
-from rdkit import Chem
-from rdkit.Chem import AllChem
-from ord_rxn_converter.utility_functions_module import extract_all_enums
-
-#generate enums_data to be accessible here TODO - have importable object instead..?
-enums_data = extract_all_enums(reaction_pb2)
+from collections import namedtuple
+from ord_rxn_converter.utility_functions_module import enums_data
+from ord_rxn_converter.molecule_cache_module import get_molecule_cache
 
 def extract_reaction_identifiers(identifiers, reactionID: str) -> list:
     """
@@ -59,41 +56,46 @@ def extract_reaction_identifiers(identifiers, reactionID: str) -> list:
 
     return reaction_identifiers
 
-from rdkit import Chem
+# identifier types in the column order of the compound table
+COMPOUND_IDENTIFIER_TYPES = ['INCHI_KEY', 'SMILES', 'INCHI', 'IUPAC_NAME', 'NAME', 'CAS_NUMBER', 'PUBCHEM_CID', 'CHEMSPIDER_ID', 'CXSMILES', 
+    'UNSPECIFIED', 'CUSTOM', 'MOLBLOCK', 'XYZ', 'UNIPROT_ID', 'PDB_ID', 'AMINO_ACID_SEQUENCE', 'HELM', 'MDL']
 
-def extract_compound_identifiers(compound_identifiers):
+# everything the extractors need to know about one compound
+ResolvedCompound = namedtuple('ResolvedCompound', ['inchi_key', 'identifiers', 'compound_row'])
+
+def resolve_compound(compound_identifiers, resolve_molecules=True):
 
     """
-    Extracts compound identifier values and ensures key identifiers are present.
+    Resolves the identifiers of one compound in a single pass.
 
-    Generates missing InChI keys and CXSMILES if possible using RDKit.
+    Reads the `CompoundIdentifier` messages once, derives a missing InChI / InChIKey and CXSMILES
+    with RDKit (through the molecule cache, so each SMILES or InChI string is parsed into at most
+    one RDKit `Mol`), and returns both the identifier dictionary and the compound table row.
+    A given InChI provides the InChIKey (computed from the InChI string, without a `Mol`), so the key
+    keeps its stereochemistry and agrees with the INCHI column; the SMILES provides the CXSMILES, and
+    the InChI and InChIKey only when no InChI is given. At most one `Mol` is built per compound.
 
     Args:
         compound_identifiers (list): A list of `CompoundIdentifier` protobuf messages.
+        resolve_molecules (bool, optional): Derive missing identifiers with RDKit. Without it only the
+            identifiers given in the dataset are returned, e.g. when the compound table is not needed. Defaults to True.
 
     Returns:
-        tuple: 
-            - str: InChI key of the compound.
-            - dict: Dictionary of identifier types to their values.
+        ResolvedCompound: A named tuple with
+            - inchi_key (str or None): InChI key of the compound.
+            - identifiers (dict): Dictionary of identifier types to their values, including derived ones.
+            - compound_row (list): Identifier values in the order of `COMPOUND_IDENTIFIER_TYPES`,
+              i.e. one row of the compound table.
 
     Example:
-        >>> from identifiers_module import extract_compound_identifiers
-        >>> compound_identifiers = reaction.inputs['...'].components[0].identifiers
-        >>> extract_compound_identifiers(compound_identifiers)
-        ('ROSDSFDQCJNGOL-UHFFFAOYSA-N', {'NAME': 'dimethylamine', 'SMILES': 'CCO', ...})
+        >>> from identifiers_module import resolve_compound
+        >>> compound = resolve_compound(reaction.inputs['...'].components[0].identifiers)
+        >>> compound.inchi_key, compound.compound_row[1]
+        ('LFQSCWFLJHTTHZ-UHFFFAOYSA-N', 'CCO')
     """
-    
-    identifier_type_list = []
-    identifier_details_list = []
-    identifier_value_list = []
-
-    for identifier in compound_identifiers:
-        identifier_type = enums_data['CompoundIdentifier.CompoundIdentifierType'][identifier.type]
-        identifier_type_list.append(identifier_type)
-        identifier_value_list.append(identifier.value)
-        identifier_details_list.append(identifier.details)
 
-    identifier_dict = dict(zip(identifier_type_list, identifier_value_list))
+    compound_types = enums_data['CompoundIdentifier.CompoundIdentifierType']
+    identifier_dict = {compound_types[identifier.type]: identifier.value for identifier in compound_identifiers}
 
     # Safely access keys - get() ensures they return None if they do not exist
     inchi_key = identifier_dict.get('INCHI_KEY')
@@ -101,33 +103,130 @@ def extract_compound_identifiers(compound_identifiers):
     smiles = identifier_dict.get('SMILES')
     cxsmiles = identifier_dict.get('CXSMILES')
 
+    if not resolve_molecules:
+        compound_row = [identifier_dict.get(identifier_type) for identifier_type in COMPOUND_IDENTIFIER_TYPES]
+        return ResolvedCompound(inchi_key, identifier_dict, compound_row)
+
+    # RDKit results are memoised per SMILES / InChI string
+    molecule_cache = get_molecule_cache()
+
+    # same lookups as molecule_keys
     if inchi_key is None and inchi:
-        rdkit_mol = Chem.MolFromInchi(inchi)
-        if rdkit_mol:
-            identifier_dict['INCHI_KEY'] = Chem.MolToInchiKey(rdkit_mol)
+        # the InChIKey is computed from the InChI string, without a Mol
+        resolved = molecule_cache.resolve('INCHI', inchi)
+        if resolved:
+            identifier_dict['INCHI_KEY'] = resolved.inchi_key
             inchi_key = identifier_dict.get('INCHI_KEY')
 
-    elif inchi_key is None and inchi is None and smiles:
-        rdkit_mol = Chem.MolFromSmiles(smiles)
-        if rdkit_mol:
-            identifier_dict['INCHI'] = Chem.MolToInchi(rdkit_mol)
-            identifier_dict['INCHI_KEY'] = Chem.MolToInchiKey(rdkit_mol)
+    if smiles and (cxsmiles is None or (inchi_key is None and inchi is None)):
+        resolved = molecule_cache.resolve('SMILES', smiles)
+        if inchi_key is None and inchi is None and resolved:
+            identifier_dict['INCHI'] = resolved.inchi
+            identifier_dict['INCHI_KEY'] = resolved.inchi_key
             inchi_key = identifier_dict.get('INCHI_KEY')
+        if cxsmiles is None:
+            identifier_dict['CXSMILES'] = resolved.cxsmiles if resolved else None
+
+    compound_row = [identifier_dict.get(identifier_type) for identifier_type in COMPOUND_IDENTIFIER_TYPES]
 
-    if smiles and cxsmiles is None:
-        rdkit_mol = Chem.MolFromSmiles(smiles)
-        identifier_dict['CXSMILES'] = Chem.MolToCXSmiles(rdkit_mol)
-    
-    else: pass
+    #TODO - figure out what to do with identifier details
 
-    return inchi_key, identifier_dict
+    return ResolvedCompound(inchi_key, identifier_dict, compound_row)
+
+def _molecule_keys(inchi_key, inchi, smiles, cxsmiles):
+    # the molecule cache lookups of a compound: its InChI for a missing InChIKey (no Mol is built),
+    # and its SMILES for a missing CXSMILES, or for the InChI and InChIKey when no InChI is given
+    keys = []
+    if inchi_key is None and inchi:
+        keys.append(('INCHI', inchi))
+    if smiles and (cxsmiles is None or (inchi_key is None and inchi is None)):
+        keys.append(('SMILES', smiles))
+    return keys
+
+def molecule_keys(compound_identifiers) -> list:
+
+    """
+    Lists the molecule cache lookups `resolve_compound` makes for one compound, without calling RDKit.
+
+    Args:
+        compound_identifiers (list): A list of `CompoundIdentifier` protobuf messages.
+
+    Returns:
+        list: (identifier type, value) keys of `MoleculeCache.resolve`, e.g. `[('SMILES', 'CCO')]`.
+    """
+
+    compound_types = enums_data['CompoundIdentifier.CompoundIdentifierType']
+    identifier_dict = {compound_types[identifier.type]: identifier.value for identifier in compound_identifiers}
+    return _molecule_keys(identifier_dict.get('INCHI_KEY'), identifier_dict.get('INCHI'), identifier_dict.get('SMILES'),
+                          identifier_dict.get('CXSMILES'))
+
+def collect_molecule_keys(reactions) -> set:
+
+    """
+    Collects the distinct molecule cache lookups needed to resolve every compound of some reactions.
+
+    Covers the compounds `dataset_module.extract_reaction` resolves: input components, workup
+    input components and outcome products. Resolving the returned keys in one batch (see
+    `MoleculeCache.prefetch`) leaves one RDKit call per distinct SMILES / InChI string.
+
+    Args:
+        reactions (iterable): `reaction_pb2.Reaction` messages; only their inputs, workups and outcomes are read.
+
+    Returns:
+        set: (identifier type, value) keys.
+
+    Example:
+        >>> from identifiers_module import collect_molecule_keys
+        >>> get_molecule_cache().prefetch(collect_molecule_keys(dataset.reactions), workers=8)
+    """
+
+    keys = set()
+    for reaction in reactions:
+        for reaction_input in reaction.inputs.values():
+            for component in reaction_input.components:
+                keys.update(molecule_keys(component.identifiers))
+        for workup in reaction.workups:
+            for component in workup.input.components:
+                keys.update(molecule_keys(component.identifiers))
+        for outcome in reaction.outcomes:
+            for product in outcome.products:
+                keys.update(molecule_keys(product.identifiers))
+    return keys
+
+def extract_compound_identifiers(compound_identifiers):
+
+    """
+    Extracts compound identifier values and ensures key identifiers are present.
+
+    Generates missing InChI keys and CXSMILES if possible using RDKit. Callers that also need
+    the compound table row should use `resolve_compound` to resolve the compound only once.
+
+    Args:
+        compound_identifiers (list): A list of `CompoundIdentifier` protobuf messages.
+
+    Returns:
+        tuple: 
+            - str: InChI key of the compound.
+            - dict: Dictionary of identifier types to their values.
+
+    Example:
+        >>> from identifiers_module import extract_compound_identifiers
+        >>> compound_identifiers = reaction.inputs['...'].components[0].identifiers
+        >>> extract_compound_identifiers(compound_identifiers)
+        ('ROSDSFDQCJNGOL-UHFFFAOYSA-N', {'NAME': 'dimethylamine', 'SMILES': 'CCO', ...})
+    """
+
+    compound = resolve_compound(compound_identifiers)
+
+    return compound.inchi_key, compound.identifiers
 
 def generate_compound_table (compound_identifiers):
 
     """
     Generates a full set of compound identifiers in a fixed order.
 
-    If InChI key or CXSMILES are missing, attempts to generate them using RDKit.
+    If InChI key or CXSMILES are missing, attempts to generate them using RDKit. Callers that
+    also need the identifier dictionary should use `resolve_compound` to resolve the compound only once.
 
     Args:
         compound_identifiers (list): A list of `CompoundIdentifier` protobuf messages,
@@ -144,68 +243,4 @@ def generate_compound_table (compound_identifiers):
         ['BQJCRHHNABKAKU-KBQPJGBKSA-N', 'CCO', 'InChI=1S/C2H6O/...', ...]
     """
 
-    identifier_type_list = []
-    identifier_details_list = []
-    identifier_value_list = []
-
-    for identifier in compound_identifiers:
-        identifier_type = enums_data['CompoundIdentifier.CompoundIdentifierType'][identifier.type]
-
-        identifier_type_list.append(identifier_type)
-        identifier_value_list.append(identifier.value)
-        identifier_details_list.append(identifier.details)
-
-    identifier_dict = dict(zip(identifier_type_list, identifier_value_list))
-    details_dict = dict(zip(identifier_type_list, identifier_details_list))
-
-    if identifier_dict.get('INCHI_KEY') is None and identifier_dict.get('INCHI'): 
-        inchi = identifier_dict.get('INCHI')
-        rdkit_mol = Chem.MolFromInchi(inchi)
-        identifier_dict['INCHI_KEY'] = Chem.MolToInchiKey(rdkit_mol)
-    
-    elif identifier_dict.get('INCHI_KEY') is None and identifier_dict.get('INCHI') is None:
-        smiles_string = identifier_dict.get('SMILES')
-        rdkit_mol = None
-        identifier_dict['INCHI'] = None
-        identifier_dict['INCHI_KEY'] = None
-        if smiles_string:  #Chem.MolFromSmiles errors if passed None
-            rdkit_mol = Chem.MolFromSmiles(smiles_string)
-            identifier_dict['INCHI'] = Chem.MolToInchi(rdkit_mol)
-            identifier_dict['INCHI_KEY'] = Chem.MolToInchiKey(rdkit_mol)
-
-    else: pass
-
-    if identifier_dict.get('SMILES') and identifier_dict.get('CXSMILES') is None: 
-        smiles_string = identifier_dict.get('SMILES')
-        rdkit_mol = None
-        if smiles_string:  #Chem.MolFromSmiles errors if passed None
-            rdkit_mol = Chem.MolFromSmiles(smiles_string)
-        identifier_dict['CXSMILES'] = Chem.MolToCXSmiles(rdkit_mol) 
-    
-    else: pass
-
-    # extract values
-    inchi_key = identifier_dict.get('INCHI_KEY')
-    smiles = identifier_dict.get('SMILES')
-    inchi = identifier_dict.get('INCHI')
-    iupac_name = identifier_dict.get('IUPAC_NAME')
-    name = identifier_dict.get('NAME')
-    cas_number = identifier_dict.get('CAS_NUMBER')
-    pubchem_cid = identifier_dict.get('PUBCHEM_CID')
-    chemspider_id = identifier_dict.get('CHEMSPIDER_ID')
-    cxsmiles = identifier_dict.get('CXSMILES')
-    unspecified = identifier_dict.get('UNSPECIFIED')
-    custom = identifier_dict.get('CUSTOM')
-    molblock = identifier_dict.get('MOLBLOCK')
-    xyz = identifier_dict.get('XYZ')
-    uniprot_id = identifier_dict.get('UNIPROT_ID')
-    pdb_id = identifier_dict.get('PDB_ID')
-    amino_acid_sequence = identifier_dict.get('AMINO_ACID_SEQUENCE')
-    helm = identifier_dict.get('HELM')
-    mdl = identifier_dict.get('MDL')
-
-    compound_identifiers = [inchi_key, smiles, inchi, iupac_name, name, cas_number, pubchem_cid, chemspider_id, cxsmiles, unspecified, custom, molblock, xyz, uniprot_id, pdb_id, amino_acid_sequence, helm, mdl]
-
-    #TODO - figure out what to do with details_dict
-
-    return compound_identifiers
+    return resolve_compound(compound_identifiers).compound_row
@@ -0,0 +1,240 @@
+# import requirements:
+import hashlib
+import sqlite3
+from ord_rxn_converter.dataset_module import extract_dataset_metadata, iter_reaction_rows, mds_reaction_id
+from ord_rxn_converter.reader_module import iter_reaction_bytes, read_dataset_header, read_reaction_id
+from ord_rxn_converter.registry_module import CompoundRegistry, PersonRegistry
+
+# =============================================================================
+#               INCREMENTAL RE-CONVERSION OF UPDATED DATASETS
+# =============================================================================
+
+def reaction_fingerprint(data) -> str:
+
+    """
+    Computes the fingerprint of a serialized reaction: the BLAKE2b digest (128 bits) of its wire-format bytes.
+
+    Any edit of a reaction, including edits that do not touch `provenance.record_modified`,
+    changes its fingerprint.
+
+    Args:
+        data (bytes): Wire-format encoding of one `reaction_pb2.Reaction`.
+
+    Returns:
+        str: The digest as 32 hexadecimal characters.
+    """
+
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+class StateStore:
+
+    """
+    SQLite file holding the fingerprint of every reaction converted so far, per dataset.
+
+    It is the state an incremental conversion compares a new release of a dataset against:
+    reactions whose fingerprint is unchanged are not extracted again. Only the changed
+    fingerprints are written back by `record`, so saving the state also takes time
+    proportional to the changes.
+
+    Args:
+        path (str): Path of the state file; it is created if it does not exist.
+
+    Example:
+        >>> from incremental_module import StateStore
+        >>> with StateStore("out/state.sqlite") as state:
+        ...     len(state.fingerprints("mds_dataset-..."))
+        0
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute('CREATE TABLE IF NOT EXISTS "reaction_state" ("datasetID" TEXT NOT NULL, '
+                                '"reactionID" TEXT NOT NULL, "fingerprint" TEXT NOT NULL, '
+                                'PRIMARY KEY ("datasetID", "reactionID"))')
+        self.connection.commit()
+
+    def fingerprints(self, datasetID) -> dict:
+
+        """
+        Returns the recorded fingerprints of a dataset.
+
+        Args:
+            datasetID (str): MDS dataset ID.
+
+        Returns:
+            dict: Fingerprint per MDS reaction ID; empty for a dataset that was never converted.
+        """
+
+        cursor = self.connection.execute('SELECT "reactionID", "fingerprint" FROM "reaction_state" WHERE "datasetID" = ?',
+                                         (datasetID,))
+        return dict(cursor.fetchall())
+
+    def record(self, datasetID, fingerprints, deleted=()):
+
+        """
+        Records the new and changed reactions of a dataset and forgets the deleted ones, in one transaction.
+
+        Call it once the output has been patched, so that an interrupted update is redone in full
+        on the next run.
+
+        Args:
+            datasetID (str): MDS dataset ID.
+            fingerprints (dict): Fingerprint per MDS reaction ID of the new and changed reactions.
+            deleted (iterable, optional): MDS reaction IDs removed from the dataset. Defaults to ().
+        """
+
+        with self.connection:
+            self.connection.executemany('DELETE FROM "reaction_state" WHERE "datasetID" = ? AND "reactionID" = ?',
+                                        [(datasetID, reactionID) for reactionID in deleted])
+            self.connection.executemany('INSERT OR REPLACE INTO "reaction_state" VALUES (?, ?, ?)',
+                                        [(datasetID, reactionID, fingerprint) for reactionID, fingerprint in fingerprints.items()])
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def diff_dataset(filepath, state) -> dict:
+
+    """
+    Compares the reactions of a dataset file with the fingerprints recorded in a state store.
+
+    Reactions are read as serialized bytes and only their `reaction_id` is decoded (see
+    `reader_module.read_reaction_id`), so unchanged reactions are never parsed. The bytes of
+    new and changed reactions are kept for `apply_changes`, so memory use is proportional to
+    the changes rather than to the dataset.
+
+    Args:
+        filepath (str): Path to the input file (either zipped or unzipped Google Protobuf format).
+        state (StateStore): Fingerprints of the previous conversion.
+
+    Returns:
+        dict: With keys
+            - `"datasetID"` and `"dataset_metadata"`: the MDS dataset ID and the `dataset_metadata` row.
+            - `"added"`, `"modified"`, `"deleted"`: MDS reaction IDs of new, changed and removed reactions.
+            - `"unchanged"`: the number of unchanged reactions.
+            - `"reactions"`: serialized new and changed reactions, in file order.
+            - `"fingerprints"`: fingerprint per MDS reaction ID of the new and changed reactions.
+
+    Example:
+        >>> from incremental_module import StateStore, diff_dataset
+        >>> changes = diff_dataset("example_dataset.pb.gz", StateStore("state.sqlite"))
+        >>> len(changes["modified"]), len(changes["deleted"])
+    """
+
+    dataset_metadata = extract_dataset_metadata(read_dataset_header(filepath))
+    datasetID = dataset_metadata[0]
+    known = state.fingerprints(datasetID)
+
+    changes = {"datasetID": datasetID, "dataset_metadata": dataset_metadata, "added": [], "modified": [],
+               "deleted": [], "unchanged": 0, "reactions": [], "fingerprints": {}}
+    seen = set()
+    for data in iter_reaction_bytes(filepath):
+        reactionID = mds_reaction_id(read_reaction_id(data))
+        fingerprint = reaction_fingerprint(data)
+        seen.add(reactionID)
+        if known.get(reactionID) == fingerprint:
+            changes["unchanged"] += 1
+            continue
+        changes["added" if reactionID not in known else "modified"].append(reactionID)
+        changes["reactions"].append(data)
+        changes["fingerprints"][reactionID] = fingerprint
+
+    changes["deleted"] = sorted(set(known) - seen)
+    return changes
+
+def apply_changes(changes, target, compounds=None, persons=None, batch_size=256, workers=1, progress=None, normalised=False):
+
+    """
+    Patches an output with the changes found by `diff_dataset`.
+
+    The rows of changed and deleted reactions are deleted first, then the new and changed
+    reactions are extracted and written. As in `writer_module.write_dataset`, the `compound`
+    and `person` rows are collected into registries for the caller to write.
+
+    Args:
+        changes (dict): As returned by `diff_dataset`.
+        target: An output with `delete_reactions(reactionIDs)` and `write_rows(table, rows)`, e.g. a
+            `rdb_module.RDBLoader` or a `writer_module.ParquetPatcher`.
+        compounds (CompoundRegistry, optional): Registry to add compounds to. Defaults to None (a new registry).
+        persons (PersonRegistry, optional): Registry to add persons to. Defaults to None (a new registry).
+        batch_size (int, optional): Number of reactions extracted per batch. Defaults to 256.
+        workers (int, optional): Number of extraction processes. Defaults to 1.
+        progress (callable, optional): Passed to `dataset_module.iter_reaction_rows`. Defaults to None.
+        normalised (bool, optional): Also write the child tables of `normalised_module`. Defaults to False.
+
+    Returns:
+        tuple: The (CompoundRegistry, PersonRegistry) holding the compounds and persons of the new and changed reactions.
+    """
+
+    compound_registry = compounds if compounds is not None else CompoundRegistry()
+    person_registry = persons if persons is not None else PersonRegistry()
+
+    target.delete_reactions(changes["modified"] + changes["deleted"])
+    target.write_rows("dataset_metadata", [changes["dataset_metadata"]])
+    for rows in iter_reaction_rows(changes["reactions"], changes["datasetID"], batch_size=batch_size, workers=workers,
+                                   progress=progress, normalised=normalised):
+        for table, table_rows in rows.items():
+            if table not in ("compound", "person"):
+                target.write_rows(table, table_rows)
+        compound_registry.extend(rows["compound"])
+        person_registry.extend(rows["person"])
+
+    return compound_registry, person_registry
+
+def update_dataset(filepath, target, state, batch_size=256, workers=1, progress=None, normalised=False) -> dict:
+
+    """
+    Re-converts a new release of a dataset incrementally, in time proportional to the changes.
+
+    Only new and changed reactions are extracted; rows of changed and removed reactions are
+    deleted from the output before the new rows are written. The state store is updated once
+    `target` has been closed, so an interrupted update is redone on the next run. Deleting and
+    rewriting the rows of a reaction is idempotent, so redoing an update is safe.
+
+    Args:
+        filepath (str): Path to the input file (either zipped or unzipped Google Protobuf format).
+        target: An unopened output with `delete_reactions`, used as a context manager, e.g.
+            `RDBLoader(connect_sqlite("ord.sqlite"))` or `ParquetPatcher("out/")`.
+        state (StateStore): Fingerprints of the previous conversion, updated in place.
+        batch_size (int, optional): Number of reactions extracted per batch. Defaults to 256.
+        workers (int, optional): Number of extraction processes. Defaults to 1.
+        progress (callable, optional): Called with the number of reactions and bytes of each extracted batch. Defaults to None.
+        normalised (bool, optional): Also write the child tables of `normalised_module`. Defaults to False.
+
+    Returns:
+        dict: The numbers of `"added"`, `"modified"`, `"deleted"` and `"unchanged"` reactions.
+
+    Example:
+        >>> from incremental_module import StateStore, update_dataset
+        >>> from rdb_module import RDBLoader, connect_sqlite
+        >>> with StateStore("ord.state.sqlite") as state:
+        ...     update_dataset("example_dataset.pb.gz", RDBLoader(connect_sqlite("ord.sqlite")), state)
+        {'added': 0, 'modified': 3, 'deleted': 1, 'unchanged': 996}
+    """
+
+    changes = diff_dataset(filepath, state)
+    with target:
+        compound_registry, person_registry = apply_changes(changes, target, batch_size=batch_size, workers=workers,
+                                                           progress=progress, normalised=normalised)
+        target.write_rows("person", person_registry.rows())
+        target.write_rows("compound", compound_registry.rows())
+    state.record(changes["datasetID"], changes["fingerprints"], changes["deleted"])
+
+    return change_counts(changes)
+
+def change_counts(changes) -> dict:
+
+    """
+    Summarises the changes found by `diff_dataset` as numbers of added, modified, deleted and unchanged reactions.
+    """
+
+    return {"added": len(changes["added"]), "modified": len(changes["modified"]), "deleted": len(changes["deleted"]),
+            "unchanged": changes["unchanged"]}
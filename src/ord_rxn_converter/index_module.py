@@ -0,0 +1,406 @@
+# import requirements:
+import gzip
+import hashlib
+import io
+import os
+import pathlib
+import sqlite3
+import zlib
+from ord_rxn_converter.reader_module import (DATASET_REACTIONS_FIELD, WIRETYPE_LENGTH_DELIMITED, MappedDataset,
+                                             is_binary_dataset, is_mappable_dataset, iter_dataset_fields,
+                                             read_mapped_spans, read_reaction_id)
+
+# =============================================================================
+#               PERSISTENT REACTION INDEX OF A DATASET FILE
+# =============================================================================
+
+# suffix of the sidecar index written next to a dataset file
+INDEX_SUFFIX = '.index.sqlite'
+
+# size of the compressed chunks read while indexing a gzipped file
+CHUNK_SIZE = 1 << 20
+
+def index_path(filepath, directory=None) -> str:
+
+    """
+    Returns the path of the index of a dataset file.
+
+    By default the index is a sidecar next to the file, e.g. `ord_dataset-1.pb.gz.index.sqlite`. In
+    `directory`, e.g. when the dataset files are read-only, it is named after the file and a hash of its
+    absolute path, so files of the same name in different directories do not share an index.
+    """
+
+    if directory is None:
+        return str(filepath) + INDEX_SUFFIX
+    digest = hashlib.sha1(os.path.abspath(filepath).encode()).hexdigest()[:12]
+    return os.path.join(directory, f"{os.path.basename(filepath)}.{digest}{INDEX_SUFFIX}")
+
+def _source_signature(filepath):
+    stat = os.stat(filepath)
+    return stat.st_size, stat.st_mtime
+
+
+class _GzipMemberReader(io.RawIOBase):
+
+    # decompresses a gzip file and records where each gzip member starts, as
+    # (compressed offset, uncompressed offset); used through an io.BufferedReader
+    def __init__(self, stream):
+        self.stream = stream
+        self.members = []
+        self._decompressor = None
+        self._input = b''
+        self._compressed = 0
+        self._uncompressed = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while True:
+            if not self._input:
+                self._input = self.stream.read(CHUNK_SIZE)
+                if not self._input:
+                    if self._decompressor is not None:
+                        raise ValueError("Truncated gzip member in dataset file")
+                    return 0
+            if self._decompressor is None:
+                # gzip files may be padded with zeros after the last member
+                if not self._input.strip(b'\0'):
+                    self._compressed += len(self._input)
+                    self._input = b''
+                    continue
+                self.members.append((self._compressed, self._uncompressed))
+                self._decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+
+            data = self._input
+            output = self._decompressor.decompress(data, len(buffer))
+            if self._decompressor.eof:
+                self._input = self._decompressor.unused_data
+                self._decompressor = None
+            else:
+                self._input = self._decompressor.unconsumed_tail
+            self._compressed += len(data) - len(self._input)
+            if output:
+                buffer[:len(output)] = output
+                self._uncompressed += len(output)
+                return len(output)
+
+
+class _CountingReader:
+
+    # counts the bytes read from a stream, i.e. the uncompressed position in a gzipped file
+    def __init__(self, stream):
+        self.stream = stream
+        self.position = 0
+
+    def read(self, size):
+        data = self.stream.read(size)
+        self.position += len(data)
+        return data
+
+
+def _scan_reactions(filepath):
+    # returns ([(reaction_id, offset, length), ...], [(compressed offset, uncompressed offset), ...])
+    if is_mappable_dataset(filepath):
+        with MappedDataset(filepath) as dataset:
+            reaction_ids = [read_reaction_id(dataset.reaction_bytes(index)) for index in range(len(dataset))]
+            return list(zip(reaction_ids, dataset.offsets, dataset.lengths)), [(0, 0)]
+
+    with open(filepath, 'rb') as raw:
+        members = _GzipMemberReader(raw)
+        stream = _CountingReader(io.BufferedReader(members, CHUNK_SIZE))
+        reactions = []
+        for field_number, wire_type, value in iter_dataset_fields(stream):
+            if field_number == DATASET_REACTIONS_FIELD and wire_type == WIRETYPE_LENGTH_DELIMITED:
+                reactions.append((read_reaction_id(value), stream.position - len(value), len(value)))
+        return reactions, members.members
+
+def build_index(filepath, path=None):
+
+    """
+    Scans a binary dataset file once and saves a sidecar index of its reactions.
+
+    For every reaction the index records its `reaction_id` and the offset and length of its
+    serialized bytes in the (uncompressed) `Dataset`. For gzipped files it also records the
+    start of every gzip member as a seek point, i.e. a compressed offset from which the file
+    can be decompressed without reading what comes before it. Files written as one gzip member
+    (most ORD files) have a single seek point; `write_seekable_gzip` rewrites them with one
+    every few MB. Reactions are not parsed: only their `reaction_id` is decoded.
+
+    The index is a small SQLite file, written to a temporary file first and then moved in place.
+
+    Args:
+        filepath (str): Path to a `.pb` or `.pb.gz` dataset file.
+        path (str, optional): Path of the index. Defaults to None (`index_path(filepath)`).
+
+    Returns:
+        ReactionIndex: The new index.
+
+    Raises:
+        ValueError: If the file is not a binary dataset file, or cannot be scanned.
+
+    Example:
+        >>> from index_module import build_index
+        >>> index = build_index("example_dataset.pb.gz")
+        >>> index.position("ord-0123456789abcdef0123456789abcdef")
+        10000
+    """
+
+    if not is_binary_dataset(filepath):
+        raise ValueError(f"{filepath} is not a binary dataset file; only .pb and .pb.gz files can be indexed")
+    path = path or index_path(filepath)
+    size, mtime = _source_signature(filepath)
+    reactions, seek_points = _scan_reactions(filepath)
+
+    temporary_path = path + '.tmp'
+    if os.path.exists(temporary_path):
+        os.remove(temporary_path)
+    connection = sqlite3.connect(temporary_path)
+    with connection:
+        connection.execute('CREATE TABLE "source" ("path" TEXT, "size" INTEGER, "mtime" REAL, "compressed" BOOLEAN)')
+        connection.execute('CREATE TABLE "reactions" ("position" INTEGER PRIMARY KEY, "reactionID" TEXT, '
+                           '"offset" INTEGER, "length" INTEGER)')
+        connection.execute('CREATE INDEX "reactions_reactionID" ON "reactions" ("reactionID")')
+        connection.execute('CREATE TABLE "seek_points" ("uncompressedOffset" INTEGER PRIMARY KEY, "compressedOffset" INTEGER)')
+        connection.execute('INSERT INTO "source" VALUES (?, ?, ?, ?)',
+                           (os.path.abspath(filepath), size, mtime, not is_mappable_dataset(filepath)))
+        connection.executemany('INSERT INTO "reactions" VALUES (?, ?, ?, ?)',
+                               [(position, *reaction) for position, reaction in enumerate(reactions)])
+        connection.executemany('INSERT OR REPLACE INTO "seek_points" VALUES (?, ?)',
+                               [(uncompressed, compressed) for compressed, uncompressed in seek_points])
+    connection.close()
+    os.replace(temporary_path, path)
+    return ReactionIndex(path)
+
+def open_index(filepath, rebuild=True, directory=None):
+
+    """
+    Opens the sidecar index of a dataset file, building it if it is missing or out of date.
+
+    An index is out of date if the size or modification time of the dataset file changed since
+    it was built.
+
+    Args:
+        filepath (str): Path to a `.pb` or `.pb.gz` dataset file.
+        rebuild (bool, optional): Build a missing or stale index. Defaults to True; if False, a missing
+            or stale index raises `FileNotFoundError`.
+        directory (str, optional): Directory holding the index, created if needed. Defaults to None (the sidecar
+            next to the dataset file; see `index_path`).
+
+    Returns:
+        ReactionIndex: The index of the file.
+    """
+
+    path = index_path(filepath, directory)
+    if os.path.exists(path):
+        index = ReactionIndex(path)
+        if index.is_current(filepath):
+            return index
+        index.close()
+    if not rebuild:
+        raise FileNotFoundError(f"No up-to-date index of {filepath} at {path}")
+    if directory is not None:
+        os.makedirs(directory, exist_ok=True)
+    return build_index(filepath, path)
+
+
+class ReactionIndex:
+
+    """
+    Sidecar index of the reactions of a dataset file, as saved by `build_index`.
+
+    Lookups are answered by SQLite queries, so opening the index of a huge dataset costs
+    nothing, and a worker that is given a range of positions only reads the index rows of
+    that range. Reactions are read directly at their offsets: uncompressed files through a
+    memory map, and gzipped files by decompressing from the last seek point before the first
+    reaction, without parsing any reaction in between.
+
+    Args:
+        path (str): Path of the index file.
+
+    Example:
+        >>> from index_module import open_index
+        >>> with open_index("example_dataset.pb.gz") as index:
+        ...     start, stop = index.shards(8)[3]
+        ...     for data in index.iter_reaction_bytes("example_dataset.pb.gz", start, stop):
+        ...         ...
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self._length = self.connection.execute('SELECT COUNT(*) FROM "reactions"').fetchone()[0]
+
+    def __len__(self):
+        return self._length
+
+    def is_current(self, filepath) -> bool:
+
+        """
+        Checks whether the index was built from the current version of a dataset file (same size and modification time).
+        """
+
+        size, mtime = _source_signature(filepath)
+        return self.connection.execute('SELECT "size" = ? AND "mtime" = ? FROM "source"', (size, mtime)).fetchone() == (1,)
+
+    def position(self, reaction_id) -> int:
+
+        """
+        Returns the position of a reaction in the dataset.
+
+        Args:
+            reaction_id (str): The ORD reaction ID, e.g. 'ord-0123...'.
+
+        Returns:
+            int: Position of the reaction, usable as `start` of `dataset_module.iter_reactions`.
+
+        Raises:
+            KeyError: If the dataset has no reaction with this ID.
+        """
+
+        row = self.connection.execute('SELECT "position" FROM "reactions" WHERE "reactionID" = ? ORDER BY "position" LIMIT 1',
+                                      (reaction_id,)).fetchone()
+        if row is None:
+            raise KeyError(reaction_id)
+        return row[0]
+
+    def spans(self, start=0, stop=None) -> list:
+
+        """
+        Returns the (offset, length) of the reactions in `range(start, stop)`, in file order.
+        """
+
+        start, stop, _ = slice(start, stop).indices(len(self))
+        return self.connection.execute('SELECT "offset", "length" FROM "reactions" WHERE "position" >= ? AND "position" < ? '
+                                       'ORDER BY "position"', (start, stop)).fetchall()
+
+    def seek_point(self, offset) -> tuple:
+
+        """
+        Returns the last seek point at or before an uncompressed offset, as (compressed offset, uncompressed offset).
+        """
+
+        row = self.connection.execute('SELECT "compressedOffset", "uncompressedOffset" FROM "seek_points" '
+                                      'WHERE "uncompressedOffset" <= ? ORDER BY "uncompressedOffset" DESC LIMIT 1',
+                                      (offset,)).fetchone()
+        return row if row is not None else (0, 0)
+
+    def seek_points(self) -> list:
+
+        """
+        Returns every seek point, as (compressed offset, uncompressed offset); one per gzip member.
+        """
+
+        return self.connection.execute('SELECT "compressedOffset", "uncompressedOffset" FROM "seek_points" '
+                                       'ORDER BY "uncompressedOffset"').fetchall()
+
+    def shards(self, count) -> list:
+
+        """
+        Splits the reactions into `count` contiguous ranges of (almost) equal size, e.g. one per machine.
+
+        Returns:
+            list: (start, stop) positions of each shard, covering every reaction once.
+        """
+
+        size, remainder = divmod(len(self), count)
+        bounds = [0]
+        for shard in range(count):
+            bounds.append(bounds[-1] + size + (shard < remainder))
+        return list(zip(bounds[:-1], bounds[1:]))
+
+    def iter_reaction_bytes(self, filepath, start=0, stop=None):
+
+        """
+        Returns an iterator over the serialized reactions in `range(start, stop)` of the indexed file.
+
+        The spans and seek point of the range are queried right away, so the iterator does not use
+        the index and can be consumed on another thread (SQLite connections cannot be shared).
+
+        Args:
+            filepath (str): Path to the dataset file the index was built from.
+            start (int, optional): Position of the first reaction. Defaults to 0.
+            stop (int, optional): Position after the last reaction. Defaults to None (the end of the file).
+
+        Returns:
+            iterator: Wire-format encodings (bytes) of the `reaction_pb2.Reaction` messages.
+        """
+
+        spans = self.spans(start, stop)
+        if not spans:
+            return iter(())
+        return iter_spans(filepath, spans, self.seek_point(spans[0][0]))
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def iter_spans(filepath, spans, seek_point=(0, 0)):
+
+    """
+    Reads the serialized reactions at the given (offset, length) spans of a dataset file.
+
+    Uncompressed files are read through a memory map. Gzipped files are decompressed from the
+    seek point on, skipping (but not parsing) the bytes between the spans, so `spans` must be
+    in file order and start after the seek point.
+
+    Args:
+        filepath (str): Path to the dataset file.
+        spans (list): (offset, length) of each reaction in the uncompressed `Dataset`.
+        seek_point (tuple, optional): (compressed offset, uncompressed offset) of a gzip member start. Defaults to
+            (0, 0), the start of the file.
+
+    Yields:
+        bytes: Wire-format encoding of one `reaction_pb2.Reaction`.
+    """
+
+    if is_mappable_dataset(filepath):
+        yield from read_mapped_spans(filepath, spans)
+        return
+
+    compressed_offset, position = seek_point
+    with open(filepath, 'rb') as raw:
+        raw.seek(compressed_offset)
+        with gzip.GzipFile(fileobj=raw, mode='rb') as stream:
+            for offset, length in spans:
+                if offset < position:
+                    raise ValueError(f"Reaction at offset {offset} is before the seek point or out of order")
+                stream.seek(offset - position, io.SEEK_CUR)
+                data = stream.read(length)
+                if len(data) != length:
+                    raise ValueError(f"Truncated reaction at offset {offset} of {filepath}")
+                yield data
+                position = offset + length
+
+def write_seekable_gzip(filepath, output, member_size=1 << 22, compresslevel=9):
+
+    """
+    Rewrites a dataset file as a gzip file of independent members of `member_size` uncompressed bytes.
+
+    Concatenated gzip members are a valid gzip file, so the output is read like any `.pb.gz`
+    file (including by `ord_schema`), but its index gets one seek point per member: reading a
+    range of reactions then decompresses at most `member_size` bytes before the first one.
+
+    Args:
+        filepath (str): Path to a `.pb` or `.pb.gz` dataset file.
+        output (str): Path of the new `.pb.gz` file.
+        member_size (int, optional): Uncompressed bytes per gzip member. Defaults to 4 MiB.
+        compresslevel (int, optional): gzip compression level. Defaults to 9.
+
+    Example:
+        >>> from index_module import write_seekable_gzip, build_index
+        >>> write_seekable_gzip("ord_dataset-1.pb.gz", "seekable/ord_dataset-1.pb.gz")
+        >>> len(build_index("seekable/ord_dataset-1.pb.gz").seek_points())
+        52
+    """
+
+    opener = gzip.open if pathlib.Path(filepath).suffix == '.gz' else open
+    with opener(filepath, 'rb') as source, open(output, 'wb') as target:
+        for chunk in iter(lambda: source.read(member_size), b''):
+            target.write(gzip.compress(chunk, compresslevel=compresslevel, mtime=0))
@@ -1,11 +1,8 @@
 # import requirements: 
 from ord_schema.proto import dataset_pb2, reaction_pb2
 from google.protobuf.message import Message
-from ord_rxn_converter.utility_functions_module import extract_all_enums
-from ord_rxn_converter.identifiers_module import extract_compound_identifiers, generate_compound_table
-
-#generate enums_data to be accessible here TODO - have importable object instead..?
-enums_data = extract_all_enums(reaction_pb2)
+from ord_rxn_converter.utility_functions_module import enums_data
+from ord_rxn_converter.identifiers_module import resolve_compound
 
 def extract_input_addition (inputs, reactionID = ''):
 
@@ -60,7 +57,7 @@ def extract_input_addition (inputs, reactionID = ''):
     
     return input_addition_details
 
-def extract_input_components (inputs, reactionID = ''):
+def extract_input_components (inputs, reactionID = '', resolve_molecules=True):
     """
     Extracts detailed information about reaction input components and their compound identifiers.
 
@@ -71,6 +68,7 @@ def extract_input_components (inputs, reactionID = ''):
         inputs (dict): Reaction inputs from a reaction object (protobuf-based ORD schema).
             Typically accessed as `reaction.inputs['input_key']`.
         reactionID (str, optional): Unique identifier for the reaction. Defaults to ''.
+        resolve_molecules (bool, optional): Derive missing InChIKeys with RDKit (see `resolve_compound`). Defaults to True.
 
     Returns:
         tuple: 
@@ -94,8 +92,9 @@ def extract_input_components (inputs, reactionID = ''):
             # identifiers = 1
             if component.identifiers:
                 identifiers = component.identifiers
-                inchi_key, component_identifiers = extract_compound_identifiers(identifiers)
-                compound_table.append(generate_compound_table(identifiers))
+                compound = resolve_compound(identifiers, resolve_molecules)
+                inchi_key, component_identifiers = compound.inchi_key, compound.identifiers
+                compound_table.append(compound.compound_row)
             else: 
                 component_identifiers = None
             # Amount amount = 2 
@@ -1,6 +1,5 @@
 # %% 
 import re
-from ord_schema.message_helpers import load_message, write_message
 from ord_schema.proto import dataset_pb2, reaction_pb2
 from google.protobuf.message import Message
 
@@ -85,14 +84,14 @@ def extract_reaction_metadata(provenance, reactionID):
         >>> reaction = dataset.reactions[0]
         >>> extract_reaction_metadata(reaction.provenance, "reaction-001")
         (['reaction-001', '0000-0001-...', 'Boston', ...], 
-         [['jsmith', 'John Smith', '0000-0001-...', ...], ...])
+         [['0000-0001-...', 'jsmith', 'John Smith', ...], ...])
     """
     
     person_metadata = []
 
     # experimenter = 1
     experimenter = provenance.experimenter
-    person_metadata.append([experimenter.username, experimenter.name, experimenter.orcid, experimenter.organization, experimenter.email])
+    person_metadata.append([experimenter.orcid, experimenter.username, experimenter.name, experimenter.organization, experimenter.email])
     
     # city = 2
 
@@ -107,7 +106,7 @@ def extract_reaction_metadata(provenance, reactionID):
     # record_created = 
     created_time = provenance.record_created.time.value
     person = provenance.record_created.person
-    person_metadata.append([person.username, person.name, person.orcid, person.organization, person.email])
+    person_metadata.append([person.orcid, person.username, person.name, person.organization, person.email])
 
     modified_times_list = []
     modified_person_orcid_list = []
@@ -0,0 +1,324 @@
+# import requirements:
+import atexit
+import os
+import sqlite3
+import threading
+from collections import OrderedDict, namedtuple
+
+# =============================================================================
+#               CACHE OF RDKIT-DERIVED COMPOUND IDENTIFIERS
+# =============================================================================
+
+# identifiers derived by RDKit for one SMILES or InChI string
+ResolvedMolecule = namedtuple('ResolvedMolecule', ['inchi', 'inchi_key', 'cxsmiles'])
+
+# environment variable naming a SQLite file that backs the default cache
+CACHE_PATH_VARIABLE = 'ORD_RXN_CONVERTER_MOLECULE_CACHE'
+
+# marks molecules RDKit could not parse, so they are not parsed again
+_INVALID = ResolvedMolecule(None, None, None)
+
+def resolve_molecule(identifier_type, value):
+
+    """
+    Derives InChI, InChIKey and CXSMILES for one identifier with RDKit.
+
+    Args:
+        identifier_type (str): 'SMILES' or 'INCHI'.
+        value (str): The identifier value.
+
+    Returns:
+        ResolvedMolecule or None: The derived identifiers, or None if RDKit cannot parse the value.
+            For an InChI only the InChIKey is derived, directly from the InChI string without building
+            an RDKit `Mol`; CXSMILES is derived from SMILES only.
+
+    Raises:
+        ValueError: If `identifier_type` is not 'SMILES' or 'INCHI'.
+    """
+
+    # RDKit is imported on the first cache miss rather than with the package
+    from rdkit import Chem
+
+    if identifier_type == 'SMILES':
+        rdkit_mol = Chem.MolFromSmiles(value)
+        if rdkit_mol is None:
+            return None
+        return ResolvedMolecule(Chem.MolToInchi(rdkit_mol), Chem.MolToInchiKey(rdkit_mol), Chem.MolToCXSmiles(rdkit_mol))
+
+    if identifier_type == 'INCHI':
+        inchi_key = Chem.InchiToInchiKey(value)
+        if not inchi_key:
+            return None
+        return ResolvedMolecule(value, inchi_key, None)
+
+    raise ValueError(f"Cannot resolve identifiers of type {identifier_type}")
+
+
+def _resolve_chunk(keys):
+    # runs in a worker process of `resolve_molecule_batch`
+    return [resolve_molecule(identifier_type, value) for identifier_type, value in keys]
+
+def resolve_molecule_batch(keys, workers=1, chunksize=256) -> list:
+
+    """
+    Resolves many SMILES / InChI strings with RDKit, optionally across a process pool.
+
+    Args:
+        keys (list): (identifier type, value) pairs, e.g. `[('SMILES', 'CCO'), ('INCHI', 'InChI=1S/...')]`.
+        workers (int, optional): Number of worker processes. Defaults to 1 (resolve in this process).
+        chunksize (int, optional): Number of keys sent to a worker at a time. Defaults to 256.
+
+    Returns:
+        list: The `ResolvedMolecule` (or None) of each key, in the order of `keys`.
+    """
+
+    keys = list(keys)
+    if workers <= 1 or len(keys) <= chunksize:
+        return _resolve_chunk(keys)
+
+    from concurrent.futures import ProcessPoolExecutor
+    chunks = [keys[start:start + chunksize] for start in range(0, len(keys), chunksize)]
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for resolved in executor.map(_resolve_chunk, chunks):
+            results.extend(resolved)
+    return results
+
+
+class MoleculeCache:
+
+    """
+    Memoises `resolve_molecule` with bounded LRU eviction and an optional SQLite backing file.
+
+    Lookups are keyed by (identifier type, value). Entries evicted from memory, or computed in a
+    previous run, are found in the backing file without calling RDKit again. New entries are
+    written to the file in batches of `commit_every`.
+
+    The cache can be used from several threads, e.g. by the extraction stage of a pipelined
+    conversion after the calling thread used it: the backing connection is shared between
+    threads, and the cache state is guarded by a lock.
+
+    Args:
+        maxsize (int, optional): Maximum number of entries kept in memory. Defaults to 100000.
+        path (str, optional): SQLite file backing the cache. Defaults to None (memory only).
+        commit_every (int, optional): Number of new entries buffered before writing them to `path`. Defaults to 256.
+
+    Example:
+        >>> from molecule_cache_module import MoleculeCache
+        >>> cache = MoleculeCache(path='molecules.sqlite')
+        >>> cache.resolve('SMILES', 'CCO').inchi_key
+        'LFQSCWFLJHTTHZ-UHFFFAOYSA-N'
+    """
+
+    def __init__(self, maxsize=100000, path=None, commit_every=256):
+        self.maxsize = maxsize
+        self.path = path
+        self.commit_every = commit_every
+        self.hits = 0
+        self.store_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._pending = []
+        self._connection = None
+        self._lock = threading.RLock()
+
+        if path:
+            self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS molecule ('
+                'identifier_type TEXT NOT NULL, value TEXT NOT NULL, '
+                'inchi TEXT, inchi_key TEXT, cxsmiles TEXT, '
+                'PRIMARY KEY (identifier_type, value))'
+            )
+            self._connection.commit()
+            atexit.register(self.close)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def resolve(self, identifier_type, value):
+
+        """
+        Returns the identifiers derived from a SMILES or InChI string, calling RDKit only on a cache miss.
+
+        Args:
+            identifier_type (str): 'SMILES' or 'INCHI'.
+            value (str): The identifier value.
+
+        Returns:
+            ResolvedMolecule or None: As returned by `resolve_molecule`.
+        """
+
+        key = (identifier_type, value)
+        with self._lock:
+            resolved = self._entries.get(key)
+            if resolved is not None:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return resolved if resolved is not _INVALID else None
+            resolved = self._load(key)
+
+        if resolved is not None:
+            with self._lock:
+                self.store_hits += 1
+        else:
+            # RDKit runs outside the lock
+            resolved = resolve_molecule(identifier_type, value) or _INVALID
+            with self._lock:
+                self.misses += 1
+                self._store(key, resolved)
+
+        with self._lock:
+            self._insert(key, resolved)
+        return resolved if resolved is not _INVALID else None
+
+    def prefetch(self, keys, workers=1, chunksize=256) -> dict:
+
+        """
+        Resolves many identifiers in one batched pass, so that later lookups of them are hits.
+
+        Keys that are neither in memory nor in the backing file are resolved with
+        `resolve_molecule_batch`, each exactly once, across `workers` processes. Only up to
+        `maxsize` entries stay in memory, so the cache should be at least as large as the number
+        of keys prefetched at once.
+
+        Args:
+            keys (iterable): Distinct (identifier type, value) pairs.
+            workers (int, optional): Number of worker processes calling RDKit. Defaults to 1.
+            chunksize (int, optional): Number of keys sent to a worker at a time. Defaults to 256.
+
+        Returns:
+            dict: The `ResolvedMolecule` (or None) of every key, e.g. to `preload` into the caches of worker processes.
+        """
+
+        entries = {}
+        missing = []
+        with self._lock:
+            for key in keys:
+                resolved = self._entries.get(key)
+                if resolved is None:
+                    resolved = self._load(key)
+                    if resolved is None:
+                        missing.append(key)
+                        continue
+                    self.store_hits += 1
+                    self._insert(key, resolved)
+                entries[key] = resolved
+
+        batch = resolve_molecule_batch(missing, workers, chunksize)
+        with self._lock:
+            for key, resolved in zip(missing, batch):
+                self.misses += 1
+                resolved = resolved or _INVALID
+                self._store(key, resolved)
+                self._insert(key, resolved)
+                entries[key] = resolved
+            self.flush()
+        return {key: resolved if resolved is not _INVALID else None for key, resolved in entries.items()}
+
+    def preload(self, entries):
+
+        """
+        Adds identifiers resolved elsewhere, e.g. by `prefetch` in a parent process, without calling RDKit.
+
+        Args:
+            entries (dict): `ResolvedMolecule` (or None if RDKit cannot parse it) per (identifier type, value).
+        """
+
+        with self._lock:
+            for key, resolved in entries.items():
+                self._insert(key, resolved or _INVALID)
+
+    def _insert(self, key, resolved):
+        self._entries[key] = resolved
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def _load(self, key):
+        if self._connection is None:
+            return None
+        row = self._connection.execute(
+            'SELECT inchi, inchi_key, cxsmiles FROM molecule WHERE identifier_type = ? AND value = ?', key
+        ).fetchone()
+        if row is None:
+            return None
+        resolved = ResolvedMolecule(*row)
+        return _INVALID if resolved == _INVALID else resolved
+
+    def _store(self, key, resolved):
+        if self._connection is None:
+            return
+        self._pending.append(key + tuple(resolved))
+        if len(self._pending) >= self.commit_every:
+            self.flush()
+
+    def flush(self):
+
+        """
+        Writes buffered entries to the backing file.
+        """
+
+        with self._lock:
+            if self._connection is None or not self._pending:
+                return
+            self._connection.executemany('INSERT OR IGNORE INTO molecule VALUES (?, ?, ?, ?, ?)', self._pending)
+            self._connection.commit()
+            self._pending = []
+
+    def close(self):
+
+        """
+        Flushes buffered entries and closes the backing file.
+        """
+
+        with self._lock:
+            if self._connection is None:
+                return
+            self.flush()
+            self._connection.close()
+            self._connection = None
+
+    def hit_rate(self):
+
+        """
+        Returns the share of lookups served without calling RDKit.
+
+        Returns:
+            float: (memory hits + backing file hits) / lookups, or 0.0 before the first lookup.
+        """
+
+        lookups = self.hits + self.store_hits + self.misses
+        return (self.hits + self.store_hits) / lookups if lookups else 0.0
+
+
+_molecule_cache = None
+
+def get_molecule_cache():
+
+    """
+    Returns the process-wide `MoleculeCache` used by `identifiers_module`.
+
+    It is created on first use; if the `ORD_RXN_CONVERTER_MOLECULE_CACHE` environment variable
+    is set, it names the SQLite backing file, which also lets worker processes share it.
+
+    Returns:
+        MoleculeCache: The default cache.
+    """
+
+    global _molecule_cache
+    if _molecule_cache is None:
+        _molecule_cache = MoleculeCache(path=os.environ.get(CACHE_PATH_VARIABLE))
+    return _molecule_cache
+
+def set_molecule_cache(cache):
+
+    """
+    Replaces the process-wide `MoleculeCache`, e.g. to change its size or backing file.
+
+    Args:
+        cache (MoleculeCache): The cache to use from now on.
+    """
+
+    global _molecule_cache
+    _molecule_cache = cache
@@ -0,0 +1,126 @@
+# import requirements:
+from ord_rxn_converter.schema_module import to_text
+
+# =============================================================================
+#               NORMALISED CHILD TABLES OF NESTED MEASUREMENTS
+# =============================================================================
+
+#column headers of the child tables emitted in normalised mode
+temperature_measurements_cols = ['reactionID', 'measurementIndex', 'measurementType', 'details', 'time', 'timeUnit',
+                                 'temperature', 'temperatureUnit']
+pressure_measurements_cols = ['reactionID', 'measurementIndex', 'measurementType', 'details', 'time', 'timeUnit',
+                              'pressure', 'pressureUnit']
+electrochemistry_measurements_cols = ['reactionID', 'measurementIndex', 'time', 'timeUnit', 'current', 'currentUnit',
+                                      'voltage', 'voltageUnit']
+product_measurements_cols = ['reactionID', 'outcomeKey', 'productIndex', 'measurementIndex', 'InChIKey', 'analysisKey',
+                             'measurementType', 'details', 'usesInternalStandard', 'isNormalized', 'authenticStandard',
+                             'valueType', 'value', 'stringValue', 'valueUnit', 'retentionTime', 'retentionTimeUnit',
+                             'selectivity', 'wavelength', 'wavelengthUnit']
+analysis_data_cols = ['reactionID', 'outcomeKey', 'analysisKey', 'analysisType', 'dataKey', 'value', 'description']
+
+CHILD_TABLE_COLUMNS = {
+    "temperature_measurements" : temperature_measurements_cols,
+    "pressure_measurements" : pressure_measurements_cols,
+    "electrochemistry_measurements" : electrochemistry_measurements_cols,
+    "product_measurements" : product_measurements_cols,
+    "analysis_data" : analysis_data_cols,
+}
+
+def _condition_measurements(reactionID, condition, key):
+    # measurement lists inside a temperature / pressure / electrochemistry condition dict
+    if not isinstance(condition, dict) or not condition.get(key):
+        return []
+    return [[reactionID, index] + list(measurement) for index, measurement in enumerate(condition[key])]
+
+def extract_condition_measurements(conditions_row) -> dict:
+
+    """
+    Flattens the temperature, pressure and electrochemistry measurements of a `reaction_conditions` row.
+
+    Args:
+        conditions_row (list): A row returned by `conditions_module.extract_reaction_conditions`.
+
+    Returns:
+        dict: Rows of `temperature_measurements`, `pressure_measurements` and
+            `electrochemistry_measurements`, each row starting with the reaction ID and the
+            position of the measurement.
+    """
+
+    reactionID, temperature, pressure = conditions_row[0], conditions_row[1], conditions_row[2]
+    electrochemistry = conditions_row[5]
+    return {
+        "temperature_measurements" : _condition_measurements(reactionID, temperature, 'temperatureMeasurements'),
+        "pressure_measurements" : _condition_measurements(reactionID, pressure, 'pressureMeasurements'),
+        "electrochemistry_measurements" : _condition_measurements(reactionID, electrochemistry, 'electrochemistryMeasurements'),
+    }
+
+def extract_outcome_measurements(outcome_row) -> dict:
+
+    """
+    Flattens the product measurements and analysis data of a `reaction_outcomes` row.
+
+    Product measurements are keyed by outcome, product position and measurement position;
+    numeric values (percentages, floats, amounts) go to `value` and string values to
+    `stringValue`. Each data entry of each analysis becomes one `analysis_data` row, with
+    bytes values as base64 text.
+
+    Args:
+        outcome_row (list): A row returned by `outcomes_module.extract_reaction_outcomes`.
+
+    Returns:
+        dict: Rows of `product_measurements` and `analysis_data`.
+    """
+
+    reactionID, outcomeKey, products, analyses = outcome_row[0], outcome_row[1], outcome_row[5], outcome_row[6]
+    product_measurements = []
+    for product_index, product in enumerate(products or []):
+        # the measurements of every product of the outcome are listed in each product, by product position
+        measurements = product[2][product_index] if product[2] and product_index < len(product[2]) else None
+        for measurement in measurements or []:
+            (index, inchi_key, _, analysis_key, measurement_type, details, uses_internal_standard, is_normalized,
+             authentic_standard, value_type, value, value_unit, retention_time, time_unit, selectivity, wavelength,
+             wavelength_unit) = measurement
+            string_value = value if value_type == 'string_value' else None
+            number_value = None if value_type == 'string_value' else value
+            product_measurements.append([reactionID, outcomeKey, product_index, index, inchi_key, analysis_key,
+                                         measurement_type, details, uses_internal_standard, is_normalized,
+                                         authentic_standard, value_type, number_value, string_value, value_unit,
+                                         retention_time, time_unit, selectivity, wavelength, wavelength_unit])
+
+    analysis_data = []
+    for analysis in analyses or []:
+        for data_key, (value, description) in (analysis.get('data') or {}).items():
+            analysis_data.append([reactionID, outcomeKey, analysis['analysisKey'], analysis['analysisType'], data_key,
+                                  to_text(value), description or None])
+
+    return {"product_measurements" : product_measurements, "analysis_data" : analysis_data}
+
+def extract_child_rows(rows) -> dict:
+
+    """
+    Builds the normalised child tables from the rows extracted for one or more reactions.
+
+    Nested cells of `reaction_conditions` and `reaction_outcomes` are left as they are; the child
+    tables repeat their measurements as flat rows with foreign keys to `reactionID` and
+    `outcomeKey`, so they can be filtered, aggregated and indexed without unpacking cells.
+
+    Args:
+        rows (dict): Rows per table, as returned by `dataset_module.extract_reaction`.
+
+    Returns:
+        dict: Rows of each table in `CHILD_TABLE_COLUMNS`.
+
+    Example:
+        >>> from normalised_module import extract_child_rows
+        >>> child_rows = extract_child_rows(extract_reaction(reaction, datasetID))
+        >>> child_rows["product_measurements"]
+    """
+
+    child_rows = {table: [] for table in CHILD_TABLE_COLUMNS}
+    for conditions_row in rows.get("reaction_conditions", []):
+        for table, table_rows in extract_condition_measurements(conditions_row).items():
+            child_rows[table].extend(table_rows)
+    for outcome_row in rows.get("reaction_outcomes", []):
+        for table, table_rows in extract_outcome_measurements(outcome_row).items():
+            child_rows[table].extend(table_rows)
+    return child_rows
@@ -1,9 +1,6 @@
 from ord_schema.proto import dataset_pb2, reaction_pb2
 from google.protobuf.message import Message
-from ord_rxn_converter.utility_functions_module import extract_all_enums
-
-#generate enums_data to be accessible here TODO - have importable object instead..?
-enums_data = extract_all_enums(reaction_pb2)
+from ord_rxn_converter.utility_functions_module import enums_data
 
 # TODO: notes are available but observations sometimes are not available, how to make notes or observations optional? 
 def extract_notes_observations(reactionID, notes, observations=None):
@@ -2,13 +2,11 @@
 from ord_schema.proto import dataset_pb2, reaction_pb2
 from google.protobuf.message import Message
 from uuid import uuid4
-from ord_rxn_converter.utility_functions_module import extract_all_enums
-from ord_rxn_converter.identifiers_module import extract_compound_identifiers, generate_compound_table
+from ord_rxn_converter.utility_functions_module import enums_data
+from ord_rxn_converter.identifiers_module import resolve_compound
+from ord_rxn_converter.inputs_module import extract_amount
 
-#generate enums_data to be accessible here TODO - have importable object instead..?
-enums_data = extract_all_enums(reaction_pb2)
-
-def extract_reaction_outcomes(reactionID, outcomes): 
+def extract_reaction_outcomes(reactionID, outcomes, resolve_molecules=True): 
 
     """
     Extracts outcome information from ORD reaction data.
@@ -22,6 +20,8 @@ def extract_reaction_outcomes(reactionID, outcomes):
         reactionID (str): Unique identifier for the reaction.
         outcomes (list): List of outcome objects from a reaction, containing
             reaction time, conversion, products, and analyses data.
+        resolve_molecules (bool, optional): Derive missing product InChIKeys with RDKit
+            (see `resolve_compound`). Defaults to True.
 
     Returns:
         tuple: A tuple containing two elements:
@@ -47,7 +47,7 @@ def extract_reaction_outcomes(reactionID, outcomes):
         # products = 3
         if outcome.products:
             products = outcome.products 
-            products_list, compound_table = extract_product(products)
+            products_list, compound_table = extract_product(products, resolve_molecules)
             outcome_identifiers.extend(compound_table)
         else:
             products_list = None
@@ -63,7 +63,7 @@ def extract_reaction_outcomes(reactionID, outcomes):
     
     return outcomes_list, outcome_identifiers
 
-def extract_product (products):
+def extract_product (products, resolve_molecules=True):
     """
     Extracts product data and related measurements from ORD product objects.
 
@@ -73,6 +73,7 @@ def extract_product (products):
 
     Args:
         products (list): List of product objects from a reaction outcome.
+        resolve_molecules (bool, optional): Derive missing InChIKeys with RDKit. Defaults to True.
 
     Returns:
         tuple: A tuple containing two elements:
@@ -91,8 +92,9 @@ def extract_product (products):
         # identifiers = 1
         if product.identifiers:
             identifiers = product.identifiers
-            inchi_key, identifier_list = extract_compound_identifiers(identifiers)
-            compound_identifiers.append(generate_compound_table(identifiers))
+            compound = resolve_compound(identifiers, resolve_molecules)
+            inchi_key, identifier_list = compound.inchi_key, compound.identifiers
+            compound_identifiers.append(compound.compound_row)
         else: 
             identifier_list = None
             inchi_key = None
@@ -104,7 +106,7 @@ def extract_product (products):
         # measurements = 3 
         if product.measurements:
             measurements = product.measurements 
-            measurement_list = extract_product_measurements(measurements)
+            measurement_list = extract_product_measurements(measurements, inchi_key, identifier_list)
             products_measurements.append(measurement_list)
         else: 
             measurement_list = None
@@ -130,7 +132,7 @@ def extract_product (products):
             product.isolated_color, product_texture, feature_dict, reaction_role])
     
     return products_list, compound_identifiers
-def extract_product_measurements(measurements):
+def extract_product_measurements(measurements, inchi_key=None, identifier_list=None):
     """
     Extracts measurement data from ORD product measurements.
 
@@ -140,6 +142,8 @@ def extract_product_measurements(measurements):
 
     Args:
         measurements (list): List of measurement objects associated with a product.
+        inchi_key (str, optional): InChIKey of the product. Defaults to None.
+        identifier_list (dict, optional): Identifiers of the product. Defaults to None.
 
     Returns:
         list: A list of lists, where each inner list contains measurement data:
@@ -174,7 +178,7 @@ def extract_product_measurements(measurements):
         
         # amount = 11 
         elif measurement_value_type == 'amount':
-            amount_type, measurement_value, measurement_value_unit = extract_amount(measurement.amount)
+            measurement_value, measurement_value_unit = extract_amount(measurement)
         
         else: 
             measurement_value = None
@@ -190,6 +194,8 @@ def extract_product_measurements(measurements):
 
         if measurement.selectivity:
             select_type = enums_data['ProductMeasurement.Selectivity.SelectivityType'][measurement.selectivity.type]
+        else:
+            select_type = None
         
         # mass_spec_details = 13
         if measurement.mass_spec_details:
@@ -240,8 +246,8 @@ def extract_analyses(analyses):
             {'analysisKey': str, 'analysisType': str, 'Details': str, 'CHMO_ID': str, 'IsolatedSpecies': bool, 'data': dict, 'instrumentManufacturer': str, 'lastCalibrated': datetime}
     """
     analyses_list = []
-    data_dict = {}
     for analysis_key, analysis in analyses.items():
+        data_dict = {}
         analysis_type = enums_data['Analysis.AnalysisType'].get(analysis.type, 'UNKNOWN')
         for data_key, data in analysis.data.items(): 
             value = getattr(data, data.WhichOneof('kind'))
@@ -0,0 +1,92 @@
+# import requirements:
+import queue
+import threading
+
+# =============================================================================
+#               PIPELINE STAGES CONNECTED BY BOUNDED QUEUES
+# =============================================================================
+
+# number of items a stage may produce ahead of its consumer
+QUEUE_SIZE = 4
+
+# how often (in seconds) a stage blocked on a full queue checks whether its consumer has stopped
+_POLL_INTERVAL = 0.1
+
+# marks the end of a stage's output
+_DONE = object()
+
+
+class _Failure:
+    # carries an exception raised in a stage to its consumer
+    def __init__(self, error):
+        self.error = error
+
+
+def threaded_stage(iterable, queue_size=QUEUE_SIZE, name='ord-rxn-converter-stage'):
+
+    """
+    Runs an iterator on a background thread, at most `queue_size` items ahead of its consumer.
+
+    This is the building block of the conversion pipeline: chaining stages lets reading and
+    decompressing, extracting and writing overlap, so throughput is bounded by the slowest stage
+    rather than by the sum of all of them. The bounded queue provides backpressure: a stage that
+    runs ahead blocks until its consumer catches up, so memory use stays bounded.
+
+    The iterator is started on the first `next()` call. An exception raised by the iterator is
+    re-raised in the consumer; if the consumer stops early (or fails), the stage is stopped and
+    the iterator closed on its own thread, e.g. shutting down its worker processes.
+
+    Args:
+        iterable (iterable): Items to produce on the background thread.
+        queue_size (int, optional): Maximum number of items buffered ahead. Defaults to `QUEUE_SIZE`.
+        name (str, optional): Name of the background thread. Defaults to 'ord-rxn-converter-stage'.
+
+    Yields:
+        The items of `iterable`, in order.
+
+    Example:
+        >>> from pipeline_module import threaded_stage
+        >>> for rows in threaded_stage(iter_reactions("example_dataset.pb.gz", batch_size=1000)):
+        ...     writer.write(rows)   # writes while the next batches are extracted
+    """
+
+    items = queue.Queue(maxsize=queue_size)
+    stopped = threading.Event()
+
+    def put(item):
+        while not stopped.is_set():
+            try:
+                items.put(item, timeout=_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        iterator = iter(iterable)
+        try:
+            for item in iterator:
+                if not put(item):
+                    break
+            else:
+                put(_DONE)
+        except Exception as error:
+            put(_Failure(error))
+        finally:
+            close = getattr(iterator, 'close', None)
+            if close is not None:
+                close()
+
+    thread = threading.Thread(target=produce, name=name, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = items.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _Failure):
+                raise item.error
+            yield item
+    finally:
+        stopped.set()
+        thread.join()
@@ -0,0 +1,343 @@
+# import requirements:
+import sqlite3
+from ord_rxn_converter.dataset_module import TABLE_COLUMNS, DEFAULT_TABLES, iter_reactions, extract_dataset_metadata
+from ord_rxn_converter.reader_module import read_dataset_header
+from ord_rxn_converter.registry_module import CompoundRegistry, PersonRegistry
+from ord_rxn_converter.schema_module import column_type, is_nested, normalise_value, to_text
+
+# =============================================================================
+#               RELATIONAL SCHEMA OF THE OUTPUT TABLES
+# =============================================================================
+
+SQL_TYPES = {'string': 'TEXT', 'float': 'REAL', 'int': 'INTEGER', 'bool': 'BOOLEAN'}
+
+PRIMARY_KEYS = {
+    "dataset_metadata" : 'datasetID',
+    "reaction_metadata" : 'reactionID',
+    "reaction_outcomes" : 'outcomeKey',
+    "compound" : 'InChIKey',
+    "person" : 'ORCiD',
+}
+
+# (column, referenced table, referenced column)
+FOREIGN_KEYS = {
+    "reaction_metadata" : [('datasetID', 'dataset_metadata', 'datasetID'), ('experimenter', 'person', 'ORCiD'),
+                           ('recordCreatedPerson', 'person', 'ORCiD')],
+    "reaction_identifiers" : [('reactionID', 'reaction_metadata', 'reactionID')],
+    "input_components" : [('reactionID', 'reaction_metadata', 'reactionID'), ('compoundIdenfiers', 'compound', 'InChIKey')],
+    "input_addition" : [('reactionID', 'reaction_metadata', 'reactionID')],
+    "reaction_setup" : [('reactionID', 'reaction_metadata', 'reactionID')],
+    "reaction_conditions" : [('reactionID', 'reaction_metadata', 'reactionID')],
+    "reaction_notes" : [('reactionID', 'reaction_metadata', 'reactionID')],
+    "reaction_workups" : [('reactionID', 'reaction_metadata', 'reactionID')],
+    "reaction_outcomes" : [('reactionID', 'reaction_metadata', 'reactionID')],
+    "temperature_measurements" : [('reactionID', 'reaction_metadata', 'reactionID')],
+    "pressure_measurements" : [('reactionID', 'reaction_metadata', 'reactionID')],
+    "electrochemistry_measurements" : [('reactionID', 'reaction_metadata', 'reactionID')],
+    "product_measurements" : [('reactionID', 'reaction_metadata', 'reactionID'), ('outcomeKey', 'reaction_outcomes', 'outcomeKey'),
+                              ('InChIKey', 'compound', 'InChIKey')],
+    "analysis_data" : [('reactionID', 'reaction_metadata', 'reactionID'), ('outcomeKey', 'reaction_outcomes', 'outcomeKey')],
+}
+
+# referenced tables first, so that rows of a batch can be inserted in this order
+TABLE_ORDER = ['dataset_metadata', 'person', 'compound', 'reaction_metadata', 'reaction_identifiers', 'input_components',
+               'input_addition', 'reaction_setup', 'reaction_conditions', 'reaction_notes', 'reaction_workups',
+               'reaction_outcomes', 'temperature_measurements', 'pressure_measurements', 'electrochemistry_measurements',
+               'product_measurements', 'analysis_data']
+
+# tables whose rows are shared between reactions and datasets and are inserted with upsert semantics
+UPSERT_TABLES = ('dataset_metadata', 'compound', 'person')
+
+# number of reaction IDs bound to one DELETE statement (SQLite allows 999 parameters by default)
+DELETE_BATCH_SIZE = 500
+
+def _quote(name):
+    return f'"{name}"'
+
+def create_table_statements(tables=None):
+
+    """
+    Generates the `CREATE TABLE` and `CREATE INDEX` statements of the relational schema.
+
+    Scalar columns get SQL types from `schema_module`; nested columns (conditions, products,
+    analyses, ...) are stored as JSON text. Reaction tables reference `reaction_metadata` on
+    `reactionID`, and compounds and persons are keyed on `InChIKey` and `ORCiD`.
+
+    Args:
+        tables (list, optional): Tables to create. Defaults to None (`DEFAULT_TABLES`: all but the normalised child tables).
+
+    Returns:
+        list: SQL statements, in dependency order.
+
+    Example:
+        >>> from rdb_module import create_table_statements
+        >>> print(create_table_statements(['person'])[0])
+        CREATE TABLE IF NOT EXISTS "person" ("ORCiD" TEXT PRIMARY KEY, ...)
+    """
+
+    if tables is None:
+        tables = DEFAULT_TABLES
+
+    statements = []
+    for table in TABLE_ORDER:
+        if table not in tables:
+            continue
+
+        column_definitions = []
+        for column in TABLE_COLUMNS[table]:
+            spec = column_type(table, column)
+            definition = f"{_quote(column)} {'TEXT' if is_nested(spec) else SQL_TYPES[spec]}"
+            if PRIMARY_KEYS.get(table) == column:
+                definition += ' PRIMARY KEY'
+            column_definitions.append(definition)
+
+        for column, referenced_table, referenced_column in FOREIGN_KEYS.get(table, []):
+            if referenced_table in tables:
+                column_definitions.append(f"FOREIGN KEY ({_quote(column)}) REFERENCES {_quote(referenced_table)} ({_quote(referenced_column)})")
+
+        statements.append(f"CREATE TABLE IF NOT EXISTS {_quote(table)} ({', '.join(column_definitions)})")
+
+        if table not in PRIMARY_KEYS:
+            for column in ('reactionID', 'outcomeKey'):
+                if column in TABLE_COLUMNS[table]:
+                    statements.append(f"CREATE INDEX IF NOT EXISTS {_quote(f'{table}_{column}')} ON {_quote(table)} ({_quote(column)})")
+
+    return statements
+
+def to_sql_row(table, row):
+
+    """
+    Converts an extracted row to SQL parameters: scalars keep their type, nested values become JSON
+    text, and empty foreign keys (e.g. components without an InChIKey) become NULL.
+
+    Args:
+        table (str): Table name.
+        row (list): Row in the table's column order.
+
+    Returns:
+        tuple: The parameters for an `INSERT` statement.
+    """
+
+    foreign_key_columns = [column for column, _, _ in FOREIGN_KEYS.get(table, [])]
+    values = []
+    for column, value in zip(TABLE_COLUMNS[table], row):
+        spec = column_type(table, column)
+        if column in foreign_key_columns and value == '':
+            value = None
+        values.append(to_text(value) if is_nested(spec) else normalise_value(value, spec))
+    return tuple(values)
+
+# =============================================================================
+#               BULK LOADER
+# =============================================================================
+
+class RDBLoader:
+
+    """
+    Bulk-loads output tables into a relational database through a DB-API 2.0 connection.
+
+    Rows are inserted with one parameterised `executemany` per table and batch, and committed in
+    large transactions of `transaction_size` rows. `compound`, `person` and `dataset_metadata`
+    rows are upserted (existing keys are kept), so datasets can be loaded into the same database
+    one after another. Any DB-API connection can be used; pass the driver's `paramstyle`
+    ('qmark' for sqlite3, 'format' or 'pyformat' for e.g. psycopg).
+
+    Args:
+        connection: An open DB-API 2.0 connection.
+        tables (list, optional): Tables to load. Defaults to None (`DEFAULT_TABLES`: all but the normalised child tables).
+        paramstyle (str, optional): Placeholder style of the driver. Defaults to 'qmark'.
+        transaction_size (int, optional): Number of rows inserted between commits. Defaults to 100000.
+
+    Example:
+        >>> from rdb_module import RDBLoader, connect_sqlite
+        >>> with RDBLoader(connect_sqlite("ord.sqlite")) as loader:
+        ...     for rows in iter_reactions("example_dataset.pb.gz", batch_size=1000):
+        ...         loader.write(rows)
+    """
+
+    def __init__(self, connection, tables=None, paramstyle='qmark', transaction_size=100000):
+        if paramstyle not in ('qmark', 'format', 'pyformat'):
+            raise ValueError(f"Unsupported paramstyle {paramstyle}")
+        self.connection = connection
+        self.tables = list(tables) if tables is not None else list(DEFAULT_TABLES)
+        self.placeholder = '?' if paramstyle == 'qmark' else '%s'
+        self.transaction_size = transaction_size
+        self.rows_written = 0
+        self._uncommitted = 0
+        self._compounds = CompoundRegistry()
+        self._persons = PersonRegistry()
+        self._statements = {table: self._insert_statement(table) for table in self.tables}
+
+    def _insert_statement(self, table):
+        columns = ', '.join(_quote(column) for column in TABLE_COLUMNS[table])
+        placeholders = ', '.join([self.placeholder] * len(TABLE_COLUMNS[table]))
+        statement = f"INSERT INTO {_quote(table)} ({columns}) VALUES ({placeholders})"
+        if table in UPSERT_TABLES:
+            statement += f" ON CONFLICT ({_quote(PRIMARY_KEYS[table])}) DO NOTHING"
+        return statement
+
+    def create_tables(self):
+
+        """
+        Creates the selected tables and their indexes if they do not exist yet.
+        """
+
+        cursor = self.connection.cursor()
+        for statement in create_table_statements(self.tables):
+            cursor.execute(statement)
+        self.connection.commit()
+
+    def write(self, rows):
+
+        """
+        Inserts the rows of several tables, e.g. one item yielded by `dataset_module.iter_reactions`.
+
+        Tables are inserted with referenced tables first. Compound and person rows already sent
+        during this load are skipped before reaching the database.
+
+        Args:
+            rows (dict): Rows per table name.
+        """
+
+        for table in TABLE_ORDER:
+            if table not in rows:
+                continue
+            table_rows = rows[table]
+            if table == 'compound':
+                table_rows = [row for row in table_rows if self._compounds.add(row)]
+            elif table == 'person':
+                table_rows = [row for row in table_rows if self._persons.add(row)]
+            self.write_rows(table, table_rows)
+
+    def write_rows(self, table, rows):
+
+        """
+        Inserts rows of one table with a single `executemany`.
+
+        Args:
+            table (str): Table name.
+            rows (iterable): Rows in the table's column order.
+        """
+
+        if table not in self._statements:
+            return
+        parameters = [to_sql_row(table, row) for row in rows]
+        if not parameters:
+            return
+
+        self.connection.cursor().executemany(self._statements[table], parameters)
+        self.rows_written += len(parameters)
+        self._uncommitted += len(parameters)
+        if self._uncommitted >= self.transaction_size:
+            self.commit()
+
+    def delete_reactions(self, reactionIDs):
+
+        """
+        Deletes the rows of the given reactions from every loaded table with a `reactionID` column,
+        e.g. before the new rows of changed reactions are written or when reactions were removed
+        from a dataset. Child tables are cleared before the tables they reference.
+
+        Compound and person rows are kept, since other reactions may refer to them.
+
+        Args:
+            reactionIDs (iterable): MDS reaction IDs.
+
+        Returns:
+            int: Number of rows deleted.
+        """
+
+        reactionIDs = list(reactionIDs)
+        cursor = self.connection.cursor()
+        deleted = 0
+        for table in reversed(TABLE_ORDER):
+            if table not in self.tables or 'reactionID' not in TABLE_COLUMNS[table]:
+                continue
+            for start in range(0, len(reactionIDs), DELETE_BATCH_SIZE):
+                chunk = reactionIDs[start:start + DELETE_BATCH_SIZE]
+                placeholders = ', '.join([self.placeholder] * len(chunk))
+                cursor.execute(f"DELETE FROM {_quote(table)} WHERE {_quote('reactionID')} IN ({placeholders})", chunk)
+                deleted += max(cursor.rowcount, 0)
+        self._uncommitted += deleted
+        return deleted
+
+    def commit(self):
+
+        """
+        Commits the current transaction.
+        """
+
+        self.connection.commit()
+        self._uncommitted = 0
+
+    def close(self):
+
+        """
+        Commits outstanding rows. The connection itself is left open.
+        """
+
+        self.commit()
+
+    def __enter__(self):
+        self.create_tables()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.connection.rollback()
+
+
+def connect_sqlite(path):
+
+    """
+    Opens a SQLite database tuned for bulk loading (write-ahead log, relaxed fsync).
+
+    Args:
+        path (str): Path of the database file.
+
+    Returns:
+        sqlite3.Connection: The open connection.
+    """
+
+    connection = sqlite3.connect(path)
+    connection.execute('PRAGMA journal_mode = WAL')
+    connection.execute('PRAGMA synchronous = NORMAL')
+    return connection
+
+def load_dataset(filepath, connection, tables=None, paramstyle='qmark', batch_size=1000, workers=1, transaction_size=100000,
+                 normalised=False):
+
+    """
+    Streams an ORD dataset file into a relational database.
+
+    Args:
+        filepath (str): Path to the input file (either zipped or unzipped Google Protobuf format).
+        connection: An open DB-API 2.0 connection, e.g. from `connect_sqlite`.
+        tables (list, optional): Tables to load. Defaults to None (all tables; child tables only with `normalised`).
+        paramstyle (str, optional): Placeholder style of the driver. Defaults to 'qmark'.
+        batch_size (int, optional): Number of reactions extracted and inserted per batch. Defaults to 1000.
+        workers (int, optional): Number of extraction processes. Defaults to 1.
+        transaction_size (int, optional): Number of rows inserted between commits. Defaults to 100000.
+        normalised (bool, optional): Also load the child tables of `normalised_module`. Defaults to False.
+
+    Returns:
+        int: Number of rows inserted.
+
+    Example:
+        >>> from rdb_module import load_dataset, connect_sqlite
+        >>> load_dataset("example_dataset.pb.gz", connect_sqlite("ord.sqlite"), workers=4)
+    """
+
+    dataset_metadata = extract_dataset_metadata(read_dataset_header(filepath))
+    if tables is None and normalised:
+        tables = list(TABLE_COLUMNS)
+
+    with RDBLoader(connection, tables=tables, paramstyle=paramstyle, transaction_size=transaction_size) as loader:
+        loader.write({"dataset_metadata": [dataset_metadata]})
+        for rows in iter_reactions(filepath, dataset_metadata[0], batch_size=batch_size, workers=workers,
+                                   normalised=normalised, tables=tables):
+            loader.write(rows)
+
+    return loader.rows_written
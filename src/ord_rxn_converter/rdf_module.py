@@ -0,0 +1,333 @@
+# import requirements:
+import gzip
+import json
+import math
+from urllib.parse import quote
+from ord_rxn_converter.dataset_module import TABLE_COLUMNS, DEFAULT_TABLES, iter_reactions, extract_dataset_metadata
+from ord_rxn_converter.rdb_module import PRIMARY_KEYS, FOREIGN_KEYS
+from ord_rxn_converter.reader_module import read_dataset_header
+from ord_rxn_converter.schema_module import column_type, is_nested, normalise_value, to_plain
+
+# =============================================================================
+#               RDF VOCABULARY OF THE OUTPUT TABLES
+# =============================================================================
+
+# namespace of the generated resources and of the table and column vocabulary
+DEFAULT_BASE_IRI = 'https://github.com/cwru-sdle/ord_rxn_converter#'
+
+RDF_TYPE = 'http://www.w3.org/1999/02/22-rdf-syntax-ns#type'
+RDF_JSON = 'http://www.w3.org/1999/02/22-rdf-syntax-ns#JSON'
+XSD = 'http://www.w3.org/2001/XMLSchema#'
+ORCID_IRI = 'https://orcid.org/'
+
+XSD_TYPES = {'float': XSD + 'double', 'int': XSD + 'integer', 'bool': XSD + 'boolean'}
+
+# class of the resource described by one row of each table
+TABLE_CLASSES = {
+    "dataset_metadata" : 'Dataset',
+    "reaction_metadata" : 'Reaction',
+    "reaction_identifiers" : 'ReactionIdentifier',
+    "input_components" : 'InputComponent',
+    "input_addition" : 'InputAddition',
+    "reaction_setup" : 'ReactionSetup',
+    "reaction_conditions" : 'ReactionConditions',
+    "reaction_notes" : 'ReactionNotes',
+    "reaction_workups" : 'ReactionWorkup',
+    "reaction_outcomes" : 'ReactionOutcome',
+    "compound" : 'Compound',
+    "person" : 'Person',
+    "temperature_measurements" : 'TemperatureMeasurement',
+    "pressure_measurements" : 'PressureMeasurement',
+    "electrochemistry_measurements" : 'ElectrochemistryMeasurement',
+    "product_measurements" : 'ProductMeasurement',
+    "analysis_data" : 'AnalysisData',
+}
+
+# tables whose rows are shared between reactions and are described once
+SHARED_TABLES = ('dataset_metadata', 'compound', 'person')
+
+SERIALIZATION_FORMATS = ('nt', 'ttl')
+
+def escape_literal(text) -> str:
+
+    """
+    Escapes a string for use inside a quoted N-Triples / Turtle literal.
+    """
+
+    return (text.replace('\\', '\\\\').replace('"', '\\"')
+                .replace('\n', '\\n').replace('\r', '\\r'))
+
+def format_literal(value, spec) -> str:
+
+    """
+    Formats an extracted value as an RDF literal of its column type.
+
+    Floats, integers and booleans are typed with XML Schema datatypes and nested values are
+    written as `rdf:JSON` literals; strings are plain literals.
+
+    Args:
+        value: Any value found in an extracted table row.
+        spec (str or tuple): The column type spec from `schema_module`.
+
+    Returns:
+        str or None: The literal in N-Triples syntax, or None for missing values.
+
+    Example:
+        >>> from rdf_module import format_literal
+        >>> format_literal('2.5', 'float')
+        '"2.5"^^<http://www.w3.org/2001/XMLSchema#double>'
+    """
+
+    if is_nested(spec):
+        value = to_plain(value)
+        if value is None or value == [] or value == {}:
+            return None
+        return f'"{escape_literal(json.dumps(value))}"^^<{RDF_JSON}>'
+
+    value = normalise_value(value, spec)
+    if value is None or value == '':
+        return None
+    if spec == 'string':
+        return f'"{escape_literal(value)}"'
+    if spec == 'bool':
+        value = 'true' if value else 'false'
+    elif spec == 'float' and not math.isfinite(value):
+        value = 'NaN' if math.isnan(value) else ('INF' if value > 0 else '-INF')
+    return f'"{value}"^^<{XSD_TYPES[spec]}>'
+
+
+class RDFWriter:
+
+    """
+    Serializes output table rows as RDF triples directly to a text stream.
+
+    No graph is built in memory: every row becomes the triples of one resource, which are
+    appended to a buffer that is written to the stream in chunks of about `buffer_size`
+    characters. Rows of `reaction_metadata`, `compound`, `person` and `dataset_metadata` are
+    named by their keys (reaction ID, InChIKey, ORCiD, dataset ID), other rows by their reaction
+    and position, and foreign key columns link to the referenced resources. Only the keys of
+    shared resources already written are remembered, so that compounds and persons are described
+    once.
+
+    Args:
+        stream (file object): Text stream to write to.
+        serialization (str, optional): 'nt' for N-Triples or 'ttl' for Turtle. Defaults to 'nt'.
+        base_iri (str, optional): Namespace of resources, classes and properties. Defaults to `DEFAULT_BASE_IRI`.
+        tables (list, optional): Tables to write. Defaults to None (`DEFAULT_TABLES`: all but the normalised child tables).
+        buffer_size (int, optional): Number of characters buffered before writing. Defaults to 1 << 16.
+
+    Example:
+        >>> from rdf_module import RDFWriter
+        >>> with open("reactions.nt", "w") as stream, RDFWriter(stream) as writer:
+        ...     for rows in iter_reactions("example_dataset.pb.gz", batch_size=1000):
+        ...         writer.write(rows)
+    """
+
+    def __init__(self, stream, serialization='nt', base_iri=DEFAULT_BASE_IRI, tables=None, buffer_size=1 << 16):
+        if serialization not in SERIALIZATION_FORMATS:
+            raise ValueError(f"Unsupported RDF serialization {serialization}")
+        self.stream = stream
+        self.serialization = serialization
+        self.base_iri = base_iri
+        self.tables = list(tables) if tables is not None else list(DEFAULT_TABLES)
+        self.buffer_size = buffer_size
+        self.triples_written = 0
+        self._buffer = []
+        self._buffered = 0
+        self._written_keys = {table: set() for table in SHARED_TABLES}
+
+        if serialization == 'ttl':
+            self._append(f'@prefix : <{base_iri}> .\n@prefix xsd: <{XSD}> .\n\n')
+
+    def resource_iri(self, table, key):
+
+        """
+        Returns the IRI of the resource a table row with the given key describes.
+
+        Args:
+            table (str): Table name.
+            key (str): Value of the table's key column.
+
+        Returns:
+            str: The IRI; persons are identified by their ORCiD IRI.
+        """
+
+        if table == 'person':
+            return ORCID_IRI + quote(key, safe='-')
+        return f"{self.base_iri}{TABLE_CLASSES[table]}/{quote(str(key), safe='-._~')}"
+
+    def _term(self, iri):
+        if self.serialization == 'ttl' and iri.startswith(self.base_iri):
+            local_name = iri[len(self.base_iri):]
+            if local_name.isalnum():
+                return ':' + local_name
+        return f'<{iri}>'
+
+    def _append(self, text):
+        self._buffer.append(text)
+        self._buffered += len(text)
+        if self._buffered >= self.buffer_size:
+            self.flush()
+
+    def _write_resource(self, subject, statements):
+        if self.serialization == 'nt':
+            self._append(''.join(f'<{subject}> {predicate} {value} .\n' for predicate, value in statements))
+        else:
+            body = ' ;\n    '.join(f'{predicate} {value}' for predicate, value in statements)
+            self._append(f'<{subject}> {body} .\n')
+        self.triples_written += len(statements)
+
+    def write(self, rows):
+
+        """
+        Writes the rows of several tables, e.g. one item yielded by `dataset_module.iter_reactions`.
+
+        Args:
+            rows (dict): Rows per table name.
+        """
+
+        for table, table_rows in rows.items():
+            self.write_rows(table, table_rows)
+
+    def write_rows(self, table, rows):
+
+        """
+        Writes rows of one table as RDF resources.
+
+        Rows without a key of their own are numbered per reaction, in the order they are given,
+        so all rows of a reaction should be passed in one call (as `iter_reactions` does).
+
+        Args:
+            table (str): Table name.
+            rows (iterable): Rows in the table's column order.
+        """
+
+        if table not in self.tables:
+            return
+
+        columns = TABLE_COLUMNS[table]
+        key_column = PRIMARY_KEYS.get(table)
+        key_position = columns.index(key_column) if key_column else columns.index('reactionID')
+        foreign_keys = {column: referenced_table for column, referenced_table, _ in FOREIGN_KEYS.get(table, [])}
+        type_statement = (self._term(RDF_TYPE) if self.serialization == 'nt' else 'a',
+                          self._term(self.base_iri + TABLE_CLASSES[table]))
+        row_numbers = {}
+
+        for row in rows:
+            key = row[key_position]
+            if key is None or key == '':
+                continue
+            if table in self._written_keys:
+                if key in self._written_keys[table]:
+                    continue
+                self._written_keys[table].add(key)
+
+            if key_column:
+                subject = self.resource_iri(table, key)
+            else:
+                row_numbers[key] = row_numbers.get(key, 0) + 1
+                subject = f"{self.resource_iri('reaction_metadata', key)}/{table}/{row_numbers[key]}"
+
+            statements = [type_statement]
+            for column, value in zip(columns, row):
+                if column == key_column:
+                    continue
+                if column in foreign_keys:
+                    if value is None or value == '':
+                        continue
+                    statement_value = f'<{self.resource_iri(foreign_keys[column], value)}>'
+                else:
+                    statement_value = format_literal(value, column_type(table, column))
+                    if statement_value is None:
+                        continue
+                statements.append((self._term(self.base_iri + column), statement_value))
+            self._write_resource(subject, statements)
+
+    def flush(self):
+
+        """
+        Writes buffered triples to the stream.
+        """
+
+        if self._buffer:
+            self.stream.write(''.join(self._buffer))
+            self._buffer = []
+            self._buffered = 0
+
+    def close(self):
+
+        """
+        Writes buffered triples. The stream itself is left open.
+        """
+
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class RDFFileWriter(RDFWriter):
+
+    """
+    An `RDFWriter` that opens and closes its output file; `.gz` files are compressed.
+
+    Args:
+        path (str): Path of the RDF file.
+        serialization (str, optional): 'nt' or 'ttl'. Defaults to None (guessed from `path`, N-Triples otherwise).
+        **kwargs: Further arguments of `RDFWriter`.
+    """
+
+    def __init__(self, path, serialization=None, **kwargs):
+        if serialization is None:
+            serialization = 'ttl' if path.endswith(('.ttl', '.ttl.gz')) else 'nt'
+        open_output = gzip.open if path.endswith('.gz') else open
+        super().__init__(open_output(path, 'wt', encoding='utf-8'), serialization=serialization, **kwargs)
+
+    def close(self):
+
+        """
+        Writes buffered triples and closes the file.
+        """
+
+        super().close()
+        self.stream.close()
+
+
+def write_rdf(filepath, output, serialization=None, base_iri=DEFAULT_BASE_IRI, tables=None, batch_size=256, workers=1,
+              normalised=False):
+
+    """
+    Converts an ORD dataset file to N-Triples or Turtle, streaming reactions with bounded memory.
+
+    Args:
+        filepath (str): Path to the input file (either zipped or unzipped Google Protobuf format).
+        output (str): Path of the RDF file; `.gz` output is compressed.
+        serialization (str, optional): 'nt' or 'ttl'. Defaults to None (guessed from `output`, N-Triples otherwise).
+        base_iri (str, optional): Namespace of resources, classes and properties. Defaults to `DEFAULT_BASE_IRI`.
+        tables (list, optional): Tables to write. Defaults to None (all tables; child tables only with `normalised`).
+        batch_size (int, optional): Number of reactions extracted per batch. Defaults to 256.
+        workers (int, optional): Number of extraction processes. Defaults to 1.
+        normalised (bool, optional): Also write the child tables of `normalised_module`. Defaults to False.
+
+    Returns:
+        int: Number of triples written.
+
+    Example:
+        >>> from rdf_module import write_rdf
+        >>> write_rdf("example_dataset.pb.gz", "example_dataset.nt.gz", workers=4)
+    """
+
+    dataset_metadata = extract_dataset_metadata(read_dataset_header(filepath))
+    if tables is None and normalised:
+        tables = list(TABLE_COLUMNS)
+
+    with RDFFileWriter(output, serialization=serialization, base_iri=base_iri, tables=tables) as writer:
+        writer.write_rows("dataset_metadata", [dataset_metadata])
+        for rows in iter_reactions(filepath, dataset_metadata[0], batch_size=batch_size, workers=workers,
+                                   normalised=normalised, tables=tables):
+            writer.write(rows)
+
+    return writer.triples_written
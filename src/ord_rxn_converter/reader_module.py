@@ -0,0 +1,691 @@
+# import requirements:
+import gzip
+import io
+import mmap
+import os
+import pathlib
+import queue
+import threading
+from array import array
+from functools import lru_cache
+from ord_schema.proto import dataset_pb2, reaction_pb2
+from google.protobuf.message import DecodeError
+
+# =============================================================================
+#               FUNCTIONS TO STREAM REACTIONS FROM DATASET FILES
+# =============================================================================
+
+# field numbers of the top-level Dataset message (see dataset.proto)
+DATASET_REACTIONS_FIELD = 3
+
+# field number of `reaction_id` in the Reaction message (see reaction.proto); the fields before it are skipped when scanning for it
+REACTION_ID_FIELD = 10
+
+# protobuf wire types
+WIRETYPE_VARINT = 0
+WIRETYPE_FIXED64 = 1
+WIRETYPE_LENGTH_DELIMITED = 2
+WIRETYPE_FIXED32 = 5
+
+# suffixes that `load_message` treats as binary (wire format) files
+BINARY_SUFFIXES = ('.pb', '.binpb')
+
+# size of the decompressed chunks handed from the decompression thread to the parser
+DECOMPRESS_CHUNK_SIZE = 1 << 20
+
+# number of decompressed chunks buffered ahead of the parser; with the chunk being parsed,
+# this bounds the memory used for the uncompressed payload
+DECOMPRESS_QUEUE_SIZE = 4
+
+
+def _load_dataset(filepath):
+    # text formats are parsed whole; ord_schema.message_helpers (and the pandas it
+    # imports) is only loaded when such a file is read
+    from ord_schema.message_helpers import load_message
+    return load_message(filepath, dataset_pb2.Dataset)
+
+
+def is_binary_dataset(filepath) -> bool:
+    """
+    Checks whether a dataset file is serialized in binary wire format (`.pb`, `.binpb`, optionally gzipped).
+
+    Args:
+        filepath (str): Path to the dataset file.
+
+    Returns:
+        bool: True for binary files, False for text formats such as `.pbtxt` or `.json`.
+    """
+    suffixes = pathlib.Path(filepath).suffixes
+    if suffixes and suffixes[-1] == '.gz':
+        suffixes = suffixes[:-1]
+    return bool(suffixes) and suffixes[-1] in BINARY_SUFFIXES
+
+
+@lru_cache(maxsize=None)
+def gzip_opener():
+    """
+    Returns the `open` function of the fastest installed gzip implementation.
+
+    python-isal (`isal.igzip`) and zlib-ng (`zlib_ng.gzip_ng`) are drop-in replacements of the
+    standard library `gzip` that decompress several times faster; they are used when installed
+    (`pip install ord_rxn_converter[fastgzip]`), otherwise `gzip.open` is.
+
+    Returns:
+        callable: Function opening a gzip file like `gzip.open(path, 'rb')`.
+    """
+    try:
+        from isal import igzip
+        return igzip.open
+    except ImportError:
+        pass
+    try:
+        from zlib_ng import gzip_ng
+        return gzip_ng.open
+    except ImportError:
+        pass
+    return gzip.open
+
+
+class ThreadedDecompressor(io.RawIOBase):
+    """
+    Decompresses a gzip file on a background thread, in fixed-size chunks, ahead of its reader.
+
+    The decompressor (see `gzip_opener`) releases the GIL while it inflates, so decompressing
+    the next chunks overlaps with parsing and extracting the current reactions. At most
+    `queue_size` chunks of `chunk_size` bytes are buffered, so memory use does not grow with the
+    file; the thread waits while the buffer is full. Errors of the decompressor (e.g. a corrupt
+    file) are raised by `read`. As with `gzip.GzipFile`, seeking forward decompresses and
+    discards the bytes in between; seeking backward is not supported.
+
+    Args:
+        filepath (str): Path to the gzip file.
+        chunk_size (int, optional): Uncompressed bytes per chunk. Defaults to `DECOMPRESS_CHUNK_SIZE`.
+        queue_size (int, optional): Number of chunks buffered ahead. Defaults to `DECOMPRESS_QUEUE_SIZE`.
+
+    Example:
+        >>> stream = io.BufferedReader(ThreadedDecompressor("example_dataset.pb.gz"))
+        >>> for field_number, wire_type, value in iter_dataset_fields(stream):
+        ...     ...
+    """
+
+    def __init__(self, filepath, chunk_size=DECOMPRESS_CHUNK_SIZE, queue_size=DECOMPRESS_QUEUE_SIZE):
+        super().__init__()
+        self._chunks = queue.Queue(maxsize=queue_size)
+        self._chunk = memoryview(b'')
+        self._position = 0
+        self._eof = False
+        self._stopped = threading.Event()
+        # open in the calling thread, so a missing file raises here
+        self._source = gzip_opener()(filepath, 'rb')
+        self._thread = threading.Thread(target=self._decompress, args=(chunk_size,), daemon=True)
+        self._thread.start()
+
+    def _decompress(self, chunk_size):
+        try:
+            with self._source:
+                while not self._stopped.is_set():
+                    chunk = self._source.read(chunk_size)
+                    self._put(chunk)
+                    if not chunk:
+                        return
+        except Exception as error:
+            self._put(error)
+
+    def _put(self, item):
+        # waits for room in the queue, unless the reader has been closed
+        while not self._stopped.is_set():
+            try:
+                self._chunks.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def _next_chunk(self):
+        # False at the end of the file
+        if not self._chunk:
+            if self._eof:
+                return False
+            item = self._chunks.get()
+            if isinstance(item, Exception):
+                self._eof = True
+                raise item
+            if not item:
+                self._eof = True
+                return False
+            self._chunk = memoryview(item)
+        return True
+
+    def readinto(self, buffer):
+        if not self._next_chunk():
+            return 0
+        size = min(len(buffer), len(self._chunk))
+        buffer[:size] = self._chunk[:size]
+        self._chunk = self._chunk[size:]
+        self._position += size
+        return size
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence != io.SEEK_SET:
+            raise io.UnsupportedOperation("Can only seek forward from the start or current position")
+        if offset < self._position:
+            raise io.UnsupportedOperation("Cannot seek backward in a decompressed stream")
+        while self._position < offset and self._next_chunk():
+            size = min(offset - self._position, len(self._chunk))
+            self._chunk = self._chunk[size:]
+            self._position += size
+        return self._position
+
+    def close(self):
+        if not self.closed:
+            self._stopped.set()
+            self._thread.join()
+        super().close()
+
+
+def open_dataset(filepath):
+    """
+    Opens a binary dataset file for reading, transparently decompressing `.gz` files.
+
+    Gzipped files are decompressed on a background thread with bounded buffers
+    (see `ThreadedDecompressor`), using a fast gzip implementation when one is installed.
+
+    Args:
+        filepath (str): Path to the dataset file.
+
+    Returns:
+        file object: Binary stream positioned at the start of the serialized `Dataset`.
+    """
+    path = pathlib.Path(filepath)
+    if path.suffix == '.gz':
+        return io.BufferedReader(ThreadedDecompressor(path))
+    return open(path, 'rb')
+
+
+def read_varint(stream):
+    """
+    Reads one base-128 varint from a binary stream.
+
+    Args:
+        stream (file object): Binary stream.
+
+    Returns:
+        int or None: The decoded integer, or None if the stream is exhausted.
+
+    Raises:
+        ValueError: If the stream ends in the middle of a varint.
+    """
+    result = 0
+    shift = 0
+    while True:
+        byte = stream.read(1)
+        if not byte:
+            if shift == 0:
+                return None
+            raise ValueError("Truncated varint in dataset stream")
+        result |= (byte[0] & 0x7F) << shift
+        if not byte[0] & 0x80:
+            return result
+        shift += 7
+
+
+def encode_varint(value) -> bytes:
+    """
+    Encodes a non-negative integer as a base-128 varint.
+
+    Args:
+        value (int): Integer to encode.
+
+    Returns:
+        bytes: The varint encoding.
+    """
+    encoded = bytearray()
+    while True:
+        bits = value & 0x7F
+        value >>= 7
+        if value:
+            encoded.append(bits | 0x80)
+        else:
+            encoded.append(bits)
+            return bytes(encoded)
+
+
+def _read_exactly(stream, size) -> bytes:
+    data = stream.read(size)
+    if len(data) != size:
+        raise ValueError("Truncated field in dataset stream")
+    return data
+
+
+def iter_dataset_fields(stream, skip_fields=()):
+    """
+    Scans the top-level fields of a serialized message one field at a time.
+
+    Only the current field is held in memory, so a `Dataset` of any size can be walked with
+    bounded memory. Length-delimited fields listed in `skip_fields` are skipped without being read.
+
+    Args:
+        stream (file object): Binary stream positioned at the start of the message.
+        skip_fields (tuple, optional): Field numbers whose payload should be skipped. Defaults to ().
+
+    Yields:
+        tuple: (field_number, wire_type, value) where `value` is an int for varints, bytes for
+            fixed-width and length-delimited fields, and None for skipped fields.
+
+    Raises:
+        ValueError: If the stream is truncated or uses an unsupported wire type.
+    """
+    while True:
+        tag = read_varint(stream)
+        if tag is None:
+            return
+        field_number, wire_type = tag >> 3, tag & 0x7
+
+        if wire_type == WIRETYPE_VARINT:
+            yield field_number, wire_type, read_varint(stream)
+        elif wire_type == WIRETYPE_FIXED64:
+            yield field_number, wire_type, _read_exactly(stream, 8)
+        elif wire_type == WIRETYPE_FIXED32:
+            yield field_number, wire_type, _read_exactly(stream, 4)
+        elif wire_type == WIRETYPE_LENGTH_DELIMITED:
+            length = read_varint(stream)
+            if field_number in skip_fields:
+                stream.seek(length, io.SEEK_CUR)
+                yield field_number, wire_type, None
+            else:
+                yield field_number, wire_type, _read_exactly(stream, length)
+        else:
+            raise ValueError(f"Unsupported wire type {wire_type} for field {field_number}")
+
+
+def read_dataset_header(filepath):
+    """
+    Reads every `Dataset` field except `reactions`.
+
+    Reaction payloads are skipped rather than parsed, so the dataset ID, name and description
+    can be obtained without materialising the reactions.
+
+    Args:
+        filepath (str): Path to the dataset file.
+
+    Returns:
+        dataset_pb2.Dataset: Dataset message with an empty `reactions` field.
+
+    Raises:
+        ValueError: If the file cannot be parsed as a `Dataset`.
+
+    Example:
+        >>> from reader_module import read_dataset_header
+        >>> read_dataset_header("example_dataset.pb.gz").dataset_id
+        'ord_dataset-...'
+    """
+    if not is_binary_dataset(filepath):
+        dataset = _load_dataset(filepath)
+        del dataset.reactions[:]
+        return dataset
+
+    header = bytearray()
+    with open_dataset(filepath) as stream:
+        for field_number, wire_type, value in iter_dataset_fields(stream, skip_fields=(DATASET_REACTIONS_FIELD,)):
+            if field_number == DATASET_REACTIONS_FIELD:
+                continue
+            header += encode_varint(field_number << 3 | wire_type)
+            if wire_type == WIRETYPE_VARINT:
+                header += encode_varint(value)
+            elif wire_type == WIRETYPE_LENGTH_DELIMITED:
+                header += encode_varint(len(value)) + value
+            else:
+                header += value
+    try:
+        return dataset_pb2.Dataset.FromString(bytes(header))
+    except DecodeError as error:
+        raise ValueError(f"error parsing {filepath}: {error}") from error
+
+
+def iter_reaction_bytes(filepath):
+    """
+    Yields the serialized `Reaction` messages of a dataset file one at a time.
+
+    Args:
+        filepath (str): Path to the dataset file.
+
+    Yields:
+        bytes: Wire-format encoding of one `reaction_pb2.Reaction`.
+    """
+    if not is_binary_dataset(filepath):
+        for reaction in _load_dataset(filepath).reactions:
+            yield reaction.SerializeToString()
+        return
+
+    with open_dataset(filepath) as stream:
+        for field_number, wire_type, value in iter_dataset_fields(stream):
+            if field_number == DATASET_REACTIONS_FIELD and wire_type == WIRETYPE_LENGTH_DELIMITED:
+                yield value
+
+
+def iter_reaction_messages(filepath):
+    """
+    Yields the `Reaction` messages of a dataset file one at a time without loading the whole `Dataset`.
+
+    Binary files (`.pb`, `.pb.gz`) are decoded incrementally from the wire format; text formats
+    (`.pbtxt`, `.json`) fall back to `load_message`.
+
+    Args:
+        filepath (str): Path to the dataset file.
+
+    Yields:
+        reaction_pb2.Reaction: The next reaction of the dataset.
+
+    Raises:
+        ValueError: If a reaction cannot be parsed.
+
+    Example:
+        >>> from reader_module import iter_reaction_messages
+        >>> for reaction in iter_reaction_messages("example_dataset.pb.gz"):
+        ...     print(reaction.reaction_id)
+    """
+    if not is_binary_dataset(filepath):
+        yield from _load_dataset(filepath).reactions
+        return
+
+    for data in iter_reaction_bytes(filepath):
+        try:
+            yield reaction_pb2.Reaction.FromString(data)
+        except DecodeError as error:
+            raise ValueError(f"error parsing {filepath}: {error}") from error
+
+
+def read_reaction_id(data) -> str:
+    """
+    Reads the `reaction_id` of a serialized `Reaction` without decoding the rest of the message.
+
+    The payloads of the other top-level fields (inputs, conditions, outcomes, ...) are skipped
+    by their length prefix, so this costs a few varint reads per field.
+
+    Args:
+        data (bytes): Wire-format encoding of one `reaction_pb2.Reaction`.
+
+    Returns:
+        str: The reaction ID, or an empty string if the reaction has none.
+
+    Example:
+        >>> from reader_module import iter_reaction_bytes, read_reaction_id
+        >>> [read_reaction_id(data) for data in iter_reaction_bytes("example_dataset.pb.gz")]
+        ['ord-...', ...]
+    """
+    stream = io.BytesIO(data)
+    skip_fields = tuple(range(1, REACTION_ID_FIELD))
+    for field_number, wire_type, value in iter_dataset_fields(stream, skip_fields=skip_fields):
+        if field_number == REACTION_ID_FIELD and wire_type == WIRETYPE_LENGTH_DELIMITED:
+            return value.decode('utf-8')
+    return ''
+
+
+def project_reaction_bytes(data, fields) -> bytes:
+    """
+    Keeps only some top-level fields of a serialized `Reaction`, without decoding any of them.
+
+    Fields are copied as they are encoded, tag and length prefix included, so parsing the
+    result gives the same message as parsing `data` and clearing the other fields. Parsing
+    costs nothing for the fields that were dropped, e.g. the inputs and outcomes of a reaction
+    when only its identifiers are extracted.
+
+    Args:
+        data (bytes or memoryview): Wire-format encoding of one `reaction_pb2.Reaction`.
+        fields (set): Field numbers to keep (see reaction.proto).
+
+    Returns:
+        bytes: Wire-format encoding of the projected reaction.
+
+    Raises:
+        ValueError: If the reaction is truncated or uses an unsupported wire type.
+
+    Example:
+        >>> from reader_module import project_reaction_bytes
+        >>> reaction_pb2.Reaction.FromString(project_reaction_bytes(data, {1, 10})).identifiers
+    """
+    buffer = memoryview(data)
+    parts = []
+    position = 0
+    while position < len(buffer):
+        field_start = position
+        tag, position = _decode_varint(buffer, position)
+        field_number, wire_type = tag >> 3, tag & 0x7
+
+        if wire_type == WIRETYPE_LENGTH_DELIMITED:
+            length, position = _decode_varint(buffer, position)
+            position += length
+        elif wire_type == WIRETYPE_VARINT:
+            _, position = _decode_varint(buffer, position)
+        elif wire_type == WIRETYPE_FIXED64:
+            position += 8
+        elif wire_type == WIRETYPE_FIXED32:
+            position += 4
+        else:
+            raise ValueError(f"Unsupported wire type {wire_type} for field {field_number}")
+        if position > len(buffer):
+            raise ValueError("Truncated reaction in dataset file")
+
+        if field_number in fields:
+            parts.append(buffer[field_start:position])
+    return b''.join(parts)
+
+
+# =============================================================================
+#               MEMORY-MAPPED RANDOM ACCESS TO UNCOMPRESSED DATASET FILES
+# =============================================================================
+
+def is_mappable_dataset(filepath) -> bool:
+    """
+    Checks whether a dataset file can be memory-mapped, i.e. is an uncompressed binary file (`.pb`, `.binpb`).
+    """
+    return is_binary_dataset(filepath) and pathlib.Path(filepath).suffix != '.gz'
+
+
+def _decode_varint(buffer, position):
+    # decodes the varint starting at `position` of a bytes-like buffer; returns (value, next position)
+    result = 0
+    shift = 0
+    while True:
+        if position >= len(buffer):
+            raise ValueError("Truncated varint in dataset file")
+        byte = buffer[position]
+        position += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, position
+        shift += 7
+
+
+def index_reaction_fields(buffer):
+    """
+    Scans the top-level fields of a serialized `Dataset` once and records where each reaction is.
+
+    Only tags and length prefixes are decoded; reaction payloads are stepped over, so scanning a
+    memory-mapped file touches little more than one page per reaction.
+
+    Args:
+        buffer (bytes-like): The serialized `Dataset`, e.g. a `memoryview` of a memory-mapped file.
+
+    Returns:
+        tuple: Two `array('q')` of the same length: the byte offset of each `reactions` payload
+            and its length, in file order.
+
+    Raises:
+        ValueError: If the buffer is truncated or uses an unsupported wire type.
+    """
+    offsets = array('q')
+    lengths = array('q')
+    position = 0
+    end = len(buffer)
+    while position < end:
+        tag, position = _decode_varint(buffer, position)
+        field_number, wire_type = tag >> 3, tag & 0x7
+        if wire_type == WIRETYPE_VARINT:
+            _, position = _decode_varint(buffer, position)
+        elif wire_type == WIRETYPE_FIXED64:
+            position += 8
+        elif wire_type == WIRETYPE_FIXED32:
+            position += 4
+        elif wire_type == WIRETYPE_LENGTH_DELIMITED:
+            length, position = _decode_varint(buffer, position)
+            if field_number == DATASET_REACTIONS_FIELD:
+                offsets.append(position)
+                lengths.append(length)
+            position += length
+        else:
+            raise ValueError(f"Unsupported wire type {wire_type} for field {field_number}")
+        if position > end:
+            raise ValueError("Truncated field in dataset file")
+    return offsets, lengths
+
+
+class MappedDataset:
+    """
+    Random access to the reactions of an uncompressed binary dataset file through a memory map.
+
+    The file is mapped read-only and its top-level fields are scanned once to index the offset
+    and length of every `reactions` field. Reactions are then returned as `memoryview` slices of
+    the map, or parsed from them on demand, without reading the file into memory: the raw data
+    stays in the page cache and costs next to no resident memory. The index allows converting
+    any range of reactions (e.g. reactions 10000 to 20000) and splitting a dataset into shards
+    for parallel workers without decoding the reactions in front of them.
+
+    Slices returned by `reaction_bytes` keep the map alive until they are released, even after `close`.
+
+    Args:
+        filepath (str): Path to an uncompressed `.pb` / `.binpb` dataset file.
+
+    Raises:
+        ValueError: If the file is compressed or not in binary format, or cannot be indexed.
+
+    Example:
+        >>> from reader_module import MappedDataset
+        >>> with MappedDataset("example_dataset.pb") as dataset:
+        ...     print(len(dataset), dataset[10000].reaction_id)
+        ...     for reaction in dataset.iter_reactions(10000, 20000):
+        ...         ...
+    """
+
+    def __init__(self, filepath):
+        if not is_mappable_dataset(filepath):
+            raise ValueError(f"{filepath} is not an uncompressed binary dataset file")
+        self.filepath = filepath
+        self._file = open(filepath, 'rb')
+        # an empty file cannot be mapped, and holds no reactions
+        if os.fstat(self._file.fileno()).st_size:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self._map = None
+        self._view = memoryview(self._map if self._map is not None else b'')
+        try:
+            self.offsets, self.lengths = index_reaction_fields(self._view)
+        except ValueError as error:
+            self.close()
+            raise ValueError(f"error indexing {filepath}: {error}") from error
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def reaction_bytes(self, index) -> memoryview:
+        """
+        Returns the serialized reaction at a position of the dataset as a zero-copy slice of the map.
+
+        Args:
+            index (int): Position of the reaction; negative positions count from the end.
+
+        Returns:
+            memoryview: Wire-format encoding of the reaction.
+        """
+        offset = self.offsets[index]
+        return self._view[offset:offset + self.lengths[index]]
+
+    def __getitem__(self, index):
+        try:
+            return reaction_pb2.Reaction.FromString(self.reaction_bytes(index))
+        except DecodeError as error:
+            raise ValueError(f"error parsing reaction {index} of {self.filepath}: {error}") from error
+
+    def spans(self, start=0, stop=None) -> list:
+        """
+        Returns the (offset, length) of the reactions in a range, e.g. to send to a worker process
+        that maps the file itself.
+        """
+        return list(zip(self.offsets[start:stop], self.lengths[start:stop]))
+
+    def iter_reaction_bytes(self, start=0, stop=None):
+        """
+        Yields the serialized reactions in `range(start, stop)` as zero-copy `memoryview` slices.
+        """
+        for index in range(*slice(start, stop).indices(len(self))):
+            yield self.reaction_bytes(index)
+
+    def iter_reactions(self, start=0, stop=None):
+        """
+        Yields the `Reaction` messages in `range(start, stop)`, parsed one at a time.
+        """
+        for index in range(*slice(start, stop).indices(len(self))):
+            yield self[index]
+
+    def shards(self, count) -> list:
+        """
+        Splits the reactions into `count` contiguous ranges of (almost) equal size.
+
+        Args:
+            count (int): Number of shards.
+
+        Returns:
+            list: (start, stop) positions of each shard, covering every reaction once.
+        """
+        size, remainder = divmod(len(self), count)
+        bounds = [0]
+        for shard in range(count):
+            bounds.append(bounds[-1] + size + (shard < remainder))
+        return list(zip(bounds[:-1], bounds[1:]))
+
+    def close(self):
+        """
+        Releases the map (once no slice of it is referenced any more) and closes the file.
+        """
+        self._view.release()
+        if self._map is not None:
+            try:
+                self._map.close()
+            except BufferError:
+                # slices returned by `reaction_bytes` are still referenced; the map is unmapped once they are released
+                pass
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def read_mapped_spans(filepath, spans) -> list:
+    """
+    Reads the serialized reactions at the given (offset, length) spans of an uncompressed dataset file.
+
+    Used by worker processes that are sent spans from `MappedDataset.spans` instead of the
+    reaction bytes themselves.
+
+    Args:
+        filepath (str): Path to an uncompressed `.pb` / `.binpb` dataset file.
+        spans (list): (offset, length) of each reaction.
+
+    Returns:
+        list: The wire-format encodings of the reactions, as bytes.
+    """
+    with open(filepath, 'rb') as stream, mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        return [mapped[offset:offset + length] for offset, length in spans]
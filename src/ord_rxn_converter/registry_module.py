@@ -0,0 +1,136 @@
+#compounds column headers
+COMPOUND_COLUMNS = ['InChIKey', 'smiles', 'inchi', 'iupacName', 'name', 'casNumber', 'pubchemCID', 'chemspiderID', 'cxSmiles', 'unspecified', 'custom', 'molblock', 'xyz', 'uniprotID', 'pbdID', 'aminoAcidSequence', 'helm', 'mdl']
+#persons column headers
+PERSON_COLUMNS = ['ORCiD', 'username', 'name', 'organization', 'email']
+
+
+class _Registry:
+    """
+    Deduplicating, column-wise store for rows of a lookup table.
+
+    Rows are indexed by the value of `key_column` in a dictionary, so checking whether a
+    row is already known costs a single hash lookup instead of a scan over the whole table.
+    Values are appended to one list per column and the `pandas.DataFrame` is only built
+    when `to_dataframe` is called.
+
+    Subclasses set `columns`, `key_column` and `skip_empty_key`.
+    """
+
+    columns = []
+    key_column = None
+    skip_empty_key = False
+
+    def __init__(self, frame=None):
+        self._key_position = self.columns.index(self.key_column)
+        self._index = {}
+        self._data = {column: [] for column in self.columns}
+
+        # seed the registry from an existing table, e.g. the output of a previous run
+        if frame is not None and not frame.empty:
+            self.extend(frame[self.columns].itertuples(index=False, name=None))
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def add(self, row) -> bool:
+        """
+        Adds a row to the registry unless a row with the same key is already present.
+
+        Args:
+            row (list): Row values in the order given by `columns`.
+
+        Returns:
+            bool: True if the row was added, False if it was skipped.
+        """
+        key = row[self._key_position]
+        if (self.skip_empty_key and not key) or key in self._index:
+            return False
+
+        self._index[key] = len(self._index)
+        for column, value in zip(self.columns, row):
+            self._data[column].append(value)
+        return True
+
+    def extend(self, rows):
+        """
+        Adds every row of an iterable with `add`.
+
+        Args:
+            rows (iterable): Rows in the order given by `columns`.
+
+        Returns:
+            int: Number of rows added.
+        """
+        added = 0
+        for row in rows:
+            added += self.add(row)
+        return added
+
+    def update(self, other):
+        """
+        Merges another registry of the same type into this one, keeping existing rows first.
+
+        Args:
+            other (_Registry): Registry whose rows should be added.
+        """
+        self.extend(other.rows())
+
+    def rows(self):
+        """
+        Yields the stored rows in insertion order.
+
+        Returns:
+            iterator: Iterator of row tuples in the order given by `columns`.
+        """
+        return zip(*(self._data[column] for column in self.columns))
+
+    def to_dataframe(self) -> 'pd.DataFrame':
+        """
+        Builds the table from the stored columns.
+
+        Returns:
+            pd.DataFrame: Table with one row per unique key, in insertion order.
+        """
+        # pandas is imported here so that extraction alone does not load it
+        import pandas as pd
+        return pd.DataFrame(self._data, columns=self.columns)
+
+
+class CompoundRegistry(_Registry):
+    """
+    Registry of compounds keyed on InChIKey.
+
+    Rows are the compound identifier lists produced by
+    `identifiers_module.generate_compound_table`. Compounds without an InChIKey are skipped.
+
+    Example:
+        >>> from registry_module import CompoundRegistry
+        >>> compounds = CompoundRegistry()
+        >>> compounds.add(['LFQSCWFLJHTTHZ-UHFFFAOYSA-N', 'CCO', ...])
+        True
+        >>> compounds.to_dataframe()
+    """
+
+    columns = COMPOUND_COLUMNS
+    key_column = 'InChIKey'
+    skip_empty_key = True
+
+
+class PersonRegistry(_Registry):
+    """
+    Registry of contributors keyed on ORCiD.
+
+    Rows are the person lists produced by `metadata_module.extract_reaction_metadata`.
+
+    Example:
+        >>> from registry_module import PersonRegistry
+        >>> persons = PersonRegistry()
+        >>> persons.add(['0000-0001-2345-6789', 'jsmith', 'John Smith', 'CWRU', 'js@case.edu'])
+        True
+    """
+
+    columns = PERSON_COLUMNS
+    key_column = 'ORCiD'
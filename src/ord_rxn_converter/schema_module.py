@@ -0,0 +1,286 @@
+# import requirements:
+import base64
+import json
+from google.protobuf import json_format
+from google.protobuf.message import Message
+
+# =============================================================================
+#               COLUMN TYPES OF THE OUTPUT TABLES
+# =============================================================================
+
+# Column types are written as small, writer-independent specs:
+#   'string', 'float', 'int', 'bool'      scalar values
+#   ('list', spec)                        list of values
+#   ('map', spec)                         dictionary with string keys
+#   ('struct', [(name, spec), ...])       dictionary with known keys, or a list read positionally
+# Columns that are not listed in COLUMN_TYPES are strings.
+
+STRING_MAP = ('map', 'string')
+
+PREPARATION = ('list', ('struct', [('Type', 'string'), ('Details', 'string')]))
+
+SOURCE = ('struct', [('Vendor', 'string'), ('catalogID', 'string')])
+
+ANALYSES = ('list', ('struct', [
+    ('analysisKey', 'string'), ('analysisType', 'string'), ('Details', 'string'), ('CHMO_ID', 'int'),
+    ('IsolatedSpecies', 'bool'), ('data', ('map', ('list', 'string'))), ('instrumentManufacturer', 'string'),
+    ('lastCalibrated', 'string'),
+]))
+
+TEMPERATURE_CONDITIONS = ('struct', [
+    ('temperatureControl', STRING_MAP), ('temperatureSetpoint', 'float'), ('temperatureUnit', 'string'),
+    ('temperatureMeasurements', ('list', ('struct', [
+        ('measurementType', 'string'), ('details', 'string'), ('time', 'float'), ('timeUnit', 'string'),
+        ('temperature', 'float'), ('temperatureUnit', 'string'),
+    ]))),
+])
+
+PRESSURE_CONDITIONS = ('struct', [
+    ('pressureControl', STRING_MAP), ('pressureSetpoint', 'float'), ('pressureUnit', 'string'),
+    ('reactionAtmosphere', 'string'),
+    ('pressureMeasurements', ('list', ('struct', [
+        ('measurementType', 'string'), ('details', 'string'), ('time', 'float'), ('timeUnit', 'string'),
+        ('pressure', 'float'), ('pressureUnit', 'string'),
+    ]))),
+])
+
+STIRRING_CONDITIONS = ('struct', [
+    ('stirringMethod', 'string'), ('stirringDetails', 'string'), ('stirringRate', 'string'),
+    ('rateDetails', 'string'), ('rpm', 'int'),
+])
+
+ILLUMINATION_CONDITIONS = ('struct', [
+    ('illuminationType', 'string'), ('illuminationDetails', 'string'), ('peakWavelength', 'float'),
+    ('wavelengthUnit', 'string'), ('illuminationColor', 'string'), ('distanceToVessel', 'float'),
+    ('distanceUnit', 'string'),
+])
+
+ELECTROCHEMISTRY_CONDITIONS = ('struct', [
+    ('electrochemistryType', 'string'), ('electrochemistryDetails', 'string'), ('current', 'float'),
+    ('currentUnit', 'string'), ('voltage', 'float'), ('voltageUnit', 'string'), ('anodeMaterial', 'string'),
+    ('cathodeMaterial', 'string'), ('electrodeSeparation', 'float'), ('separationUnit', 'string'),
+    ('electrochemistryMeasurements', ('list', ('struct', [
+        ('time', 'float'), ('timeUnit', 'string'), ('current', 'float'), ('currentUnit', 'string'),
+        ('voltage', 'float'), ('voltageUnit', 'string'),
+    ]))),
+    ('electrochemistryCell', STRING_MAP),
+])
+
+FLOW_CONDITIONS = ('struct', [
+    ('flowType', 'string'), ('flowDetails', 'string'), ('pumpType', 'string'), ('tubingType', 'string'),
+    ('tubingDetails', 'string'), ('tubingDiameter', 'float'), ('diameterUnit', 'string'),
+])
+
+OBSERVATIONS = ('list', ('struct', [
+    ('time', 'float'), ('timeUnit', 'string'), ('commonet', 'string'), ('imageKind', 'string'),
+    ('imageDescription', 'string'), ('imageFormat', 'string'),
+]))
+
+WORKUP_INPUT_COMPONENTS = ('struct', [
+    ('compoundIdentifiers', ('struct', [('inchiKey', 'string'), ('identifiers', STRING_MAP)])),
+    ('amountValue', 'float'), ('amountUnit', 'string'), ('reactionRole', 'string'), ('isLimiting', 'bool'),
+    ('compoundPreparation', PREPARATION), ('componentSource', SOURCE), ('feautreDictionary', STRING_MAP),
+    ('analysesList', ANALYSES), ('texture', STRING_MAP),
+])
+
+WORKUP_INPUT_ADDITION = ('struct', [
+    ('inputKey', 'string'), ('additionOrder', 'int'), ('additionTimeValue', 'float'), ('additoinTimeUnit', 'string'),
+    ('additionSpeed', 'string'), ('additionDurationValue', 'float'), ('additionDurationUnit', 'string'),
+    ('additionDevice', 'string'), ('additionTemperatureValue', 'float'), ('additionTemperatureUnit', 'string'),
+    ('inputFlowRateValue', 'float'), ('additionFlowRateUnit', 'string'), ('reactionTexture', 'string'),
+    ('textureDetails', 'string'),
+])
+
+PRODUCT_MEASUREMENT = ('struct', [
+    ('index', 'int'), ('inchiKey', 'string'), ('identifiers', STRING_MAP), ('analysisKey', 'string'),
+    ('measurementType', 'string'), ('details', 'string'), ('usesInternalStandard', 'bool'),
+    ('isNormalized', 'bool'), ('authenticStandard', 'string'), ('valueType', 'string'), ('value', 'string'),
+    ('valueUnit', 'string'), ('retentionTime', 'float'), ('timeUnit', 'string'), ('selectivity', 'string'),
+    ('wavelength', 'float'), ('wavelengthUnit', 'string'),
+])
+
+PRODUCTS = ('list', ('struct', [
+    ('inchiKey', 'string'), ('isDesiredProduct', 'bool'), ('measurements', ('list', ('list', PRODUCT_MEASUREMENT))),
+    ('isolatedColor', 'string'), ('texture', STRING_MAP), ('features', STRING_MAP), ('reactionRole', 'string'),
+]))
+
+COLUMN_TYPES = {
+    "reaction_identifiers" : {
+        'identifierDetails': STRING_MAP, 'isMapped': ('map', 'bool'),
+    },
+    "input_components" : {
+        'amount': 'float', 'isLimiting': 'bool', 'compoundPreparation': PREPARATION, 'compoundSource': SOURCE,
+        'features': STRING_MAP, 'analyses': ANALYSES, 'texture': STRING_MAP,
+    },
+    "input_addition" : {
+        'additionOrder': 'int', 'additionTime': 'float', 'additionDuration': 'float',
+        'additionTemperature': 'float', 'flowRate': 'float',
+    },
+    "reaction_setup" : {
+        'vesselVolume': 'float', 'vesselPreparations': STRING_MAP, 'vesselAttachments': STRING_MAP,
+        'isAutomated': 'bool',
+    },
+    "reaction_conditions" : {
+        'temperatureConditions': TEMPERATURE_CONDITIONS, 'pressureConditions': PRESSURE_CONDITIONS,
+        'stirringConditions': STIRRING_CONDITIONS, 'illuminationConditions': ILLUMINATION_CONDITIONS,
+        'electrochemistryConditions': ELECTROCHEMISTRY_CONDITIONS, 'flowConditions': FLOW_CONDITIONS,
+        'reflux': 'bool', 'pH': 'float', 'conditionsAreDynamic': 'bool',
+    },
+    "reaction_notes" : {
+        'isHeterogeneous': 'bool', 'formsPrecipitates': 'bool', 'isExothermic': 'bool', 'offGasses': 'bool',
+        'isSensitiveToMoisture': 'bool', 'isSensitiveToOxygen': 'bool', 'isSensitivetoLight': 'bool',
+        'observations': OBSERVATIONS,
+    },
+    "reaction_workups" : {
+        'workupDuration': 'float', 'inputComponents': WORKUP_INPUT_COMPONENTS,
+        'inputAdditionDetails': WORKUP_INPUT_ADDITION, 'temperatureConditions': TEMPERATURE_CONDITIONS,
+        'stirringConditions': STIRRING_CONDITIONS, 'workupTargetPH': 'float', 'isAutomated': 'bool',
+    },
+    "reaction_outcomes" : {
+        'reactionTime': 'float', 'outcomeConversion': 'float', 'products': PRODUCTS, 'analyses': ANALYSES,
+    },
+    "temperature_measurements" : {
+        'measurementIndex': 'int', 'time': 'float', 'temperature': 'float',
+    },
+    "pressure_measurements" : {
+        'measurementIndex': 'int', 'time': 'float', 'pressure': 'float',
+    },
+    "electrochemistry_measurements" : {
+        'measurementIndex': 'int', 'time': 'float', 'current': 'float', 'voltage': 'float',
+    },
+    "product_measurements" : {
+        'productIndex': 'int', 'measurementIndex': 'int', 'usesInternalStandard': 'bool', 'isNormalized': 'bool',
+        'value': 'float', 'retentionTime': 'float', 'wavelength': 'float',
+    },
+}
+
+def column_type(table, column):
+
+    """
+    Returns the type spec of a column of an output table.
+
+    Args:
+        table (str): Table name, e.g. 'reaction_outcomes'.
+        column (str): Column name, e.g. 'reactionTime'.
+
+    Returns:
+        str or tuple: The type spec; 'string' for columns without an explicit type.
+    """
+
+    return COLUMN_TYPES.get(table, {}).get(column, 'string')
+
+def is_nested(spec) -> bool:
+
+    """
+    Checks whether a type spec describes a list, map or struct rather than a scalar.
+    """
+
+    return isinstance(spec, tuple)
+
+# =============================================================================
+#               CONVERSION OF EXTRACTED VALUES TO THEIR COLUMN TYPES
+# =============================================================================
+
+def to_plain(value):
+
+    """
+    Converts an extracted value to plain, JSON-serialisable Python objects.
+
+    Protobuf messages become dictionaries (or their `value` field for messages such as
+    `DateTime` that only carry a value), bytes become base64 text, and lists, tuples and
+    dictionaries are converted recursively.
+
+    Args:
+        value: Any value found in an extracted table row.
+
+    Returns:
+        The converted value.
+    """
+
+    if value is None or isinstance(value, (str, bool, int, float)):
+        return value
+    if isinstance(value, bytes):
+        return base64.b64encode(value).decode('ascii')
+    if isinstance(value, Message):
+        message_dict = json_format.MessageToDict(value, preserving_proto_field_name=True)
+        if not message_dict:
+            return None
+        if list(message_dict) == ['value']:
+            return message_dict['value']
+        return message_dict
+    if isinstance(value, dict):
+        return {str(key): to_plain(item) for key, item in value.items()}
+    if hasattr(value, '__iter__'):
+        return [to_plain(item) for item in value]
+    return str(value)
+
+def to_text(value):
+
+    """
+    Converts an extracted value to a string, JSON-encoding nested values.
+
+    Args:
+        value: Any value found in an extracted table row.
+
+    Returns:
+        str or None: The text, or None for missing values.
+    """
+
+    value = to_plain(value)
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return str(value)
+
+def normalise_value(value, spec):
+
+    """
+    Converts an extracted value to the Python representation of its column type.
+
+    Lists read into a struct type are matched to the struct fields by position; values that
+    cannot be converted become None.
+
+    Args:
+        value: Any value found in an extracted table row.
+        spec (str or tuple): The column type spec (see `COLUMN_TYPES`).
+
+    Returns:
+        The converted value: str, float, int or bool for scalars, list for lists, list of
+        (key, value) pairs for maps and dict for structs.
+    """
+
+    if value is None:
+        return None
+
+    if spec == 'string':
+        return to_text(value)
+
+    if spec in ('float', 'int'):
+        try:
+            return float(value) if spec == 'float' else int(value)
+        except (TypeError, ValueError):
+            return None
+
+    if spec == 'bool':
+        return bool(value)
+
+    kind, inner = spec
+    if kind == 'list':
+        if isinstance(value, (str, bytes, dict)) or not hasattr(value, '__iter__'):
+            return None
+        return [normalise_value(item, inner) for item in value]
+
+    if kind == 'map':
+        if not isinstance(value, dict):
+            return None
+        return [(str(key), normalise_value(item, inner)) for key, item in value.items()]
+
+    if kind == 'struct':
+        if isinstance(value, dict):
+            return {name: normalise_value(value.get(name), field_spec) for name, field_spec in inner}
+        if isinstance(value, (list, tuple)):
+            return {name: normalise_value(item, field_spec) for (name, field_spec), item in zip(inner, value)}
+        return None
+
+    raise ValueError(f"Unknown column type {spec}")
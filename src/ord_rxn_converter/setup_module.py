@@ -1,11 +1,7 @@
 # import requirements: 
 from ord_schema.proto import dataset_pb2, reaction_pb2
 from google.protobuf.message import Message
-import pandas as pd
-from ord_rxn_converter.utility_functions_module import extract_all_enums
-
-#generate enums_data to be accessible here TODO - have importable object instead..?
-enums_data = extract_all_enums(reaction_pb2)
+from ord_rxn_converter.utility_functions_module import enums_data
 
 def extract_reaction_setup(setup, reactionID):
 
@@ -65,6 +61,6 @@ def extract_reaction_setup(setup, reactionID):
     
     reaction_environment = enums_data['ReactionSetup.ReactionEnvironment.ReactionEnvironmentType'][setup.environment.type] if setup.environment else None
 
-    reaction_setup = [reactionID, vessel, vessel_material, vessel_volume, volume_unit, prep_dict, attach_dict, is_automated, automation_platform, automation_code, reaction_environment]
+    reaction_setup = [reactionID, vessel_type, vessel_material, vessel_volume, volume_unit, prep_dict, attach_dict, is_automated, automation_platform, automation_code, reaction_environment]
 
     return reaction_setup
\ No newline at end of file
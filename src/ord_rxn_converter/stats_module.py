@@ -0,0 +1,133 @@
+# import requirements:
+from ord_rxn_converter.molecule_cache_module import get_molecule_cache
+
+# =============================================================================
+#               INSTRUMENTATION OF THE EXTRACTION LOOP
+# =============================================================================
+
+# stages timed by `extract_dataset`, in the order they appear in reports
+SECTIONS = ['read', 'molecules', 'parse', 'filter', 'metadata', 'identifiers', 'inputs', 'setup', 'conditions', 'notes',
+            'workups', 'outcomes', 'compound_registry', 'person_registry', 'dataframe']
+
+def molecule_cache_counts() -> tuple:
+
+    """
+    Returns the (hits, store_hits, misses) counters of the process-wide `MoleculeCache`.
+    """
+
+    cache = get_molecule_cache()
+    return cache.hits, cache.store_hits, cache.misses
+
+
+class ExtractionStats:
+
+    """
+    Cumulative wall time, call counts and rows produced per stage of a dataset extraction.
+
+    Pass an instance as `stats` to `dataset_module.extract_dataset` (or `iter_reactions`) to
+    find out where a conversion spends its time: reading and decompressing the file (`read`),
+    decoding reactions (`parse`), each section extractor, the compound and person registries and
+    the DataFrame build. Lookups in the RDKit molecule cache made during the extraction are
+    counted as well. With `workers` > 1 the stage times are summed over the worker processes,
+    so they can exceed the elapsed time.
+
+    Without a stats object the extraction loop only performs a `None` check per stage.
+
+    Example:
+        >>> from stats_module import ExtractionStats
+        >>> stats = ExtractionStats()
+        >>> out = extract_dataset("example_dataset.pb.gz", stats=stats)
+        >>> print(stats.report())
+    """
+
+    def __init__(self):
+        self.sections = {}
+        self.cache_hits = 0
+        self.cache_store_hits = 0
+        self.cache_misses = 0
+
+    def add(self, section, seconds, rows=0, calls=1):
+
+        """
+        Records calls of one stage.
+
+        Args:
+            section (str): Stage name, usually one of `SECTIONS`.
+            seconds (float): Wall time spent.
+            rows (int, optional): Rows produced. Defaults to 0.
+            calls (int, optional): Number of calls. Defaults to 1.
+        """
+
+        totals = self.sections.get(section)
+        if totals is None:
+            totals = self.sections[section] = {"seconds": 0.0, "calls": 0, "rows": 0}
+        totals["seconds"] += seconds
+        totals["calls"] += calls
+        totals["rows"] += rows
+
+    def add_cache_counts(self, before, after):
+
+        """
+        Records the molecule cache lookups between two `molecule_cache_counts()` readings.
+        """
+
+        self.cache_hits += after[0] - before[0]
+        self.cache_store_hits += after[1] - before[1]
+        self.cache_misses += after[2] - before[2]
+
+    def merge(self, other):
+
+        """
+        Adds the counts of another `ExtractionStats`, e.g. one filled in a worker process.
+        """
+
+        for section, totals in other.sections.items():
+            self.add(section, totals["seconds"], totals["rows"], totals["calls"])
+        self.cache_hits += other.cache_hits
+        self.cache_store_hits += other.cache_store_hits
+        self.cache_misses += other.cache_misses
+
+    def cache_hit_rate(self):
+
+        """
+        Returns the share of molecule cache lookups served without calling RDKit.
+
+        Returns:
+            float: (memory hits + backing file hits) / lookups, or 0.0 without lookups.
+        """
+
+        lookups = self.cache_hits + self.cache_store_hits + self.cache_misses
+        return (self.cache_hits + self.cache_store_hits) / lookups if lookups else 0.0
+
+    def total_seconds(self):
+        return sum(totals["seconds"] for totals in self.sections.values())
+
+    def to_dict(self) -> dict:
+
+        """
+        Returns the counts as plain data, e.g. to save them as JSON.
+        """
+
+        return {"sections": {section: dict(totals) for section, totals in self._ordered()},
+                "molecule_cache": {"hits": self.cache_hits, "store_hits": self.cache_store_hits,
+                                   "misses": self.cache_misses, "hit_rate": self.cache_hit_rate()}}
+
+    def report(self) -> str:
+
+        """
+        Formats the counts as a table, one line per stage with its share of the total time.
+        """
+
+        total = self.total_seconds() or 1e-9
+        lines = [f"{'stage':20s} {'seconds':>10s} {'%':>6s} {'calls':>10s} {'rows':>10s}"]
+        for section, totals in self._ordered():
+            lines.append(f"{section:20s} {totals['seconds']:10.3f} {100 * totals['seconds'] / total:6.1f} "
+                         f"{totals['calls']:10d} {totals['rows']:10d}")
+        lookups = self.cache_hits + self.cache_store_hits + self.cache_misses
+        lines.append(f"molecule cache: {lookups} lookups, {self.cache_hits} hits, {self.cache_store_hits} "
+                     f"store hits, {self.cache_misses} misses ({100 * self.cache_hit_rate():.1f}% hit rate)")
+        return '\n'.join(lines)
+
+    def _ordered(self):
+        order = {section: position for position, section in enumerate(SECTIONS)}
+        return sorted(self.sections.items(), key=lambda item: order.get(item[0], len(order)))
@@ -0,0 +1,280 @@
+# import requirements:
+import math
+from array import array
+from ord_rxn_converter.schema_module import column_type, normalise_value
+from ord_rxn_converter.utility_functions_module import get_enums_data
+
+# =============================================================================
+#               COLUMNAR BUILDERS OF THE OUTPUT DATAFRAMES
+# =============================================================================
+
+# protobuf enums whose value names fill each enum-valued column; amounts use the unit of their kind
+AMOUNT_UNIT_ENUMS = ['Mass.MassUnit', 'Moles.MolesUnit', 'Volume.VolumeUnit']
+
+ENUM_COLUMNS = {
+    "input_components" : {
+        'amountUnit': AMOUNT_UNIT_ENUMS, 'reactionRole': ['ReactionRole.ReactionRoleType'],
+    },
+    "input_addition" : {
+        'timeUnit': ['Time.TimeUnit'], 'additionSpeed': ['ReactionInput.AdditionSpeed.AdditionSpeedType'],
+        'durationUnit': ['Time.TimeUnit'], 'additionDevice': ['ReactionInput.AdditionDevice.AdditionDeviceType'],
+        'temperatureUnit': ['Temperature.TemperatureUnit'], 'flowRateUnit': ['FlowRate.FlowRateUnit'],
+        'texture': ['Texture.TextureType'],
+    },
+    "reaction_setup" : {
+        'vessel': ['Vessel.VesselType'], 'vesselMaterial': ['VesselMaterial.VesselMaterialType'],
+        'volumeUnit': ['Volume.VolumeUnit'],
+        'reactionEnvironment': ['ReactionSetup.ReactionEnvironment.ReactionEnvironmentType'],
+    },
+    "reaction_workups" : {
+        'workupType': ['ReactionWorkup.ReactionWorkupType'], 'durationUnit': ['Time.TimeUnit'],
+    },
+    "reaction_outcomes" : {
+        'timeUnit': ['Time.TimeUnit'],
+    },
+    "temperature_measurements" : {
+        'measurementType': ['TemperatureConditions.TemperatureMeasurement.TemperatureMeasurementType'],
+        'timeUnit': ['Time.TimeUnit'], 'temperatureUnit': ['Temperature.TemperatureUnit'],
+    },
+    "pressure_measurements" : {
+        'measurementType': ['PressureConditions.PressureMeasurement.PressureMeasurementType'],
+        'timeUnit': ['Time.TimeUnit'], 'pressureUnit': ['Pressure.PressureUnit'],
+    },
+    "electrochemistry_measurements" : {
+        'timeUnit': ['Time.TimeUnit'], 'currentUnit': ['Current.CurrentUnit'], 'voltageUnit': ['Voltage.VoltageUnit'],
+    },
+    "product_measurements" : {
+        'measurementType': ['ProductMeasurement.ProductMeasurementType'], 'retentionTimeUnit': ['Time.TimeUnit'],
+        'selectivity': ['ProductMeasurement.Selectivity.SelectivityType'], 'wavelengthUnit': ['Wavelength.WavelengthUnit'],
+    },
+    "analysis_data" : {
+        'analysisType': ['Analysis.AnalysisType'],
+    },
+}
+
+def enum_categories(table, column) -> list:
+
+    """
+    Returns the value names of the protobuf enums behind an enum-valued column, in enum order.
+
+    Args:
+        table (str): Table name, e.g. 'reaction_workups'.
+        column (str): Column name, e.g. 'workupType'.
+
+    Returns:
+        list: Enum value names without duplicates, or an empty list for other columns.
+
+    Example:
+        >>> from table_module import enum_categories
+        >>> enum_categories('reaction_outcomes', 'timeUnit')
+        ['UNSPECIFIED', 'DAY', 'HOUR', 'MINUTE', 'SECOND']
+    """
+
+    enums_data = get_enums_data()
+    categories = {}
+    for enum_name in ENUM_COLUMNS.get(table, {}).get(column, []):
+        categories.update(dict.fromkeys(enums_data[enum_name].values()))
+    return list(categories)
+
+def is_unit_column(column) -> bool:
+
+    """
+    Checks whether a column holds unit names (e.g. 'timeUnit', 'amountUnit'), which are stored as categories.
+    """
+
+    return column.endswith('Unit')
+
+
+class _FloatColumn:
+
+    # float64 values in a growable array; missing values are NaN
+    def __init__(self):
+        self.values = array('d')
+
+    def extend(self, values):
+        length = len(self.values)
+        try:
+            self.values.extend(values)
+        except TypeError:
+            # array.extend stops at the first value it cannot store (e.g. None); redo the batch value by value
+            del self.values[length:]
+            self.values.extend([_to_float(value) for value in values])
+
+    def to_array(self, np, pd):
+        return np.frombuffer(self.values, dtype=np.float64)
+
+
+def _to_float(value):
+    if value is None:
+        return math.nan
+    if isinstance(value, float):
+        return value
+    value = normalise_value(value, 'float')
+    return math.nan if value is None else value
+
+
+class _MaskedColumn:
+
+    # int64 or bool values with a mask of missing values; nullable dtypes are only used if a value is missing
+    def __init__(self, spec):
+        self.spec = spec
+        self.values = array('q') if spec == 'int' else bytearray()
+        self.mask = bytearray()
+        self.missing = 0
+
+    def extend(self, values):
+        if self.spec == 'int':
+            values = [value if value is None or isinstance(value, int) else normalise_value(value, 'int')
+                      for value in values]
+        missing = values.count(None)
+        if missing:
+            self.missing += missing
+            self.mask.extend([value is None for value in values])
+            values = [0 if value is None else value for value in values]
+        else:
+            self.mask.extend(bytes(len(values)))
+        self.values.extend(values if self.spec == 'int' else [bool(value) for value in values])
+
+    def to_array(self, np, pd):
+        values = np.frombuffer(self.values, dtype=np.int64 if self.spec == 'int' else np.bool_)
+        if not self.missing:
+            return values
+        mask = np.frombuffer(self.mask, dtype=np.bool_)
+        if self.spec == 'int':
+            return pd.arrays.IntegerArray(values, mask)
+        return pd.arrays.BooleanArray(values, mask)
+
+
+class _CategoryColumn:
+
+    # dictionary-encoded strings: int32 codes into the given categories, extended with values
+    # seen that are not among them, in order of first appearance (so the categories do not depend
+    # on string hashing or batching); missing values are -1
+    def __init__(self, categories=()):
+        self.categories = list(categories)
+        self.codes = array('i')
+        self._index = {category: code for code, category in enumerate(self.categories)}
+        self._index[None] = -1
+
+    def extend(self, values):
+        index = self._index
+        for value in dict.fromkeys(values):
+            if value not in index:
+                index[value] = len(self.categories)
+                self.categories.append(value)
+        self.codes.extend([index[value] for value in values])
+
+    def to_array(self, np, pd):
+        return pd.Categorical.from_codes(np.frombuffer(self.codes, dtype=np.int32), categories=self.categories)
+
+
+class _ObjectColumn:
+
+    # strings and nested values, left for pandas to infer as before
+    def __init__(self):
+        self.values = []
+
+    def extend(self, values):
+        self.values.extend(values)
+
+    def to_array(self, np, pd):
+        # an empty list would be inferred as float64
+        return self.values if self.values else np.array([], dtype=object)
+
+
+class TableBuilder:
+
+    """
+    Accumulates the rows of an output table column by column, with typed storage per column.
+
+    Float columns (e.g. `additionTime`, `vesselVolume`, `reactionTime`, `outcomeConversion`, `pH`)
+    are appended to `array('d')` buffers, integer and boolean columns to `array('q')` / `bytearray`
+    buffers with a missing-value mask, and unit columns are dictionary-encoded as int32 codes. The
+    buffers over-allocate as they grow, so appending a row costs one typed store per column
+    instead of a Python list per row. `to_dataframe` wraps the buffers with numpy without copying
+    them, so the DataFrame has float64, int64/Int64, bool/boolean and category dtypes instead of
+    object columns inferred cell by cell. String and nested columns are kept as Python lists.
+
+    With `categorical`, every enum-valued column listed in `ENUM_COLUMNS` (units, reaction roles,
+    workup and vessel types, ...) becomes a `pd.Categorical` whose categories are the value names
+    of its protobuf enums, so tables of different datasets share the same categories and codes.
+
+    Column types come from `schema_module.column_type`.
+
+    Args:
+        table (str): Table name, e.g. 'reaction_outcomes'.
+        columns (list): Column names, in row order.
+        categorical (bool, optional): Store enum-valued columns as categoricals of their enum values. Defaults to
+            False (only unit columns are categorical, with the categories found in the data).
+
+    Example:
+        >>> from table_module import TableBuilder
+        >>> builder = TableBuilder("reaction_outcomes", reaction_outcomes_cols)
+        >>> builder.extend(rows)
+        >>> builder.to_dataframe().dtypes
+    """
+
+    def __init__(self, table, columns, categorical=False):
+        self.table = table
+        self.columns = list(columns)
+        self.categorical = categorical
+        self._builders = [self._column_builder(column) for column in self.columns]
+        self.rows = 0
+
+    def _column_builder(self, column):
+        spec = column_type(self.table, column)
+        if spec == 'float':
+            return _FloatColumn()
+        if spec in ('int', 'bool'):
+            return _MaskedColumn(spec)
+        if self.categorical and column in ENUM_COLUMNS.get(self.table, {}):
+            return _CategoryColumn(enum_categories(self.table, column))
+        if spec == 'string' and is_unit_column(column):
+            return _CategoryColumn()
+        return _ObjectColumn()
+
+    def __len__(self):
+        return self.rows
+
+    def append(self, row):
+
+        """
+        Appends one row, given in the order of `columns`.
+        """
+
+        self.extend([row])
+
+    def extend(self, rows):
+
+        """
+        Appends a batch of rows, e.g. the rows of one table yielded by `dataset_module.iter_reactions`.
+
+        The batch is transposed into columns, so each column buffer is extended once per batch.
+
+        Args:
+            rows (list): Rows in the order of `columns`.
+        """
+
+        if not rows:
+            return
+        for builder, values in zip(self._builders, zip(*rows)):
+            builder.extend(list(values))
+        self.rows += len(rows)
+
+    def to_dataframe(self) -> 'pd.DataFrame':
+
+        """
+        Builds the DataFrame of the rows appended so far.
+
+        The numeric and category columns share memory with the builder's buffers, so no more
+        rows can be appended afterwards.
+
+        Returns:
+            pd.DataFrame: One column per name in `columns`, with typed columns.
+        """
+
+        import numpy as np
+        import pandas as pd
+
+        data = {column: builder.to_array(np, pd) for column, builder in zip(self.columns, self._builders)}
+        return pd.DataFrame(data, columns=self.columns, copy=False)
@@ -1,5 +1,7 @@
 from ord_schema.proto import dataset_pb2, reaction_pb2
 from google.protobuf.message import Message
+from functools import lru_cache
+from types import MappingProxyType
 
 # =============================================================================
 #               FUNCTIONS TO EXTRACT ENUMS FROM ALL MESSAGE TYPES
@@ -99,4 +101,44 @@ def extract_all_enums(proto_module):
             if message_enums:
                 all_enums.update(message_enums)
 
-    return all_enums
\ No newline at end of file
+    return all_enums
+
+# =============================================================================
+#               SHARED ENUM LOOKUP TABLE
+# =============================================================================
+
+@lru_cache(maxsize=None)
+def get_enums_data(proto_module=reaction_pb2):
+
+    """
+    Returns the enum lookup table of a proto module, built once per process and frozen.
+
+    The first call walks the module descriptors with `extract_all_enums`; later calls return
+    the same read-only mapping, so every section module shares a single table. The walk takes
+    well under a millisecond, so the table is not cached on disk: each worker process builds it
+    again on first use, which also keeps it in step with the installed `ord_schema`.
+
+    Args:
+        proto_module: The protobuf module to extract enums from. Default is `reaction_pb2`.
+
+    Returns:
+        A read-only mapping with the same structure as `extract_all_enums`, whose values are
+        read-only mappings of enum value numbers to their names.
+
+    Example:
+        >>> from utility_functions_module import get_enums_data
+        >>> enums_data = get_enums_data()
+        >>> enums_data['Time.TimeUnit'][1]
+        'HOUR'
+    """
+
+    all_enums = extract_all_enums(proto_module)
+
+    return MappingProxyType({enum_name: MappingProxyType(values) for enum_name, values in all_enums.items()})
+
+def __getattr__(name):
+
+    # `enums_data` is importable but only built when first requested
+    if name == 'enums_data':
+        return get_enums_data()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
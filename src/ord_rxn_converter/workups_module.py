@@ -1,15 +1,12 @@
 # import requirements: 
 from ord_schema.proto import dataset_pb2, reaction_pb2
 from google.protobuf.message import Message
-from ord_rxn_converter.utility_functions_module import extract_all_enums
+from ord_rxn_converter.utility_functions_module import enums_data
 from ord_rxn_converter.inputs_module import extract_input_addition, extract_amount
 from ord_rxn_converter.conditions_module import temperature_conditions, stirring_conditions
-from ord_rxn_converter.identifiers_module import extract_compound_identifiers, generate_compound_table
+from ord_rxn_converter.identifiers_module import resolve_compound
 
-#generate enums_data to be accessible here TODO - have importable object instead..?
-enums_data = extract_all_enums(reaction_pb2)
-
-def extract_reaction_workups(workups, reactionID):
+def extract_reaction_workups(workups, reactionID, resolve_molecules=True):
     """
     Extracts workup details from an ORD reaction workup list.
 
@@ -20,6 +17,7 @@ def extract_reaction_workups(workups, reactionID):
     Args:
         workups (list): A list of `ReactionWorkup` messages from `reaction_pb2.Reaction.workups`.
         reactionID (str): A unique identifier for the reaction.
+        resolve_molecules (bool, optional): Derive missing InChIKeys of input components with RDKit. Defaults to True.
 
     Returns:
         list: A list of extracted workup information for the reaction. Each item in the list corresponds
@@ -52,8 +50,9 @@ def extract_reaction_workups(workups, reactionID):
                 # identifiers = 1
                 if component.identifiers:
                     identifiers = component.identifiers
-                    component_identifiers = extract_compound_identifiers(identifiers)
-                    compound_table.append(generate_compound_table(identifiers))
+                    compound = resolve_compound(identifiers, resolve_molecules)
+                    component_identifiers = (compound.inchi_key, compound.identifiers)
+                    compound_table.append(compound.compound_row)
                 else: 
                     component_identifiers = None
                     compound_table = None
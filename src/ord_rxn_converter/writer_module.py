@@ -0,0 +1,532 @@
+# import requirements:
+import csv
+import json
+import os
+from ord_rxn_converter.dataset_module import TABLE_COLUMNS, DEFAULT_TABLES, iter_reactions, extract_dataset_metadata
+from ord_rxn_converter.reader_module import read_dataset_header
+from ord_rxn_converter.registry_module import CompoundRegistry, PersonRegistry
+from ord_rxn_converter.schema_module import column_type, is_nested, normalise_value, to_plain, to_text
+
+# =============================================================================
+#               PARQUET OUTPUT
+# =============================================================================
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as error:
+        raise ImportError("Writing Parquet files requires pyarrow: pip install ord_rxn_converter[parquet]") from error
+    return pyarrow, pyarrow.parquet
+
+def arrow_type(spec):
+
+    """
+    Converts a column type spec from `schema_module` to a `pyarrow.DataType`.
+
+    Args:
+        spec (str or tuple): The column type spec.
+
+    Returns:
+        pyarrow.DataType: string, float64, int64 or bool for scalars, and list, map (string keys)
+            or struct types for nested specs.
+    """
+
+    pa, _ = _import_pyarrow()
+    scalar_types = {'string': pa.string(), 'float': pa.float64(), 'int': pa.int64(), 'bool': pa.bool_()}
+    if not is_nested(spec):
+        return scalar_types[spec]
+
+    kind, inner = spec
+    if kind == 'list':
+        return pa.list_(arrow_type(inner))
+    if kind == 'map':
+        return pa.map_(pa.string(), arrow_type(inner))
+    if kind == 'struct':
+        return pa.struct([(name, arrow_type(field_spec)) for name, field_spec in inner])
+    raise ValueError(f"Unknown column type {spec}")
+
+def arrow_schema(table):
+
+    """
+    Returns the Arrow schema of an output table.
+
+    Args:
+        table (str): Table name, one of the keys of `dataset_module.TABLE_COLUMNS`.
+
+    Returns:
+        pyarrow.Schema: One field per column, in table column order.
+    """
+
+    pa, _ = _import_pyarrow()
+    return pa.schema([(column, arrow_type(column_type(table, column))) for column in TABLE_COLUMNS[table]])
+
+def rows_to_arrow(table, rows):
+
+    """
+    Converts extracted rows of one table to a `pyarrow.Table` with the table's Arrow schema.
+
+    Args:
+        table (str): Table name.
+        rows (list): Rows in the table's column order.
+
+    Returns:
+        pyarrow.Table: The rows as a columnar table.
+    """
+
+    pa, _ = _import_pyarrow()
+    schema = arrow_schema(table)
+    arrays = []
+    for position, column in enumerate(TABLE_COLUMNS[table]):
+        spec = column_type(table, column)
+        values = [normalise_value(row[position], spec) for row in rows]
+        arrays.append(pa.array(values, type=schema.field(column).type))
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+class ParquetWriter:
+
+    """
+    Writes output tables to one Parquet file per table, one row group at a time.
+
+    Rows are buffered per table and written as a row group whenever `row_group_size` rows are
+    buffered, so memory use stays bounded while reactions stream by. Nested columns (conditions,
+    products, analyses, ...) are stored with Arrow struct, list and map types.
+
+    Args:
+        directory (str): Output directory; `<table>.parquet` is written for every table.
+        tables (list, optional): Tables to write. Defaults to None (`DEFAULT_TABLES`: all but the normalised child tables); rows of other tables are ignored.
+        row_group_size (int, optional): Number of rows per row group. Defaults to 10000.
+        compression (str, optional): Parquet compression codec. Defaults to 'snappy'.
+
+    Example:
+        >>> from writer_module import ParquetWriter
+        >>> with ParquetWriter("out/") as writer:
+        ...     for rows in iter_reactions("example_dataset.pb.gz", batch_size=1000):
+        ...         writer.write(rows)
+    """
+
+    def __init__(self, directory, tables=None, row_group_size=10000, compression='snappy'):
+        _import_pyarrow()
+        self.directory = directory
+        self.tables = list(tables) if tables is not None else list(DEFAULT_TABLES)
+        self.row_group_size = row_group_size
+        self.compression = compression
+        self._buffers = {table: [] for table in self.tables}
+        self._writers = {}
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, table):
+        return os.path.join(self.directory, f"{table}.parquet")
+
+    def write(self, rows):
+
+        """
+        Buffers the rows of several tables, e.g. one item yielded by `dataset_module.iter_reactions`.
+
+        Args:
+            rows (dict): Rows per table name.
+        """
+
+        for table, table_rows in rows.items():
+            self.write_rows(table, table_rows)
+
+    def write_rows(self, table, rows):
+
+        """
+        Buffers rows of one table and writes full row groups.
+
+        Args:
+            table (str): Table name.
+            rows (iterable): Rows in the table's column order.
+        """
+
+        if table not in self._buffers:
+            return
+        buffer = self._buffers[table]
+        buffer.extend(rows)
+        while len(buffer) >= self.row_group_size:
+            self._write_row_group(table, buffer[:self.row_group_size])
+            del buffer[:self.row_group_size]
+
+    def _write_row_group(self, table, rows):
+        _, pq = _import_pyarrow()
+        arrow_table = rows_to_arrow(table, rows)
+        if table not in self._writers:
+            self._writers[table] = pq.ParquetWriter(self.path(table), arrow_table.schema, compression=self.compression)
+        self._writers[table].write_table(arrow_table)
+
+    def flush(self):
+
+        """
+        Writes all buffered rows, as one (possibly short) row group per table.
+        """
+
+        for table, buffer in self._buffers.items():
+            if buffer:
+                self._write_row_group(table, buffer)
+                buffer.clear()
+
+    def close(self):
+
+        """
+        Flushes buffered rows and closes the files. Tables that received no rows are written empty.
+        """
+
+        self.flush()
+        for table in self.tables:
+            if table not in self._writers:
+                self._write_row_group(table, [])
+            self._writers[table].close()
+        self._writers = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+# key column of the tables that are shared between reactions; patched tables keep the existing row of a key
+KEY_COLUMNS = {"dataset_metadata" : 'datasetID', "compound" : 'InChIKey', "person" : 'ORCiD'}
+
+
+class ParquetPatcher:
+
+    """
+    Applies incremental changes to the Parquet tables of a directory written by `ParquetWriter`.
+
+    Rows of deleted (and changed) reactions are dropped from every table with a `reactionID`
+    column and new rows are appended; compound, person and dataset rows are only appended if
+    their key is not in the table yet. Changes are buffered and applied on `close`, which
+    rewrites each affected table once (to a temporary file that then replaces it). Tables
+    that received neither rows nor deletions are left untouched.
+
+    It has the same `write` / `write_rows` interface as `ParquetWriter`, plus `delete_reactions`,
+    so it can be passed to `incremental_module.update_dataset`.
+
+    Args:
+        directory (str): Directory of the `<table>.parquet` files; missing tables are created.
+        tables (list, optional): Tables to patch. Defaults to None (`DEFAULT_TABLES`).
+        compression (str, optional): Parquet compression codec of rewritten tables. Defaults to 'snappy'.
+
+    Example:
+        >>> from writer_module import ParquetPatcher
+        >>> with ParquetPatcher("out/") as patcher:
+        ...     patcher.delete_reactions(["mds_reaction-..."])
+        ...     patcher.write(rows)
+    """
+
+    def __init__(self, directory, tables=None, compression='snappy'):
+        _import_pyarrow()
+        self.directory = directory
+        self.tables = list(tables) if tables is not None else list(DEFAULT_TABLES)
+        self.compression = compression
+        self._deleted = set()
+        self._buffers = {table: [] for table in self.tables}
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, table):
+        return os.path.join(self.directory, f"{table}.parquet")
+
+    def delete_reactions(self, reactionIDs):
+
+        """
+        Marks the rows of the given reactions for deletion from every table with a `reactionID` column.
+
+        Args:
+            reactionIDs (iterable): MDS reaction IDs.
+        """
+
+        self._deleted.update(reactionIDs)
+
+    def write(self, rows):
+
+        """
+        Buffers the rows of several tables, e.g. one item yielded by `dataset_module.iter_reactions`.
+
+        Args:
+            rows (dict): Rows per table name.
+        """
+
+        for table, table_rows in rows.items():
+            self.write_rows(table, table_rows)
+
+    def write_rows(self, table, rows):
+
+        """
+        Buffers rows of one table, to be appended on `close`.
+
+        Args:
+            table (str): Table name.
+            rows (iterable): Rows in the table's column order.
+        """
+
+        if table in self._buffers:
+            self._buffers[table].extend(rows)
+
+    def _patch_table(self, table):
+        pa, pq = _import_pyarrow()
+        import pyarrow.compute as pc
+
+        rows = self._buffers[table]
+        delete = bool(self._deleted) and 'reactionID' in TABLE_COLUMNS[table]
+        path = self.path(table)
+        existing = None
+        if os.path.exists(path):
+            if not rows and not delete:
+                return
+            existing = pq.read_table(path)
+
+        if existing is not None and delete:
+            deleted = pa.array(sorted(self._deleted), type=pa.string())
+            existing = existing.filter(pc.invert(pc.is_in(existing['reactionID'], value_set=deleted)))
+        if existing is not None and table in KEY_COLUMNS and rows:
+            known = set(existing[KEY_COLUMNS[table]].to_pylist())
+            position = TABLE_COLUMNS[table].index(KEY_COLUMNS[table])
+            rows = [row for row in rows if row[position] not in known]
+
+        arrow_table = rows_to_arrow(table, rows)
+        if existing is not None:
+            arrow_table = pa.concat_tables([existing.cast(arrow_table.schema), arrow_table])
+        pq.write_table(arrow_table, path + '.tmp', compression=self.compression)
+        os.replace(path + '.tmp', path)
+
+    def close(self):
+
+        """
+        Rewrites every table affected by the buffered rows and deletions.
+        """
+
+        for table in self.tables:
+            self._patch_table(table)
+            self._buffers[table] = []
+        self._deleted = set()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+
+
+# =============================================================================
+#               CSV AND JSON LINES OUTPUT
+# =============================================================================
+
+class _TextWriter:
+
+    # one text file per table, opened up front and appended to as rows arrive
+    suffix = None
+
+    def __init__(self, directory, tables=None):
+        self.directory = directory
+        self.tables = list(tables) if tables is not None else list(DEFAULT_TABLES)
+        os.makedirs(directory, exist_ok=True)
+        self._files = {}
+        for table in self.tables:
+            self._files[table] = open(self.path(table), 'w', newline='', encoding='utf-8')
+            self._start(table)
+
+    def path(self, table):
+        return os.path.join(self.directory, f"{table}{self.suffix}")
+
+    def _start(self, table):
+        pass
+
+    def write(self, rows):
+
+        """
+        Writes the rows of several tables, e.g. one item yielded by `dataset_module.iter_reactions`.
+
+        Args:
+            rows (dict): Rows per table name.
+        """
+
+        for table, table_rows in rows.items():
+            self.write_rows(table, table_rows)
+
+    def write_rows(self, table, rows):
+
+        """
+        Appends rows of one table to its file.
+
+        Args:
+            table (str): Table name.
+            rows (iterable): Rows in the table's column order.
+        """
+
+        if table in self._files:
+            self._write_rows(table, rows)
+
+    def close(self):
+
+        """
+        Closes the files.
+        """
+
+        for stream in self._files.values():
+            stream.close()
+        self._files = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class CSVWriter(_TextWriter):
+
+    """
+    Writes output tables to one CSV file per table, with a header row.
+
+    Scalar columns are written as text of their column type and nested columns as JSON.
+
+    Args:
+        directory (str): Output directory; `<table>.csv` is written for every table.
+        tables (list, optional): Tables to write. Defaults to None (`DEFAULT_TABLES`: all but the normalised child tables); rows of other tables are ignored.
+
+    Example:
+        >>> from writer_module import CSVWriter
+        >>> with CSVWriter("out/") as writer:
+        ...     for rows in iter_reactions("example_dataset.pb.gz", batch_size=1000):
+        ...         writer.write(rows)
+    """
+
+    suffix = '.csv'
+
+    def _start(self, table):
+        csv.writer(self._files[table]).writerow(TABLE_COLUMNS[table])
+
+    def _write_rows(self, table, rows):
+        specs = [column_type(table, column) for column in TABLE_COLUMNS[table]]
+        csv.writer(self._files[table]).writerows(
+            [to_text(value) if is_nested(spec) else normalise_value(value, spec) for value, spec in zip(row, specs)]
+            for row in rows
+        )
+
+
+class JSONLWriter(_TextWriter):
+
+    """
+    Writes output tables to one JSON Lines file per table, one JSON object per row.
+
+    Args:
+        directory (str): Output directory; `<table>.jsonl` is written for every table.
+        tables (list, optional): Tables to write. Defaults to None (`DEFAULT_TABLES`: all but the normalised child tables); rows of other tables are ignored.
+
+    Example:
+        >>> from writer_module import JSONLWriter
+        >>> with JSONLWriter("out/") as writer:
+        ...     for rows in iter_reactions("example_dataset.pb.gz", batch_size=1000):
+        ...         writer.write(rows)
+    """
+
+    suffix = '.jsonl'
+
+    def _write_rows(self, table, rows):
+        columns = TABLE_COLUMNS[table]
+        specs = [column_type(table, column) for column in columns]
+        self._files[table].writelines(
+            json.dumps({column: to_plain(value) if is_nested(spec) else normalise_value(value, spec)
+                        for column, value, spec in zip(columns, row, specs)}) + '\n'
+            for row in rows
+        )
+
+
+# =============================================================================
+#               STREAMING A DATASET FILE INTO A WRITER
+# =============================================================================
+
+def write_dataset(filepath, writer, compounds=None, persons=None, batch_size=256, workers=1, progress=None, normalised=False,
+                  start=0, stop=None, index=False, tables=None, where=None, prefetch_molecules=False, pipeline=False):
+
+    """
+    Streams the dataset metadata and reaction tables of an ORD dataset file into a writer.
+
+    The `compound` and `person` rows are collected into registries instead of being written,
+    so the caller can write them once, or merge them across several datasets first.
+    With `tables`, only the sections filling those tables are extracted (see `dataset_module.iter_reactions`).
+
+    Args:
+        filepath (str): Path to the input file (either zipped or unzipped Google Protobuf format).
+        writer: Any object with a `write_rows(table, rows)` method, e.g. a `ParquetWriter`.
+        compounds (CompoundRegistry, optional): Registry to add compounds to. Defaults to None (a new registry).
+        persons (PersonRegistry, optional): Registry to add persons to. Defaults to None (a new registry).
+        batch_size (int, optional): Number of reactions extracted per batch. Defaults to 256.
+        workers (int, optional): Number of extraction processes. Defaults to 1.
+        progress (callable, optional): Passed to `dataset_module.iter_reactions`. Defaults to None.
+        normalised (bool, optional): Also write the child tables of `normalised_module`. Defaults to False.
+        start (int, optional): Position of the first reaction to write. Defaults to 0.
+        stop (int, optional): Position after the last reaction to write. Defaults to None (the end of the file).
+        index (bool or str, optional): Read reactions through the sidecar index of the file, or through an index kept
+            in this directory (see `index_module`). Defaults to False.
+        tables (list, optional): Tables that are needed; registries of tables that are not stay empty.
+            Defaults to None (every table).
+        where (str or callable, optional): Filter selecting the reactions to write (see `filter_module`).
+            Defaults to None (every reaction).
+        prefetch_molecules (bool, optional): Resolve the distinct molecules of the dataset in one batched pass
+            across `workers` processes before extracting reactions. Defaults to False.
+        pipeline (bool, optional): Read and extract reactions on background threads while `writer` writes the
+            previous batches, with bounded queues between the stages (see `dataset_module.iter_reactions`).
+            The writer itself is only called from the calling thread. Defaults to False.
+
+    Returns:
+        tuple: The (CompoundRegistry, PersonRegistry) holding the compounds and persons of the dataset.
+    """
+
+    compound_registry = compounds if compounds is not None else CompoundRegistry()
+    person_registry = persons if persons is not None else PersonRegistry()
+    dataset_metadata = extract_dataset_metadata(read_dataset_header(filepath))
+
+    writer.write_rows("dataset_metadata", [dataset_metadata])
+    for rows in iter_reactions(filepath, dataset_metadata[0], batch_size=batch_size, workers=workers, progress=progress,
+                               normalised=normalised, start=start, stop=stop, index=index, tables=tables,
+                               where=where, prefetch_molecules=prefetch_molecules, pipeline=pipeline):
+        for table, table_rows in rows.items():
+            if table not in ("compound", "person"):
+                writer.write_rows(table, table_rows)
+        if tables is None or "compound" in tables:
+            compound_registry.extend(rows["compound"])
+        if tables is None or "person" in tables:
+            person_registry.extend(rows["person"])
+
+    return compound_registry, person_registry
+
+def write_parquet(filepath, directory, tables=None, batch_size=256, workers=1, row_group_size=10000, normalised=False):
+
+    """
+    Converts an ORD dataset file to Parquet files, streaming reactions with bounded memory.
+
+    Reaction tables are flushed in row groups while the file is read; the deduplicated
+    `compound` and `person` tables are written once all reactions have been read.
+
+    Args:
+        filepath (str): Path to the input file (either zipped or unzipped Google Protobuf format).
+        directory (str): Output directory.
+        tables (list, optional): Tables to write. Defaults to None (all tables; child tables only with `normalised`).
+        batch_size (int, optional): Number of reactions extracted per batch. Defaults to 256.
+        workers (int, optional): Number of extraction processes. Defaults to 1.
+        row_group_size (int, optional): Number of rows per Parquet row group. Defaults to 10000.
+        normalised (bool, optional): Also write the child tables of `normalised_module`. Defaults to False.
+
+    Returns:
+        dict: Path of the Parquet file written for each table.
+
+    Example:
+        >>> from writer_module import write_parquet
+        >>> write_parquet("example_dataset.pb.gz", "out/", workers=4)
+        {'dataset_metadata': 'out/dataset_metadata.parquet', ...}
+    """
+
+    if tables is None and normalised:
+        tables = list(TABLE_COLUMNS)
+    with ParquetWriter(directory, tables=tables, row_group_size=row_group_size) as writer:
+        compound_registry, person_registry = write_dataset(filepath, writer, batch_size=batch_size, workers=workers,
+                                                           normalised=normalised, tables=tables)
+        writer.write_rows("compound", compound_registry.rows())
+        writer.write_rows("person", person_registry.rows())
+
+    return {table: writer.path(table) for table in writer.tables}
@@ -0,0 +1,36 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import io
+
+from ord_rxn_converter.cli_module import Progress, build_parser, guess_format
+
+
+def test_parser_and_format_guessing():
+    # act:
+    args = build_parser().parse_args(['data/', '-o', 'ord.sqlite', '-w', '4', '-t', 'compound', 'person'])
+
+    assert args.inputs == ['data/']
+    assert args.workers == 4
+    assert args.batch_size == 256
+    assert args.tables == ['compound', 'person']
+    assert guess_format(args.output) == 'sqlite'
+    assert guess_format('out.ttl.gz') == 'turtle'
+    assert guess_format('out/') == 'parquet'
+
+
+def test_progress_reports_throughput():
+    # arrange:
+    stream = io.StringIO()
+    progress = Progress(stream=stream, interval=0)
+
+    # act:
+    progress(10, 2000000)
+    progress(5, 1000000)
+
+    assert progress.reactions == 15
+    assert progress.bytes == 3000000
+    assert stream.getvalue().count('\r') == 2
+    assert 'reactions/s' in stream.getvalue() and 'MB/s' in stream.getvalue()
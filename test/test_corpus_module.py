@@ -0,0 +1,71 @@
+import os
+import shutil
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import pandas as pd
+import pytest
+
+from ord_rxn_converter.corpus_module import (Manifest, convert_corpus, dataset_name, file_hash, file_signature,
+                                              find_dataset_files, merge_registries)
+
+
+def test_manifest_resumes_unchanged_files(tmp_path):
+    # arrange:
+    (tmp_path / 'data').mkdir()
+    first = tmp_path / 'data' / 'ord_dataset-1.pb.gz'
+    second = tmp_path / 'data' / 'ord_dataset-2.pb.gz'
+    first.write_bytes(b'first')
+    second.write_bytes(b'second')
+    (tmp_path / 'data' / 'notes.txt').write_text('not a dataset')
+    manifest = Manifest(str(tmp_path / 'manifest.jsonl'))
+    for path in (first, second):
+        manifest.add(dict(file_signature(path), sha256=file_hash(path)))
+
+    # act:
+    second.write_bytes(b'changed')
+    resumed = Manifest(str(tmp_path / 'manifest.jsonl'))
+    filepaths = find_dataset_files(str(tmp_path / 'data'))
+
+    assert [dataset_name(path) for path in filepaths] == ['ord_dataset-1', 'ord_dataset-2']
+    assert len(resumed) == 2
+    assert resumed.is_done(str(first))
+    assert not resumed.is_done(str(second))
+
+
+def test_convert_corpus_resumes_and_merges_registries(tmp_path):
+    # arrange:
+    data = os.path.join(os.path.dirname(__file__), 'data')
+    corpus = tmp_path / 'corpus'
+    for index, name in enumerate(sorted(os.listdir(data))):
+        if name.startswith('ord_dataset'):
+            (corpus / f'{index:02d}').mkdir(parents=True)
+            shutil.copy(os.path.join(data, name), corpus / f'{index:02d}' / name)
+    out = tmp_path / 'out'
+
+    # act:
+    first = convert_corpus(str(corpus), str(out))
+    second = convert_corpus(str(corpus), str(out))
+    manifest = Manifest(str(out / 'manifest.jsonl'))
+    compounds, persons = merge_registries(list(manifest.records.values()), str(tmp_path / 'merged'))
+
+    assert len(first['converted']) == 3 and not first['failed']
+    assert second['converted'] == [] and len(second['skipped']) == 3
+    assert len(manifest) == 3
+    assert len(compounds) == len(pd.read_parquet(out / 'compound.parquet')) > 0
+    assert len(compounds) <= sum(record['compounds'] for record in manifest.records.values())
+    assert len(persons) == len(pd.read_parquet(tmp_path / 'merged' / 'person.parquet'))
+
+
+def test_convert_corpus_refuses_duplicate_names(tmp_path):
+    # arrange:
+    for directory in ('a', 'b'):
+        (tmp_path / 'corpus' / directory).mkdir(parents=True)
+        (tmp_path / 'corpus' / directory / 'ord_dataset-1.pb.gz').write_bytes(b'dataset')
+
+    # act:
+    with pytest.raises(ValueError, match='ord_dataset-1'):
+        convert_corpus(str(tmp_path / 'corpus'), str(tmp_path / 'out'))
+
+    assert not (tmp_path / 'out' / 'ord_dataset-1').exists()
@@ -1,11 +1,14 @@
 import os
 import sys
 
+import pandas as pd
+import pytest
+
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
 
 from ord_rxn_converter import dataset_module
 
-path = '~ ord_rxn_converter/test/data' # relative path only 
+path = os.path.join(os.path.dirname(__file__), 'data')
 
 file_list = []
 for root, dirs, files in os.walk(path):
@@ -13,6 +16,7 @@ for root, dirs, files in os.walk(path):
         if name.startswith('ord_dataset'):
             file_path = os.path.join(root, name)
             file_list.append(file_path)
+file_list.sort()
 file_path = file_list[1]
 
 expected = dataset_module.extract_dataset(file_path)
@@ -32,3 +36,18 @@ def test_extract_dataset ():
                                     check_column_type=True, check_frame_type=True)
 
 
+@pytest.mark.parametrize('dataset_path', file_list, ids=os.path.basename)
+def test_extract_dataset_with_workers (dataset_path):
+    # act:
+    result = dataset_module.extract_dataset(dataset_path, workers=2, batch_size=2)
+    serial = dataset_module.extract_dataset(dataset_path)
+
+    assert set(result.keys()) == set(serial.keys())
+    for key in serial.keys():
+        pd.testing.assert_frame_equal(result[key], serial[key])
+
+
+def test_extract_reaction_batch_reports_corrupt_reactions_as_value_error ():
+    # act:
+    with pytest.raises(ValueError, match='ord_dataset-1'):
+        dataset_module.extract_reaction_batch([b'\x0a\x05ab'], 'ord_dataset-1')
@@ -0,0 +1,68 @@
+import os
+import pickle
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import pytest
+from ord_schema.proto import reaction_pb2
+
+from ord_rxn_converter.dataset_module import extract_dataset
+from ord_rxn_converter.filter_module import ReactionFilter
+
+DATASET = os.path.join(os.path.dirname(__file__), 'data', 'ord_dataset-35a5a513f1dd44a3a97c88da99f81a00.pb.gz')
+
+
+def make_reaction():
+    reaction = reaction_pb2.Reaction(reaction_id='ord-00000000000000000000000000000001')
+    reaction.identifiers.add(type='REACTION_SMILES', value='CCO>>CC=O')
+    component = reaction.inputs['catalyst'].components.add(reaction_role='CATALYST')
+    component.identifiers.add(type='SMILES', value='[Pd]')
+    measurement = reaction.outcomes.add().products.add().measurements.add(type='YIELD')
+    measurement.percentage.value = 85.0
+    return reaction
+
+
+def test_reaction_filter_expressions():
+    # arrange:
+    reaction = make_reaction()
+
+    # act:
+    results = {expression: ReactionFilter(expression)(reaction) for expression in [
+        'identifiers.type == REACTION_SMILES',
+        'inputs.components.reaction_role == CATALYST and outcomes.products.measurements.type == YIELD',
+        'outcomes.products.measurements.percentage.value > 90',
+        'not (setup or notes.procedure_details)',
+        'inputs.components.reaction_role != SOLVENT',
+        "reaction_id in ['ord-00000000000000000000000000000001', 'ord-2']",
+    ]}
+    restored = pickle.loads(pickle.dumps(ReactionFilter('outcomes.products.measurements.type == YIELD')))
+
+    assert list(results.values()) == [True, True, False, True, True, True]
+    assert restored(reaction) and restored.fields == {8}
+    with pytest.raises(ValueError):
+        ReactionFilter('outcomes.yield > 50')
+
+
+def test_reaction_filter_rejects_unknown_enum_values():
+    # act:
+    with pytest.raises(ValueError, match='YIELD') as misspelt:
+        ReactionFilter('outcomes.products.measurements.type == YEILD')
+    with pytest.raises(ValueError, match='REACTANT'):
+        ReactionFilter('inputs.components.reaction_role in [CATALYST, REACTNAT]')
+    with pytest.raises(ValueError, match='not an enum field'):
+        ReactionFilter('reaction_id == ord')
+
+    assert 'YEILD' in str(misspelt.value)
+
+
+def test_extract_dataset_where():
+    # act:
+    out = extract_dataset(DATASET, where='outcomes.products.measurements.type == YIELD and not identifiers',
+                          tables=['reaction_metadata', 'reaction_outcomes'])
+    none = extract_dataset(DATASET, where=lambda reaction: False)
+    plain = extract_dataset(DATASET)
+
+    assert 0 < len(out['reaction_metadata']) <= len(plain['reaction_metadata'])
+    assert set(out['reaction_outcomes']['reactionID']) <= set(out['reaction_metadata']['reactionID'])
+    assert len(none['reaction_outcomes']) == 0
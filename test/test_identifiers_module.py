@@ -0,0 +1,39 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from ord_schema.proto import reaction_pb2
+from rdkit import Chem
+
+from ord_rxn_converter import identifiers_module
+from ord_rxn_converter.molecule_cache_module import MoleculeCache, resolve_molecule
+
+# (R)-butan-2-ol: the InChI is stereo-specific, the SMILES is not
+INCHI = 'InChI=1S/C4H10O/c1-3-4(2)5/h4-5H,3H2,1-2H3/t4-/m1/s1'
+SMILES = 'CC(O)CC'
+
+
+def test_resolve_compound_takes_inchi_key_from_inchi(monkeypatch):
+    # arrange:
+    cache = MoleculeCache()
+    cxsmiles = resolve_molecule('SMILES', SMILES).cxsmiles
+    monkeypatch.setattr(identifiers_module, 'get_molecule_cache', lambda: cache)
+    molecules = []
+    mol_from_smiles, mol_from_inchi = Chem.MolFromSmiles, Chem.MolFromInchi
+    monkeypatch.setattr(Chem, 'MolFromSmiles', lambda value: molecules.append(value) or mol_from_smiles(value))
+    monkeypatch.setattr(Chem, 'MolFromInchi', lambda value: molecules.append(value) or mol_from_inchi(value))
+    component = reaction_pb2.Compound()
+    component.identifiers.add(type='SMILES', value=SMILES)
+    component.identifiers.add(type='INCHI', value=INCHI)
+
+    # act:
+    compound = identifiers_module.resolve_compound(component.identifiers)
+    keys = identifiers_module.molecule_keys(component.identifiers)
+
+    assert compound.inchi_key == 'BTANRVKWQNVYAZ-SCSAIBSYSA-N'
+    assert compound.inchi_key == Chem.InchiToInchiKey(INCHI)
+    assert compound.identifiers['INCHI'] == INCHI
+    assert compound.identifiers['CXSMILES'] == cxsmiles
+    assert molecules == [SMILES]
+    assert keys == [('INCHI', INCHI), ('SMILES', SMILES)]
@@ -0,0 +1,40 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import sqlite3
+
+from ord_schema.proto import dataset_pb2
+from ord_rxn_converter.incremental_module import StateStore, update_dataset
+from ord_rxn_converter.rdb_module import RDBLoader
+from ord_rxn_converter.reader_module import iter_reaction_messages
+
+DATASET = os.path.join(os.path.dirname(__file__), 'data', 'ord_dataset-35a5a513f1dd44a3a97c88da99f81a00.pb.gz')
+
+
+def test_update_dataset_patches_changed_and_deleted_reactions(tmp_path):
+    # arrange:
+    reactions = list(iter_reaction_messages(DATASET))
+    release = tmp_path / 'release.pb'
+    release.write_bytes(dataset_pb2.Dataset(dataset_id='ord_dataset-1', reactions=reactions).SerializeToString())
+    connection = sqlite3.connect(str(tmp_path / 'ord.sqlite'))
+    state = StateStore(str(tmp_path / 'state.sqlite'))
+    first = update_dataset(str(release), RDBLoader(connection), state)
+
+    reactions[0].conditions.details = 'repeated with fresh catalyst'
+    deleted = reactions.pop()
+    release.write_bytes(dataset_pb2.Dataset(dataset_id='ord_dataset-1', reactions=reactions).SerializeToString())
+
+    # act:
+    second = update_dataset(str(release), RDBLoader(connection), state)
+    third = update_dataset(str(release), RDBLoader(connection), state)
+
+    assert first == {'added': 7, 'modified': 0, 'deleted': 0, 'unchanged': 0}
+    assert second == {'added': 0, 'modified': 1, 'deleted': 1, 'unchanged': 5}
+    assert third == {'added': 0, 'modified': 0, 'deleted': 0, 'unchanged': 6}
+    assert connection.execute('SELECT COUNT(*) FROM reaction_metadata').fetchone() == (6,)
+    assert connection.execute('SELECT COUNT(*) FROM reaction_outcomes WHERE reactionID = ?',
+                              ('mds_reaction-' + deleted.reaction_id.split('-')[1],)).fetchone() == (0,)
+    assert connection.execute("SELECT COUNT(*) FROM reaction_conditions WHERE conditionDetails = 'repeated with fresh catalyst'").fetchone() == (1,)
+    assert len(state.fingerprints('mds_dataset-1')) == 6
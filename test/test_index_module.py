@@ -0,0 +1,95 @@
+import gzip
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from ord_schema.proto import dataset_pb2
+
+from ord_rxn_converter.cli_module import convert
+from ord_rxn_converter.dataset_module import extract_dataset
+from ord_rxn_converter.index_module import build_index, index_path, open_index, write_seekable_gzip
+
+
+def make_dataset():
+    dataset = dataset_pb2.Dataset(name='test dataset', dataset_id='ord_dataset-00000001')
+    for index in range(6):
+        reaction = dataset.reactions.add()
+        reaction.reaction_id = f'ord-{index:032d}'
+        reaction.notes.procedure_details = 'x' * (index * 100)
+    return dataset
+
+
+def test_index_locates_reactions_in_gzip_members(tmp_path):
+    # arrange:
+    dataset = make_dataset()
+    source = tmp_path / 'ord_dataset-00000001.pb.gz'
+    with gzip.open(source, 'wb') as f:
+        f.write(dataset.SerializeToString())
+    seekable = tmp_path / 'seekable.pb.gz'
+    write_seekable_gzip(str(source), str(seekable), member_size=256)
+
+    # act:
+    index = build_index(str(seekable))
+    tail = list(index.iter_reaction_bytes(str(seekable), 4))
+    position = index.position('ord-00000000000000000000000000000002')
+    shards = index.shards(4)
+
+    assert os.path.exists(index_path(str(seekable)))
+    assert len(index) == 6
+    assert len(index.seek_points()) > 1
+    assert index.seek_point(index.spans(4)[0][0])[1] > 0
+    assert tail == [reaction.SerializeToString() for reaction in dataset.reactions[4:]]
+    assert position == 2
+    assert shards == [(0, 2), (2, 4), (4, 5), (5, 6)]
+
+
+def test_open_index_rebuilds_stale_index(tmp_path):
+    # arrange:
+    dataset = make_dataset()
+    source = tmp_path / 'ord_dataset-00000001.pb'
+    source.write_bytes(dataset.SerializeToString())
+    open_index(str(source)).close()
+    del dataset.reactions[0]
+    source.write_bytes(dataset.SerializeToString())
+    os.utime(source, (0, 0))
+
+    # act:
+    index = open_index(str(source))
+
+    assert len(index) == 5
+    assert index.is_current(str(source))
+
+
+def test_indexed_workers_read_single_member_gzip(tmp_path):
+    # arrange:
+    dataset = make_dataset()
+    source = tmp_path / 'ord_dataset-00000001.pb.gz'
+    with gzip.open(source, 'wb') as f:
+        f.write(dataset.SerializeToString())
+
+    # act:
+    out = extract_dataset(str(source), batch_size=2, workers=2, index=True, start=1)
+    plain = extract_dataset(str(source), start=1)
+
+    assert len(open_index(str(source)).seek_points()) == 1
+    assert all(out[table].equals(plain[table]) for table in plain)
+
+
+def test_index_kept_in_separate_directory(tmp_path):
+    # arrange:
+    dataset = make_dataset()
+    data_directory = tmp_path / 'data'
+    data_directory.mkdir()
+    source = data_directory / 'ord_dataset-00000001.pb.gz'
+    with gzip.open(source, 'wb') as f:
+        f.write(dataset.SerializeToString())
+    index_directory = tmp_path / 'indexes'
+
+    # act:
+    convert([str(source)], str(tmp_path / 'out.sqlite'), shard=(1, 2), index_dir=str(index_directory))
+
+    assert not os.path.exists(index_path(str(source)))
+    assert os.path.exists(index_path(str(source), str(index_directory)))
+    assert index_path(str(source), 'indexes') != index_path(str(tmp_path / 'ord_dataset-00000001.pb.gz'), 'indexes')
+    assert len(open_index(str(source), rebuild=False, directory=str(index_directory))) == 6
@@ -0,0 +1,53 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from ord_schema.proto import reaction_pb2
+
+from ord_rxn_converter.identifiers_module import collect_molecule_keys
+from ord_rxn_converter.molecule_cache_module import MoleculeCache, resolve_molecule
+
+
+def test_molecule_cache_memoises_and_persists(tmp_path):
+    # arrange:
+    path = str(tmp_path / 'molecules.sqlite')
+    cache = MoleculeCache(maxsize=1, path=path)
+
+    # act:
+    ethanol = cache.resolve('SMILES', 'CCO')
+    cache.resolve('SMILES', 'CCO')
+    invalid = cache.resolve('SMILES', 'not a smiles')
+    cache.close()
+    reopened = MoleculeCache(path=path)
+
+    assert ethanol == resolve_molecule('SMILES', 'CCO')
+    assert ethanol.inchi_key == 'LFQSCWFLJHTTHZ-UHFFFAOYSA-N'
+    assert invalid is None
+    assert (cache.hits, cache.misses) == (1, 2)
+    assert reopened.resolve('SMILES', 'CCO') == ethanol
+    assert reopened.resolve('SMILES', 'not a smiles') is None
+    assert (reopened.store_hits, reopened.misses) == (2, 0)
+
+
+def test_prefetch_resolves_each_molecule_once():
+    # arrange:
+    reactions = []
+    for smiles in ['CCO', 'CCO', 'CC(=O)O']:
+        reaction = reaction_pb2.Reaction()
+        reaction.inputs['solvent'].components.add().identifiers.add(type='SMILES', value=smiles)
+        reaction.outcomes.add().products.add().identifiers.add(type='INCHI', value='InChI=1S/CH4/h1H4')
+        reactions.append(reaction)
+    cache, worker_cache = MoleculeCache(), MoleculeCache()
+
+    # act:
+    keys = collect_molecule_keys(reactions)
+    molecules = cache.prefetch(sorted(keys))
+    worker_cache.preload(molecules)
+    ethanol = worker_cache.resolve('SMILES', 'CCO')
+
+    assert keys == {('SMILES', 'CCO'), ('SMILES', 'CC(=O)O'), ('INCHI', 'InChI=1S/CH4/h1H4')}
+    assert cache.misses == 3
+    assert molecules[('INCHI', 'InChI=1S/CH4/h1H4')].inchi_key == 'VNWKTOKETHGBQD-UHFFFAOYSA-N'
+    assert ethanol == resolve_molecule('SMILES', 'CCO')
+    assert (worker_cache.hits, worker_cache.misses) == (1, 0)
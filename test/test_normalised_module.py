@@ -0,0 +1,47 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from ord_rxn_converter.dataset_module import extract_dataset
+from ord_rxn_converter.normalised_module import CHILD_TABLE_COLUMNS, extract_child_rows
+
+DATASET = os.path.join(os.path.dirname(__file__), 'data', 'ord_dataset-5540e162c09f4c04905ddc8ba9c931c6.pb.gz')
+
+
+def test_extract_child_rows_flattens_measurements():
+    # arrange:
+    temperature = {'temperatureControl': None, 'temperatureSetpoint': 80.0, 'temperatureUnit': 'CELSIUS',
+                   'temperatureMeasurements': [['THERMOCOUPLE_INTERNAL', '', 0.0, 'MINUTE', 79.5, 'CELSIUS'],
+                                               ['THERMOCOUPLE_INTERNAL', '', 30.0, 'MINUTE', 80.5, 'CELSIUS']]}
+    measurements = [[0, 'KEY', None, 'lc', 'YIELD', None, None, None, None, 'percentage', 95.0, 'Percent',
+                     2.5, 'MINUTE', None, None, None],
+                    [1, 'KEY', None, 'lc', 'IDENTITY', None, None, None, None, 'string_value', 'confirmed', None,
+                     None, None, None, None, None]]
+    products = [['KEY', True, [measurements], '', None, None, 'PRODUCT']]
+    analyses = [{'analysisKey': 'lc', 'analysisType': 'LC', 'data': {'trace': ['1,2,3', 'raw trace']}}]
+    rows = {
+        'reaction_conditions': [['mds_reaction-1', temperature, None, None, None, None, None, None, None, None, None]],
+        'reaction_outcomes': [['mds_reaction-1', 'outcomeKey_1_mds_reaction-1', 2.0, 'HOUR', None, products, analyses]],
+    }
+
+    # act:
+    child_rows = extract_child_rows(rows)
+
+    assert set(child_rows) == set(CHILD_TABLE_COLUMNS)
+    assert child_rows['temperature_measurements'][1] == ['mds_reaction-1', 1, 'THERMOCOUPLE_INTERNAL', '', 30.0, 'MINUTE', 80.5, 'CELSIUS']
+    yield_row, identity_row = child_rows['product_measurements']
+    assert yield_row[:4] == ['mds_reaction-1', 'outcomeKey_1_mds_reaction-1', 0, 0]
+    assert (yield_row[12], yield_row[13]) == (95.0, None)
+    assert (identity_row[12], identity_row[13]) == (None, 'confirmed')
+    assert child_rows['analysis_data'] == [['mds_reaction-1', 'outcomeKey_1_mds_reaction-1', 'lc', 'LC', 'trace', '1,2,3', 'raw trace']]
+
+
+def test_extract_dataset_normalised_tables():
+    # act:
+    out = extract_dataset(DATASET, normalised=True)
+
+    assert len(out['product_measurements']) == 23
+    assert len(out['analysis_data']) == 15
+    assert set(out['product_measurements']['outcomeKey']) <= set(out['reaction_outcomes']['outcomeKey'])
+    assert 'product_measurements' not in extract_dataset(DATASET)
@@ -0,0 +1,28 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import json
+import subprocess
+
+
+def test_package_import_is_lazy():
+    # arrange:
+    src_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+    probe = ("import json, sys; import ord_rxn_converter; import ord_rxn_converter.cli_module; "
+             "print(json.dumps([name for name in ('rdkit', 'pandas', 'pyarrow') if name in sys.modules]))")
+
+    # act:
+    output = subprocess.run([sys.executable, '-c', probe], env=dict(os.environ, PYTHONPATH=src_dir),
+                            check=True, capture_output=True, text=True).stdout
+
+    assert json.loads(output) == []
+
+
+def test_submodules_load_on_attribute_access():
+    # act:
+    import ord_rxn_converter
+
+    assert ord_rxn_converter.schema_module.column_type('reaction_outcomes', 'reactionTime') == 'float'
+    assert 'dataset_module' in dir(ord_rxn_converter)
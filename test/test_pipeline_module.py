@@ -0,0 +1,78 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from ord_rxn_converter.dataset_module import extract_dataset
+from ord_rxn_converter.molecule_cache_module import MoleculeCache, get_molecule_cache, set_molecule_cache
+from ord_rxn_converter.pipeline_module import threaded_stage
+
+DATASET = os.path.join(os.path.dirname(__file__), 'data', 'ord_dataset-35a5a513f1dd44a3a97c88da99f81a00.pb.gz')
+
+
+def test_threaded_stage_keeps_order_and_stops_producer():
+    # arrange:
+    closed = []
+
+    def produce():
+        try:
+            for item in range(100):
+                yield item
+        finally:
+            closed.append(True)
+
+    def fail():
+        yield 1
+        raise RuntimeError('broken stage')
+
+    # act:
+    items = list(threaded_stage(range(50), queue_size=2))
+    stage = threaded_stage(produce(), queue_size=2)
+    head = [next(stage), next(stage)]
+    stage.close()
+
+    assert items == list(range(50))
+    assert head == [0, 1]
+    assert closed == [True]
+    with pytest.raises(RuntimeError, match='broken stage'):
+        list(threaded_stage(fail()))
+
+
+def test_pipeline_matches_sequential_extraction():
+    # act:
+    out = extract_dataset(DATASET, batch_size=2, pipeline=True)
+    plain = extract_dataset(DATASET, batch_size=2)
+
+    assert all(out[table].equals(plain[table]) for table in plain)
+
+
+def test_pipeline_reads_through_index(tmp_path):
+    # arrange:
+    filepath = tmp_path / os.path.basename(DATASET)
+    filepath.write_bytes(open(DATASET, 'rb').read())
+
+    # act:
+    out = extract_dataset(str(filepath), batch_size=2, index=True, start=1, pipeline=True)
+    plain = extract_dataset(str(filepath), batch_size=2, start=1)
+
+    assert all(out[table].equals(plain[table]) for table in plain)
+
+
+def test_pipeline_shares_persistent_molecule_cache(tmp_path):
+    # arrange:
+    default_cache = get_molecule_cache()
+    cache = MoleculeCache(maxsize=1, path=str(tmp_path / 'molecules.sqlite'))
+    set_molecule_cache(cache)
+
+    # act:
+    try:
+        plain = extract_dataset(DATASET)
+        out = extract_dataset(DATASET, pipeline=True)
+    finally:
+        set_molecule_cache(default_cache)
+        cache.close()
+
+    assert all(out[table].equals(plain[table]) for table in plain)
+    assert cache.store_hits > 0
@@ -0,0 +1,35 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import json
+import sqlite3
+
+from ord_rxn_converter.rdb_module import RDBLoader
+from ord_rxn_converter.registry_module import COMPOUND_COLUMNS
+
+
+def test_rdb_loader_upserts_compounds_and_persons():
+    # arrange:
+    connection = sqlite3.connect(':memory:')
+    compound = ['LFQSCWFLJHTTHZ-UHFFFAOYSA-N', 'CCO'] + [None] * (len(COMPOUND_COLUMNS) - 2)
+    person = ['0000-0001', 'jsmith', 'John Smith', 'CWRU', '']
+    products = [['LFQSCWFLJHTTHZ-UHFFFAOYSA-N', True, [], '', {'POWDER': 'white'}, None, 'PRODUCT']]
+    first = {'compound': [compound], 'person': [person],
+             'reaction_outcomes': [['mds_reaction-1', 'outcomeKey_0_mds_reaction-1', 2.0, 'HOUR', 95.0, products, None]]}
+    second = {'compound': [compound], 'person': [person],
+              'reaction_outcomes': [['mds_reaction-2', 'outcomeKey_0_mds_reaction-2', '', 'HOUR', 80.0, [], None]]}
+
+    # act:
+    with RDBLoader(connection, transaction_size=2) as loader:
+        loader.write(first)
+    with RDBLoader(connection) as loader:
+        loader.write(second)
+    outcomes = connection.execute('SELECT reactionTime, products FROM reaction_outcomes ORDER BY reactionID').fetchall()
+
+    assert connection.execute('SELECT COUNT(*) FROM compound').fetchone() == (1,)
+    assert connection.execute('SELECT COUNT(*) FROM person').fetchone() == (1,)
+    assert outcomes[0][0] == 2.0
+    assert outcomes[1][0] is None
+    assert json.loads(outcomes[0][1])[0][4] == {'POWDER': 'white'}
@@ -0,0 +1,29 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import io
+
+from ord_rxn_converter.rdf_module import RDFWriter, DEFAULT_BASE_IRI
+from ord_rxn_converter.registry_module import COMPOUND_COLUMNS
+
+
+def test_rdf_writer_streams_ntriples():
+    # arrange:
+    stream = io.StringIO()
+    compound = ['LFQSCWFLJHTTHZ-UHFFFAOYSA-N', 'CCO'] + [''] * (len(COMPOUND_COLUMNS) - 2)
+    outcomes = [['mds_reaction-1', 'outcomeKey_0_mds_reaction-1', '2', 'HOUR', 95.0, [], None]]
+
+    # act:
+    with RDFWriter(stream, buffer_size=1) as writer:
+        writer.write({'compound': [compound, compound], 'reaction_outcomes': outcomes})
+    lines = stream.getvalue().splitlines()
+
+    assert len(lines) == writer.triples_written == 7
+    assert all(line.endswith(' .') for line in lines)
+    assert (f'<{DEFAULT_BASE_IRI}Compound/LFQSCWFLJHTTHZ-UHFFFAOYSA-N> <{DEFAULT_BASE_IRI}smiles> "CCO" .') in lines
+    assert (f'<{DEFAULT_BASE_IRI}ReactionOutcome/outcomeKey_0_mds_reaction-1> <{DEFAULT_BASE_IRI}reactionID> '
+            f'<{DEFAULT_BASE_IRI}Reaction/mds_reaction-1> .') in lines
+    assert (f'<{DEFAULT_BASE_IRI}ReactionOutcome/outcomeKey_0_mds_reaction-1> <{DEFAULT_BASE_IRI}reactionTime> '
+            '"2.0"^^<http://www.w3.org/2001/XMLSchema#double> .') in lines
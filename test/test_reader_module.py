@@ -0,0 +1,101 @@
+import gzip
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import io
+
+import pytest
+from ord_schema.proto import dataset_pb2
+
+from ord_rxn_converter import reader_module
+
+
+def make_dataset():
+    dataset = dataset_pb2.Dataset(name='test dataset', description='streaming', dataset_id='ord_dataset-00000001')
+    for index in range(5):
+        reaction = dataset.reactions.add()
+        reaction.reaction_id = f'ord-{index:032d}'
+        reaction.notes.procedure_details = 'x' * (index * 100)
+    return dataset
+
+
+def test_iter_reaction_messages(tmp_path):
+    # arrange:
+    dataset = make_dataset()
+    file_path = tmp_path / 'ord_dataset-00000001.pb.gz'
+    with gzip.open(file_path, 'wb') as f:
+        f.write(dataset.SerializeToString())
+
+    # act:
+    reactions = list(reader_module.iter_reaction_messages(str(file_path)))
+    header = reader_module.read_dataset_header(str(file_path))
+
+    assert reactions == list(dataset.reactions)
+    assert header.dataset_id == dataset.dataset_id
+    assert header.name == dataset.name
+    assert len(header.reactions) == 0
+
+
+def test_mapped_dataset_random_access(tmp_path):
+    # arrange:
+    dataset = make_dataset()
+    file_path = tmp_path / 'ord_dataset-00000001.pb'
+    file_path.write_bytes(dataset.SerializeToString())
+
+    # act:
+    with reader_module.MappedDataset(str(file_path)) as mapped:
+        length = len(mapped)
+        third = mapped[3]
+        last = mapped[-1]
+        middle = [reaction.reaction_id for reaction in mapped.iter_reactions(1, 3)]
+        shards = mapped.shards(2)
+        spans = mapped.spans(2, 4)
+    raw = reader_module.read_mapped_spans(str(file_path), spans)
+
+    assert length == 5
+    assert third == dataset.reactions[3]
+    assert last == dataset.reactions[4]
+    assert middle == [dataset.reactions[1].reaction_id, dataset.reactions[2].reaction_id]
+    assert shards == [(0, 3), (3, 5)]
+    assert raw == [reaction.SerializeToString() for reaction in dataset.reactions[2:4]]
+    assert reader_module.read_reaction_id(raw[0]) == dataset.reactions[2].reaction_id
+
+
+def test_project_reaction_bytes_keeps_selected_fields():
+    # arrange:
+    reaction = make_dataset().reactions[2]
+    reaction.identifiers.add(value='CCO>>CC=O')
+    reaction.outcomes.add().reaction_time.value = 2.0
+
+    # act:
+    projected = reader_module.project_reaction_bytes(reaction.SerializeToString(), {1, 10})
+
+    expected = type(reaction)()
+    expected.CopyFrom(reaction)
+    expected.ClearField('notes')
+    expected.ClearField('outcomes')
+    assert type(reaction).FromString(projected) == expected
+
+
+def test_threaded_decompressor_streams_in_bounded_chunks(tmp_path):
+    # arrange:
+    dataset = make_dataset()
+    file_path = tmp_path / 'ord_dataset-00000001.pb.gz'
+    with gzip.open(file_path, 'wb') as f:
+        f.write(dataset.SerializeToString())
+    corrupt_path = tmp_path / 'corrupt.pb.gz'
+    corrupt_path.write_bytes(file_path.read_bytes()[:-20] + b'x' * 20)
+
+    # act:
+    stream = io.BufferedReader(reader_module.ThreadedDecompressor(file_path, chunk_size=64, queue_size=2), 32)
+    with stream:
+        stream.seek(10)
+        rest = stream.read()
+    reactions = list(reader_module.iter_reaction_messages(str(file_path)))
+
+    assert rest == dataset.SerializeToString()[10:]
+    assert reactions == list(dataset.reactions)
+    with pytest.raises((EOFError, OSError)):
+        list(reader_module.iter_reaction_bytes(str(corrupt_path)))
@@ -0,0 +1,44 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import pandas as pd
+
+from ord_rxn_converter.registry_module import CompoundRegistry, PersonRegistry, COMPOUND_COLUMNS, PERSON_COLUMNS
+
+
+def compound_row(inchi_key, smiles):
+    return [inchi_key, smiles] + [None] * (len(COMPOUND_COLUMNS) - 2)
+
+
+def test_compound_registry_deduplicates_on_inchikey():
+    # arrange:
+    compounds = CompoundRegistry()
+
+    # act:
+    compounds.extend([compound_row('LFQSCWFLJHTTHZ-UHFFFAOYSA-N', 'CCO'),
+                      compound_row('LFQSCWFLJHTTHZ-UHFFFAOYSA-N', 'OCC'),
+                      compound_row(None, 'C'),
+                      compound_row('XLYOFNOQVPJJNP-UHFFFAOYSA-N', 'O')])
+    result = compounds.to_dataframe()
+
+    assert result.columns.tolist() == COMPOUND_COLUMNS
+    assert result['InChIKey'].tolist() == ['LFQSCWFLJHTTHZ-UHFFFAOYSA-N', 'XLYOFNOQVPJJNP-UHFFFAOYSA-N']
+    assert result['smiles'].tolist() == ['CCO', 'O']
+
+
+def test_person_registry_seeded_from_dataframe():
+    # arrange:
+    seed = pd.DataFrame([['0000-0001', 'jsmith', 'John Smith', 'CWRU', 'js@case.edu']], columns=PERSON_COLUMNS)
+    persons = PersonRegistry(seed)
+    other = PersonRegistry()
+    other.extend([['0000-0001', 'john', 'J. Smith', '', ''], ['0000-0002', 'jdoe', 'Jane Doe', 'CWRU', '']])
+
+    # act:
+    persons.update(other)
+    result = persons.to_dataframe()
+
+    assert '0000-0002' in persons
+    assert result['ORCiD'].tolist() == ['0000-0001', '0000-0002']
+    assert result['username'].tolist() == ['jsmith', 'jdoe']
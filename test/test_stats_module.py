@@ -0,0 +1,58 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from ord_rxn_converter.dataset_module import extract_dataset
+from ord_rxn_converter.stats_module import ExtractionStats
+
+DATASET = os.path.join(os.path.dirname(__file__), 'data', 'ord_dataset-35a5a513f1dd44a3a97c88da99f81a00.pb.gz')
+
+
+def test_extract_dataset_records_stage_stats():
+    # arrange:
+    stats = ExtractionStats()
+
+    # act:
+    out = extract_dataset(DATASET, stats=stats)
+    plain = extract_dataset(DATASET)
+
+    assert all(out[table].equals(plain[table]) for table in plain)
+    assert stats.sections['read']['calls'] == 7
+    assert stats.sections['parse']['calls'] == 7
+    assert stats.sections['outcomes']['rows'] >= len(out['reaction_outcomes'])
+    assert stats.sections['compound_registry']['rows'] == len(out['compound'])
+    assert stats.sections['dataframe']['calls'] == len(out)
+    assert stats.cache_hits + stats.cache_store_hits + stats.cache_misses > 0
+    assert 'molecule cache' in stats.report()
+
+
+def test_extraction_stats_merge():
+    # arrange:
+    first, second = ExtractionStats(), ExtractionStats()
+    first.add('inputs', 1.0, rows=4)
+    second.add('inputs', 0.5, rows=2)
+    second.add_cache_counts((0, 0, 0), (3, 0, 1))
+
+    # act:
+    first.merge(second)
+
+    assert first.sections['inputs'] == {'seconds': 1.5, 'calls': 2, 'rows': 6}
+    assert first.cache_hit_rate() == 0.75
+
+
+def test_extract_dataset_projection_skips_sections():
+    # arrange:
+    stats = ExtractionStats()
+    tables = ['reaction_identifiers', 'reaction_outcomes']
+
+    # act:
+    out = extract_dataset(DATASET, stats=stats, tables=tables)
+    plain = extract_dataset(DATASET)
+
+    assert list(out) == tables
+    assert out['reaction_identifiers'].equals(plain['reaction_identifiers'])
+    assert out['reaction_outcomes']['outcomeKey'].equals(plain['reaction_outcomes']['outcomeKey'])
+    assert 'outcomes' in stats.sections
+    assert not set(stats.sections) & {'inputs', 'conditions', 'workups', 'compound_registry'}
+    assert stats.cache_hits + stats.cache_store_hits + stats.cache_misses == 0
@@ -0,0 +1,60 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import math
+
+from ord_rxn_converter.dataset_module import input_addition_cols, reaction_outcomes_cols, reaction_workups_cols
+from ord_rxn_converter.table_module import TableBuilder, enum_categories
+
+
+def test_table_builder_types_columns():
+    # arrange:
+    builder = TableBuilder('input_addition', input_addition_cols)
+    rows = [
+        ['mds_reaction-1', 'input 1', 1, 5.0, 'MINUTE', 'DROPWISE', 1.0, 'HOUR', 'SYRINGE', 25.0, 'CELSIUS', None, None, '', ''],
+        ['mds_reaction-1', 'input 2', None, None, 'HOUR', 'UNSPECIFIED', '2', 'HOUR', 'UNSPECIFIED', 0, 'CELSIUS', None, None, '', ''],
+    ]
+
+    # act:
+    builder.extend(rows[:1])
+    builder.append(rows[1])
+    frame = builder.to_dataframe()
+    batched = TableBuilder('input_addition', input_addition_cols)
+    batched.extend(rows[::-1] + rows)
+
+    assert len(builder) == 2
+    assert str(frame['additionTime'].dtype) == 'float64'
+    assert math.isnan(frame['additionTime'][1])
+    assert frame['additionDuration'].tolist() == [1.0, 2.0]
+    assert str(frame['additionOrder'].dtype) == 'Int64'
+    assert frame['additionOrder'].isna().tolist() == [False, True]
+    assert str(frame['timeUnit'].dtype) == 'category'
+    assert frame['timeUnit'].tolist() == ['MINUTE', 'HOUR']
+    assert frame['flowRateUnit'].isna().all()
+    assert batched.to_dataframe()['timeUnit'].cat.categories.tolist() == ['HOUR', 'MINUTE']
+
+
+def test_table_builder_empty_table():
+    # act:
+    frame = TableBuilder('reaction_outcomes', reaction_outcomes_cols).to_dataframe()
+
+    assert frame.columns.tolist() == reaction_outcomes_cols
+    assert len(frame) == 0
+    assert frame['products'].dtype == object
+
+
+def test_table_builder_enum_columns_as_categoricals():
+    # arrange:
+    builder = TableBuilder('reaction_workups', reaction_workups_cols, categorical=True)
+    row = ['mds_reaction-1', 'FILTRATION', '', 30.0, 'MINUTE', None, None, None, '', None, None, False]
+
+    # act:
+    builder.extend([row, row])
+    frame = builder.to_dataframe()
+
+    assert enum_categories('reaction_workups', 'workupType')[0] == 'UNSPECIFIED'
+    assert frame['workupType'].cat.categories.tolist() == enum_categories('reaction_workups', 'workupType')
+    assert frame['workupType'].tolist() == ['FILTRATION', 'FILTRATION']
+    assert 'HOUR' in frame['durationUnit'].cat.categories
@@ -0,0 +1,19 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import pytest
+from ord_schema.proto import reaction_pb2
+
+from ord_rxn_converter import utility_functions_module
+
+
+def test_enums_data_is_shared_and_frozen():
+    # act:
+    enums_data = utility_functions_module.enums_data
+
+    assert enums_data is utility_functions_module.get_enums_data()
+    assert dict(enums_data['Time.TimeUnit']) == utility_functions_module.extract_all_enums(reaction_pb2)['Time.TimeUnit']
+    with pytest.raises(TypeError):
+        enums_data['Time.TimeUnit'][1] = 'DAY'
@@ -0,0 +1,55 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import csv
+import json
+
+import pytest
+
+from ord_rxn_converter.writer_module import ParquetWriter, CSVWriter, JSONLWriter
+
+
+def test_parquet_writer_flushes_row_groups(tmp_path):
+    pq = pytest.importorskip('pyarrow.parquet')
+
+    # arrange:
+    products = [['LFQSCWFLJHTTHZ-UHFFFAOYSA-N', True, [], '', {'POWDER': 'white'}, None, 'PRODUCT']]
+    outcomes = [['mds_reaction-1', f'outcomeKey_{index}_mds_reaction-1', 2.0, 'HOUR', 95.0, products, None]
+                for index in range(5)]
+
+    # act:
+    with ParquetWriter(str(tmp_path), tables=['reaction_outcomes', 'person'], row_group_size=2) as writer:
+        writer.write({'reaction_outcomes': outcomes, 'compound': [['ignored'] * 18]})
+    parquet_file = pq.ParquetFile(tmp_path / 'reaction_outcomes.parquet')
+    result = parquet_file.read().to_pylist()
+
+    assert parquet_file.metadata.num_row_groups == 3
+    assert len(result) == 5
+    assert result[0]['reactionTime'] == 2.0
+    assert result[0]['products'][0]['inchiKey'] == 'LFQSCWFLJHTTHZ-UHFFFAOYSA-N'
+    assert result[0]['products'][0]['texture'] == [('POWDER', 'white')]
+    assert pq.ParquetFile(tmp_path / 'person.parquet').metadata.num_rows == 0
+    assert not (tmp_path / 'compound.parquet').exists()
+
+
+def test_text_writers_encode_nested_columns_as_json(tmp_path):
+    # arrange:
+    notes = [['mds_reaction-1', True, None, None, None, None, None, None, 'toxic', '', [[2.0, 'HOUR', 'turned blue']]]]
+
+    # act:
+    for writer_class in (CSVWriter, JSONLWriter):
+        with writer_class(str(tmp_path), tables=['reaction_notes', 'person']) as writer:
+            writer.write({'reaction_notes': notes})
+    with open(tmp_path / 'reaction_notes.csv', newline='') as stream:
+        csv_rows = list(csv.DictReader(stream))
+    with open(tmp_path / 'reaction_notes.jsonl') as stream:
+        json_rows = [json.loads(line) for line in stream]
+
+    assert csv_rows[0]['isHeterogeneous'] == 'True'
+    assert json.loads(csv_rows[0]['observations']) == [[2.0, 'HOUR', 'turned blue']]
+    assert json_rows == [dict(csv_rows[0], isHeterogeneous=True, formsPrecipitates=None, isExothermic=None,
+                              offGasses=None, isSensitiveToMoisture=None, isSensitiveToOxygen=None,
+                              isSensitivetoLight=None, observations=[[2.0, 'HOUR', 'turned blue']])]
+    assert (tmp_path / 'person.csv').read_text().strip() == 'ORCiD,username,name,organization,email'